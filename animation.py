@@ -0,0 +1,190 @@
+"""Покадровая анимация спрайтов и частицы.
+
+Анимация - кадры из спрайт-листа assets/<имя>-sheet.png: кадры одного
+размера в один ряд. Лист грузится и кэшируется AssetPipeline как обычная
+картинка (шириной в frames спрайтов) и попадает в общий атлас, а кадры -
+подповерхности атласа. Если листа нет, персонаж рисуется статичным
+спрайтом, как раньше.
+
+Animator помнит, какую анимацию персонаж играет и с какого момента:
+смена ключа (активность студента, взгляд учителя) начинает анимацию
+с первого кадра. Неповторяющаяся анимация (поворот головы учителя)
+останавливается на последнем кадре.
+
+ParticlePool - заранее созданные частицы со __slots__. Живые частицы
+лежат в начале списка, умершая меняется местами с последней живой, так
+что ни запуск, ни смерть частицы не создают объектов. Положение
+считается от момента рождения (x0 + v*t + g*t²/2), а прозрачность -
+готовые кадры затухания, поэтому кадр с частицами не создаёт поверхностей.
+Частицы рисуются одним screen.blits() по заранее созданным парам
+[кадр, Rect], так что и прямоугольники на каждую частицу не создаются.
+"""
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional
+
+import pygame
+
+PARTICLES = 64      # Частиц в пуле: больше одновременно не живёт
+FADE_STEPS = 8      # Кадров затухания частицы
+
+
+@dataclass(frozen=True)
+class SheetSpec:
+    """Спрайт-лист: файл, число кадров в ряду, кадров в секунду, по кругу ли"""
+    name: str
+    frames: int
+    fps: float
+    loop: bool = True
+
+
+def slice_sheet(sheet: pygame.Surface, count: int) -> List[pygame.Surface]:
+    """Кадры листа (подповерхности, без копирования пикселей)"""
+    width = sheet.get_width() // count
+    height = sheet.get_height()
+    return [sheet.subsurface((i * width, 0, width, height)) for i in range(count)]
+
+
+class Animation:
+    """Кадры одной анимации"""
+    __slots__ = ("frames", "fps", "loop")
+
+    def __init__(self, frames: List[pygame.Surface], fps: float, loop: bool = True):
+        self.frames = frames
+        self.fps = fps
+        self.loop = loop
+
+    def index(self, elapsed: float) -> int:
+        """Номер кадра через elapsed секунд после начала"""
+        index = int(elapsed * self.fps)
+        if self.loop:
+            return index % len(self.frames)
+        return min(index, len(self.frames) - 1)
+
+
+class Animator:
+    """Текущая анимация персонажа и её кадр"""
+    __slots__ = ("key", "started", "index")
+
+    def __init__(self):
+        self.key: Optional[Hashable] = None
+        self.started = 0.0
+        self.index = 0
+
+    def update(self, animations: Dict[Hashable, Animation], key: Hashable, now: float) -> int:
+        """Перейти к моменту now (секунды); смена key начинает анимацию заново"""
+        if key != self.key or now < self.started:
+            self.key = key
+            self.started = now
+        animation = animations.get(key)
+        self.index = animation.index(now - self.started) if animation is not None else 0
+        return self.index
+
+    def sprite(self, animations: Dict[Hashable, Animation]) -> Optional[pygame.Surface]:
+        """Кадр для отрисовки или None - анимации нет, нужен статичный спрайт"""
+        animation = animations.get(self.key)
+        return animation.frames[self.index] if animation is not None else None
+
+
+def fade_frames(surface: pygame.Surface, steps: int = FADE_STEPS) -> List[pygame.Surface]:
+    """Копии surface с прозрачностью от полной видимости к почти невидимой"""
+    frames = []
+    for i in range(steps):
+        frame = surface.copy()
+        frame.set_alpha(255 - 255 * i // steps)
+        frames.append(frame)
+    return frames
+
+
+class Particle:
+    __slots__ = ("x", "y", "vx", "vy", "gravity", "born", "life", "frames")
+
+    def __init__(self):
+        self.x = self.y = self.vx = self.vy = self.gravity = 0.0
+        self.born = 0.0
+        self.life = 1.0
+        self.frames: List[pygame.Surface] = []
+
+
+class ParticlePool:
+    """Пул частиц фиксированного размера"""
+
+    def __init__(self, capacity: int = PARTICLES):
+        self.particles = [Particle() for _ in range(capacity)]
+        self.active = 0
+        self.dropped = 0  # Сколько частиц не запущено из-за заполненного пула
+        # Общий прямоугольник bounds(), меняется на месте
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        # Пары [кадр, положение] для screen.blits(), по одной на частицу
+        self._blits = [[None, pygame.Rect(0, 0, 0, 0)] for _ in range(capacity)]
+
+    def spawn(self, frames: List[pygame.Surface], x: float, y: float, vx: float, vy: float,
+              now: float, life: float, gravity: float = 0.0) -> bool:
+        """Запустить частицу с центром в (x, y); False - пул заполнен"""
+        if self.active == len(self.particles):
+            self.dropped += 1
+            return False
+        particle = self.particles[self.active]
+        particle.x, particle.y, particle.vx, particle.vy = x, y, vx, vy
+        particle.gravity = gravity
+        particle.born = now
+        particle.life = life
+        particle.frames = frames
+        self.active += 1
+        return True
+
+    def update(self, now: float):
+        """Убрать частицы, чья жизнь закончилась к моменту now"""
+        particles = self.particles
+        i = 0
+        while i < self.active:
+            particle = particles[i]
+            if now - particle.born >= particle.life or now < particle.born:
+                last = self.active - 1
+                particles[i], particles[last] = particles[last], particle
+                self.active = last
+            else:
+                i += 1
+
+    def clear(self):
+        self.active = 0
+
+    def bounds(self, now: float) -> Optional[pygame.Rect]:
+        """Область, которую занимают живые частицы (общий прямоугольник пула)"""
+        if not self.active:
+            return None
+        particles = self.particles
+        left = top = 1 << 30
+        right = bottom = -(1 << 30)
+        for i in range(self.active):
+            particle = particles[i]
+            age = now - particle.born
+            frames = particle.frames
+            frame = frames[min(len(frames) - 1, int(age / particle.life * len(frames)))]
+            width = frame.get_width()
+            height = frame.get_height()
+            x = int(particle.x + particle.vx * age) - width // 2
+            y = int(particle.y + (particle.vy + particle.gravity * age / 2) * age) - height // 2
+            left = min(left, x)
+            top = min(top, y)
+            right = max(right, x + width)
+            bottom = max(bottom, y + height)
+        self.rect.update(left, top, right - left, bottom - top)
+        return self.rect
+
+    def draw(self, screen: pygame.Surface, now: float):
+        """Все живые частицы одним screen.blits() без возврата прямоугольников"""
+        if not self.active:
+            return
+        particles = self.particles
+        blits = self._blits
+        for i in range(self.active):
+            particle = particles[i]
+            age = now - particle.born
+            frames = particle.frames
+            frame = frames[min(len(frames) - 1, int(age / particle.life * len(frames)))]
+            entry = blits[i]
+            entry[0] = frame
+            rect = entry[1]
+            rect.x = int(particle.x + particle.vx * age) - frame.get_width() // 2
+            rect.y = int(particle.y + (particle.vy + particle.gravity * age / 2) * age) - frame.get_height() // 2
+        screen.blits(blits[:self.active], doreturn=False)
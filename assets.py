@@ -0,0 +1,175 @@
+"""Загрузка изображений: кэш масштабированных спрайтов и атлас.
+
+Масштабированные картинки сохраняются в .cache/assets в виде сырых RGBA
+байт. Ключ - хэш исходного файла и целевой размер, поэтому при замене
+PNG или смене размера кэш пересобирается сам. Спрайты персонажей
+собираются в один атлас в формате дисплея (convert_alpha), фоны
+переводятся в формат дисплея через convert().
+
+AssetLoader декодирует картинки в пуле потоков, чтобы первый кадр не
+ждал загрузки: готовые картинки забираются через poll() по мере готовности.
+"""
+import hashlib
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Hashable, Optional, Tuple
+
+import pygame
+
+ASSETS_DIR = "assets"
+CACHE_DIR = os.path.join(".cache", "assets")
+CACHE_VERSION = 1  # Увеличить при смене формата кэша
+
+# pygame < 2.1.3 не имеет tobytes/frombytes
+_to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+_from_bytes = getattr(pygame.image, "frombytes", None) or pygame.image.fromstring
+
+
+def file_hash(path: str) -> str:
+    """Хэш содержимого файла (ключ кэша)"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class AssetPipeline:
+    """Загрузчик изображений с дисковым кэшем масштабированных версий"""
+
+    def __init__(self, assets_dir: str = ASSETS_DIR, cache_dir: Optional[str] = CACHE_DIR):
+        self.assets_dir = assets_dir
+        self.cache_dir = cache_dir
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _cache_path(self, name: str, digest: str, size: Tuple[int, int]) -> str:
+        stem = os.path.splitext(os.path.basename(name))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{digest}-{size[0]}x{size[1]}-v{CACHE_VERSION}.rgba")
+
+    def load_scaled(self, name: str, size: Tuple[int, int]) -> pygame.Surface:
+        """Загрузить картинку размера size (из кэша, если есть)"""
+        source = os.path.join(self.assets_dir, name)
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"No file '{source}' found")
+        if self.cache_dir is None:
+            return pygame.transform.scale(pygame.image.load(source), size)
+
+        cache_path = self._cache_path(name, file_hash(source), size)
+        try:
+            with open(cache_path, "rb") as f:
+                data = f.read()
+            if len(data) == size[0] * size[1] * 4:
+                self.cache_hits += 1
+                return _from_bytes(data, size, "RGBA")
+        except OSError:
+            pass
+
+        self.cache_misses += 1
+        surface = pygame.transform.scale(pygame.image.load(source), size)
+        self._store(cache_path, _to_bytes(surface, "RGBA"))
+        return surface
+
+    def _store(self, cache_path: str, data: bytes):
+        """Атомарно записать файл кэша (ошибки записи не критичны)"""
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"[WARNING] Не удалось сохранить кэш изображения: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def load_background(self, name: str, size: Tuple[int, int]) -> pygame.Surface:
+        """Непрозрачный фон в формате дисплея"""
+        return self.load_scaled(name, size).convert()
+
+    def load_atlas(self, sprites: Dict[Hashable, Tuple[str, Tuple[int, int]]]) -> Dict[Hashable, pygame.Surface]:
+        """Загрузить спрайты {ключ: (файл, размер)} и упаковать их в один атлас.
+
+        Возвращает словарь подповерхностей атласа с теми же ключами.
+        """
+        surfaces = {key: self.load_scaled(name, size) for key, (name, size) in sprites.items()}
+        return pack_atlas(surfaces)
+
+
+class AssetLoader:
+    """Фоновая загрузка картинок через AssetPipeline.
+
+    Каждая картинка - отдельная задача: чтение, декодирование и
+    масштабирование идут в рабочих потоках, а перевод в формат дисплея -
+    в poll() на главном потоке. Отсутствующий или битый файл пропускается
+    с предупреждением и не мешает остальным.
+    """
+
+    def __init__(self, pipeline: AssetPipeline, workers: int = 2):
+        self.pipeline = pipeline
+        self.failed: Dict[Hashable, str] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self._pending: Dict[Hashable, Tuple[Future, bool]] = {}
+
+    def request(self, key: Hashable, name: str, size: Tuple[int, int], opaque: bool = False):
+        """Поставить картинку в очередь (opaque - фон без прозрачности)"""
+        self._pending[key] = (self._executor.submit(self.pipeline.load_scaled, name, size), opaque)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def poll(self, wait: bool = False) -> Dict[Hashable, pygame.Surface]:
+        """Картинки, загруженные с прошлого вызова (wait=True - дождаться всех)"""
+        ready = {}
+        for key, (future, opaque) in list(self._pending.items()):
+            if not wait and not future.done():
+                continue
+            del self._pending[key]
+            try:
+                surface = future.result()
+            except (OSError, pygame.error) as e:
+                print(f"[WARNING] Не удалось загрузить изображение: {e}")
+                self.failed[key] = str(e)
+                continue
+            ready[key] = surface.convert() if opaque else surface.convert_alpha()
+        return ready
+
+    def close(self):
+        """Остановить рабочие потоки (незагруженные картинки отменяются)"""
+        for future, _ in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+
+def pack_atlas(surfaces: Dict[Hashable, pygame.Surface], max_width: int = 2048,
+               padding: int = 1) -> Dict[Hashable, pygame.Surface]:
+    """Упаковать поверхности полками в один атлас формата дисплея"""
+    if not surfaces:
+        return {}
+
+    # Полочная упаковка: высокие спрайты первыми, ряды шириной до max_width
+    order = sorted(surfaces, key=lambda key: surfaces[key].get_height(), reverse=True)
+    positions = {}
+    x = y = shelf_height = atlas_width = 0
+    for key in order:
+        w, h = surfaces[key].get_size()
+        if x > 0 and x + w > max_width:
+            y += shelf_height + padding
+            x = shelf_height = 0
+        positions[key] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+        atlas_width = max(atlas_width, x)
+    atlas_height = y + shelf_height
+
+    atlas = pygame.Surface((atlas_width, atlas_height), pygame.SRCALPHA)
+    for key, pos in positions.items():
+        atlas.blit(surfaces[key], pos)
+    atlas = atlas.convert_alpha()
+
+    return {key: atlas.subsurface(pygame.Rect(pos, surfaces[key].get_size()))
+            for key, pos in positions.items()}
@@ -0,0 +1,200 @@
+"""Векторизованный Монте-Карло для подбора сложности.
+
+N независимых раундов хранятся как массивы NumPy (таймеры, активность,
+очки) и продвигаются синхронно по тикам - те же правила, что
+ExamSimulation.step(), но без цикла по объектам.
+
+Пример:
+    python batch_sim.py --rounds 100000 --policy threshold
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from simulation import (
+    ACTIVITY_POINTS, DIFFICULTY_SETTINGS, POLICY_NAMES, SIM_FPS,
+    StudentActivity, StudentModel, make_policy,
+)
+
+NORMAL = StudentActivity.NORMAL.value
+
+# Таблицы по коду активности (StudentActivity.value) для fancy-индексации
+_max_code = max(a.value for a in StudentActivity)
+DURATION_TABLE = np.zeros(_max_code + 1, dtype=np.int16)
+POINTS_TABLE = np.zeros(_max_code + 1, dtype=np.int32)
+for _activity in StudentActivity:
+    DURATION_TABLE[_activity.value] = StudentModel.ACTIVITY_DURATIONS[_activity]
+    POINTS_TABLE[_activity.value] = ACTIVITY_POINTS[_activity]
+
+
+class BatchState:
+    """Состояние N раундов в виде массивов (передаётся в policy.batch)"""
+
+    def __init__(self, rounds: int):
+        self.activity = np.full(rounds, NORMAL, dtype=np.int8)
+        self.activity_timer = np.zeros(rounds, dtype=np.int16)
+        self.activity_duration = np.zeros(rounds, dtype=np.int16)
+        self.look_timer = np.zeros(rounds, dtype=np.int16)
+        self.look_duration = np.zeros(rounds, dtype=np.int16)
+        self.looking = np.zeros(rounds, dtype=bool)
+        self.score = np.zeros(rounds, dtype=np.int32)
+        self.alive = np.ones(rounds, dtype=bool)
+        self.end_tick = np.zeros(rounds, dtype=np.int32)
+        self.time_remaining = 0
+        self.game_time = 0
+
+
+@dataclass
+class BatchResult:
+    """Итоги серии раундов одной сложности"""
+    scores: np.ndarray
+    caught: np.ndarray
+    end_tick: np.ndarray
+    elapsed: float
+
+    @property
+    def rounds(self) -> int:
+        return len(self.scores)
+
+    def summary(self) -> dict:
+        """Выживаемость, распределение очков и ожидаемые очки"""
+        scores = self.scores
+        p5, p50, p95 = np.percentile(scores, [5, 50, 95])
+        return {
+            "rounds": self.rounds,
+            "survival_rate": float(1.0 - self.caught.mean()),
+            "mean_score": float(scores.mean()),
+            "std_score": float(scores.std()),
+            "p5": float(p5),
+            "p50": float(p50),
+            "p95": float(p95),
+            "max_score": int(scores.max()),
+            "mean_ticks": float(self.end_tick.mean()),
+        }
+
+
+def _schedule(state: BatchState, idx: np.ndarray, rng: np.random.Generator):
+    """Векторный аналог ExamSimulation.schedule_teacher_actions для раундов idx"""
+    state.look_timer[idx] = rng.integers(2, 6, size=len(idx)) * SIM_FPS
+    state.look_duration[idx] = rng.integers(60, 181, size=len(idx))
+
+
+def simulate_batch(rounds: int, time_limit: int, chance: float, policy=None,
+                   seed: Optional[int] = None) -> BatchResult:
+    """Прогнать rounds раундов параллельно.
+
+    time_limit - длительность раунда в секундах, chance - шанс взгляда в %.
+    """
+    rng = np.random.default_rng(seed)
+    state = BatchState(rounds)
+    state.time_remaining = time_limit * SIM_FPS
+    _schedule(state, np.arange(rounds), rng)
+
+    activity = state.activity
+    timer = state.activity_timer
+    duration = state.activity_duration
+    look_timer = state.look_timer
+    look_duration = state.look_duration
+    alive = state.alive
+    threshold = chance / 100.0
+    started = time.perf_counter()
+
+    while True:
+        # Нажатия игрока (до тика, как события мыши перед update())
+        if policy is not None:
+            actions = policy.batch(state)
+            if actions is not None:
+                actions = np.asarray(actions)
+                cancel = alive & (actions == NORMAL)
+                if cancel.any():
+                    activity[cancel] = NORMAL
+                    duration[cancel] = 0
+                    timer[cancel] = 0
+                start = np.flatnonzero(alive & (actions > NORMAL) & (activity == NORMAL))
+                if len(start):
+                    codes = actions[start]
+                    activity[start] = codes
+                    timer[start] = 0
+                    duration[start] = DURATION_TABLE[codes]
+
+        # Прогресс активностей и начисление очков
+        busy = duration > 0
+        progressing = busy & (timer < duration)
+        timer += progressing
+        done = np.flatnonzero(busy & ~progressing & alive)
+        if len(done):
+            state.score[done] += POINTS_TABLE[activity[done]]
+            activity[done] = NORMAL
+            timer[done] = 0
+            duration[done] = 0
+
+        state.time_remaining -= 1
+        state.game_time += 1
+        if state.time_remaining <= 0:
+            state.end_tick[alive] = state.game_time
+            break
+
+        # Учитель: обратный отсчёт или окно взгляда с бросками
+        counting = look_timer > 0
+        look_timer -= counting
+        window = np.flatnonzero(~counting & alive)
+        if len(window):
+            looks = window[rng.random(len(window)) < threshold]
+            if len(looks):
+                state.looking[looks] = True
+                caught = looks[duration[looks] > 0]
+                if len(caught):
+                    alive[caught] = False
+                    state.end_tick[caught] = state.game_time
+                    if not alive.any():
+                        break
+                    window = window[alive[window]]
+            ending = look_duration[window] == 0
+            look_duration[window[~ending]] -= 1
+            finished = window[ending]
+            if len(finished):
+                state.looking[finished] = False
+                _schedule(state, finished, rng)
+
+    return BatchResult(state.score, ~alive, state.end_tick, time.perf_counter() - started)
+
+
+def evaluate_difficulties(rounds: int, policy=None, seed: Optional[int] = None,
+                          settings: Optional[dict] = None) -> dict:
+    """Сводка simulate_batch для каждой Difficulty"""
+    settings = settings if settings is not None else DIFFICULTY_SETTINGS
+    seeds = np.random.SeedSequence(seed).spawn(len(settings))
+    report = {}
+    for child, (difficulty, params) in zip(seeds, settings.items()):
+        result = simulate_batch(rounds, params["time"], params["chance"], policy, seed=child)
+        report[difficulty] = result
+    return report
+
+
+def main(argv=None):
+    """Оценить все уровни сложности для выбранной политики"""
+    parser = argparse.ArgumentParser(description="Монте-Карло оценка уровней сложности")
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--policy", choices=POLICY_NAMES, default="threshold")
+    parser.add_argument("--activity", choices=[a.name.lower() for a in StudentActivity], default="cheat")
+    parser.add_argument("--threshold", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    policy = make_policy(args.policy, StudentActivity[args.activity.upper()], args.threshold)
+    report = evaluate_difficulties(args.rounds, policy, args.seed)
+
+    print(f"{'Сложность':<12}{'выжил':>8}{'ср.очки':>10}{'std':>8}{'p5':>6}{'p50':>6}{'p95':>6}{'время':>9}")
+    for difficulty, result in report.items():
+        s = result.summary()
+        print(f"{difficulty.name:<12}{s['survival_rate']:>8.1%}{s['mean_score']:>10.2f}{s['std_score']:>8.2f}"
+              f"{s['p5']:>6.0f}{s['p50']:>6.0f}{s['p95']:>6.0f}{result.elapsed:>8.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
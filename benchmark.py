@@ -0,0 +1,286 @@
+"""Бенчмарк отрисовки всех экранов игры без окна.
+
+Каждый сценарий (меню, правила, игра с каждой активностью студента,
+Game Over, победа, игра с анимациями и частицами, экзаменационный зал)
+прогоняется N кадров на dummy-драйвере SDL с полной перерисовкой кадра.
+Замеряются кадры в секунду, выделения памяти на кадр, блоки, оставшиеся
+занятыми после кадра (утечки), и пик памяти (tracemalloc). Выделения
+считаются выборкой внутри кадра: на каждом вызове и возврате функции
+читается sys.getallocatedblocks() и суммируется прирост. Объект, созданный
+и освобождённый между двумя соседними вызовами, в счёт не попадает, так
+что это оценка снизу. Трасса профилировщика на время замеров отключена,
+иначе её буфер растёт с каждым кадром и попадает в замер памяти.
+Результаты сравниваются с benchmark_baseline.json с допуском.
+
+Пример:
+    python benchmark.py                    # сравнить с базовой линией
+    python benchmark.py --update-baseline  # записать новую базовую линию
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+# Без окна и звука: работает на headless Linux
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from assets import pack_atlas  # noqa: E402
+from check_animations import PLAYER_SIZE, TEACHER_SIZE, generated_sheet  # noqa: E402
+from hall import ExamHall  # noqa: E402
+from hall_view import HallView  # noqa: E402
+from main import PLAYER_ANIMATIONS, TEACHER_ANIMATIONS, Game, GameState  # noqa: E402
+from simulation import DIFFICULTY_SETTINGS, Difficulty, StudentActivity  # noqa: E402
+
+BASELINE_FILE = "benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.25
+
+
+def setup_menu(game: Game, state: GameState):
+    game.state = state
+    if state == GameState.DIFFICULTY_MENU:
+        game.create_difficulty_buttons()
+    elif state == GameState.RULES_MENU:
+        game.create_rules_buttons()
+    else:
+        game.create_menu_buttons()
+
+
+def setup_game(game: Game, activity: StudentActivity):
+    game.difficulty = Difficulty.EASY
+    # Раунд не должен закончиться посреди замера: учитель не смотрит, время почти бесконечно
+    easy = dict(DIFFICULTY_SETTINGS[Difficulty.EASY], time=10 ** 6, chance=0)
+    game.sim.settings = {**DIFFICULTY_SETTINGS, Difficulty.EASY: easy}
+    game.start_game()
+    game.sim.apply_action(activity)
+
+
+def setup_final(game: Game, state: GameState):
+    setup_game(game, StudentActivity.NORMAL)
+    game.draw()
+    game.state = state
+
+
+def setup_animated(game: Game):
+    """Игра с анимациями из сгенерированных листов (в assets листов нет) и частицами.
+
+    Правильность анимаций проверяет check_animations.py, здесь - только
+    скорость: учитель то смотрит, то нет, частицы запускаются каждые
+    несколько кадров (tick_animated).
+    """
+    setup_game(game, StudentActivity.NORMAL)
+    sheets = {("sheet", key): generated_sheet(PLAYER_SIZE, spec.frames) for key, spec in PLAYER_ANIMATIONS.items()}
+    sheets.update({("sheet", key): generated_sheet(TEACHER_SIZE, spec.frames)
+                   for key, spec in TEACHER_ANIMATIONS.items()})
+    sprites = pack_atlas(sheets)
+    game.player_animations = game.build_animations(sprites, PLAYER_ANIMATIONS)
+    game.teacher_animations = game.build_animations(sprites, TEACHER_ANIMATIONS)
+
+
+def tick_animated(game: Game):
+    game.update()
+    if game.student.current_activity != StudentActivity.NORMAL:
+        game.sim.apply_action(StudentActivity.NORMAL)
+    frame = game.sim.game_time  # Один тик на кадр
+    if frame % 20 == 0:
+        game.teacher.looking_at_student = not game.teacher.looking_at_student
+    if frame % 4 == 0:
+        teacher = game.teacher
+        game.particles.spawn(game.spark_frames, teacher.x - 80, teacher.y - 80, 60, -60,
+                             game.animation_time(), 0.5, 300)
+
+
+def setup_hall(game: Game, students: int):
+    """Зал с камерой, которая ездит по диагонали; возвращает свой кадр вместо game.draw()"""
+    hall = ExamHall(students, 8, seed=1)
+    view = HallView(hall, game.screen)
+    step = [7, 5]
+
+    def frame():
+        hall.step()
+        before = view.camera.topleft
+        view.move_camera(*step)
+        # Упёрлись в край зала - разворот
+        if view.camera.x == before[0]:
+            step[0] = -step[0]
+        if view.camera.y == before[1]:
+            step[1] = -step[1]
+        view.draw(0.5)
+    return frame
+
+
+def build_scenarios():
+    """Имя сценария -> (подготовка, тик кадра).
+
+    Подготовка может вернуть собственную функцию кадра - тогда она
+    заменяет обычный кадр игры.
+    """
+    scenarios = {
+        "main_menu": (lambda g: setup_menu(g, GameState.MAIN_MENU), None),
+        "difficulty_menu": (lambda g: setup_menu(g, GameState.DIFFICULTY_MENU), None),
+        "rules_menu": (lambda g: setup_menu(g, GameState.RULES_MENU), None),
+    }
+    for activity in StudentActivity:
+        def setup(g, activity=activity):
+            setup_game(g, activity)
+
+        def tick(g, activity=activity):
+            g.update()
+            # Активность закончилась - начать заново, чтобы спрайт не менялся
+            if g.student.current_activity != activity:
+                g.sim.apply_action(activity)
+        scenarios[f"game_{activity.name.lower()}"] = (setup, tick)
+    scenarios["game_over"] = (lambda g: setup_final(g, GameState.GAME_OVER), None)
+    scenarios["win"] = (lambda g: setup_final(g, GameState.WIN), None)
+    scenarios["game_animated"] = (setup_animated, tick_animated)
+    scenarios["hall_500"] = (lambda g: setup_hall(g, 500), None)
+    return scenarios
+
+
+def count_allocations(frame, frames: int) -> float:
+    """Выделений блоков памяти на кадр: прирост sys.getallocatedblocks() между событиями профилировщика"""
+    blocks = sys.getallocatedblocks
+    state = [0, 0]  # Блоков на прошлом событии, сумма приростов
+
+    def hook(_frame, event, _arg):
+        # Событие call создаёт объект кадра вызванной функции - это выделение самого замера
+        delta = blocks() - state[0] - (event == "call")
+        if delta > 0:
+            state[1] += delta
+        state[0] = blocks()
+
+    state[0] = blocks()
+    sys.setprofile(hook)
+    try:
+        for _ in range(frames):
+            frame()
+    finally:
+        sys.setprofile(None)
+    return state[1] / frames
+
+
+def run_scenario(game: Game, setup, tick, frames: int) -> dict:
+    """Прогнать сценарий: замер скорости, проход с tracemalloc, подсчёт выделений"""
+    custom_frame = setup(game)
+
+    def frame():
+        if tick is not None:
+            tick(game)
+        game.update_hover()
+        game.dirty.invalidate()  # Полная перерисовка - худший случай
+        game.draw()
+
+    if custom_frame is not None:
+        frame = custom_frame
+
+    for _ in range(10):  # Прогрев кэшей
+        frame()
+
+    # Трасса профилировщика копит события каждого кадра - в замерах её не должно быть
+    trace = game.profiler.trace
+    game.profiler.trace = deque(maxlen=0)
+    try:
+        started = time.perf_counter()
+        for _ in range(frames):
+            frame()
+        elapsed = time.perf_counter() - started
+
+        # Циклический мусор ждёт сборщика и иначе считался бы оставшимися блоками
+        gc.collect()
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        for _ in range(frames):
+            frame()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        gc.collect()
+        blocks_after = sys.getallocatedblocks()
+
+        allocations = count_allocations(frame, frames)
+    finally:
+        game.profiler.trace = trace
+
+    return {
+        "fps": round(frames / elapsed, 1),
+        "allocs_per_frame": round(allocations, 1),
+        "retained_blocks_per_frame": round((blocks_after - blocks_before) / frames, 2),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """Список регрессий относительно базовой линии"""
+    problems = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["fps"] < base["fps"] * (1 - tolerance):
+            problems.append(f"{name}: fps {current['fps']} < {base['fps']} (-{tolerance:.0%})")
+        # Небольшой абсолютный запас, чтобы шум в пару килобайт не считался регрессией
+        if current["peak_kb"] > base["peak_kb"] * (1 + tolerance) + 64:
+            problems.append(f"{name}: peak {current['peak_kb']} KB > {base['peak_kb']} KB (+{tolerance:.0%})")
+        allocs, base_allocs = current["allocs_per_frame"], base.get("allocs_per_frame")
+        if base_allocs is not None and allocs > base_allocs * (1 + tolerance) + 5:
+            problems.append(f"{name}: выделений на кадр {allocs} > {base_allocs}")
+        retained, base_retained = current["retained_blocks_per_frame"], base["retained_blocks_per_frame"]
+        if retained > max(base_retained, 0) * (1 + tolerance) + 1:
+            problems.append(f"{name}: оставшихся блоков на кадр {retained} > {base_retained}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк отрисовки экранов")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--only", default=None, help="сценарии через запятую")
+    args = parser.parse_args(argv)
+
+    game = Game()
+    game.poll_assets(wait=True)
+    # Бенчмарк не должен трогать рекорды и историю раундов игрока
+    game.finish_round = lambda outcome: None
+
+    scenarios = build_scenarios()
+    if args.only:
+        names = args.only.split(",")
+        scenarios = {name: scenarios[name] for name in names}
+
+    results = {}
+    for name, (setup, tick) in scenarios.items():
+        results[name] = run_scenario(game, setup, tick, args.frames)
+        r = results[name]
+        print(f"{name:<16}{r['fps']:>10.1f} fps{r['allocs_per_frame']:>10.1f} выдел./кадр"
+              f"{r['retained_blocks_per_frame']:>8.2f} ост. блоков/кадр{r['peak_kb']:>10.1f} KB")
+    pygame.quit()
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Базовая линия записана: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"[WARNING] Нет базовой линии {args.baseline} - запустите с --update-baseline")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    problems = compare(results, baseline, args.tolerance)
+    for problem in problems:
+        print(f"[REGRESSION] {problem}")
+    if not problems:
+        print("Регрессий нет")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Проверка покадровых анимаций на сгенерированных спрайт-листах.
+
+В assets листов нет, поэтому скрипт рисует их сам: кадр i каждого листа
+залит цветом frame_color(i). Листы сохраняются в PNG во временную копию
+assets и проходят весь путь игры: фоновая загрузка AssetPipeline, атлас,
+нарезка на кадры в build_animations(). Затем Animator проигрывает каждую
+анимацию и проверяет порядок кадров: повторяющаяся идёт по кругу,
+неповторяющаяся останавливается на последнем кадре.
+
+Пример:
+    python check_animations.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+# Без окна и звука: работает на headless Linux
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from animation import Animator  # noqa: E402
+from assets import ASSETS_DIR  # noqa: E402
+from main import PLAYER_ANIMATIONS, TEACHER_ANIMATIONS, Game  # noqa: E402
+
+PLAYER_SIZE = (220, 240)
+TEACHER_SIZE = (280, 330)
+
+
+def frame_color(i: int) -> tuple:
+    return (40 * i % 256, 120, 200, 255)
+
+
+def generated_sheet(size: tuple, count: int) -> pygame.Surface:
+    """Спрайт-лист из count кадров: кадр i залит цветом frame_color(i)"""
+    width, height = size
+    sheet = pygame.Surface((width * count, height), pygame.SRCALPHA)
+    for i in range(count):
+        sheet.fill(frame_color(i), (i * width, 0, width, height))
+    return sheet
+
+
+def check_animation(animations: dict, key, loop: bool) -> list:
+    """Ошибки проигрывания: Animator должен проходить кадры по порядку"""
+    animation = animations.get(key)
+    if animation is None:
+        return [f"{key}: анимация не собрана из листа"]
+    errors = []
+    count = len(animation.frames)
+    animator = Animator()
+    animator.update(animations, key, 0.0)
+    for i in range(count * 3):
+        index = animator.update(animations, key, (i + 0.5) / animation.fps)
+        expected = i % count if loop else min(i, count - 1)
+        frame = animator.sprite(animations)
+        color = frame.get_at((frame.get_width() // 2, frame.get_height() // 2))
+        if index != expected or color != frame_color(expected):
+            errors.append(f"{key}: шаг {i} - кадр {index} цвета {tuple(color)}, ожидался {expected}")
+    return errors
+
+
+def main() -> int:
+    assets_dir = tempfile.mkdtemp(prefix="animations-")
+    try:
+        # Копия assets со сгенерированными листами; кэш масштабирования не нужен
+        for name in os.listdir(ASSETS_DIR):
+            shutil.copy(os.path.join(ASSETS_DIR, name), assets_dir)
+        sheets = [(spec, PLAYER_SIZE) for spec in PLAYER_ANIMATIONS.values()]
+        sheets += [(spec, TEACHER_SIZE) for spec in TEACHER_ANIMATIONS.values()]
+        for spec, size in sheets:
+            pygame.image.save(generated_sheet(size, spec.frames), os.path.join(assets_dir, spec.name))
+
+        game = Game()
+        game.assets.pipeline.assets_dir = assets_dir
+        game.assets.pipeline.cache_dir = None
+        game.poll_assets(wait=True)
+
+        errors = []
+        for key, spec in PLAYER_ANIMATIONS.items():
+            errors += check_animation(game.player_animations, key, spec.loop)
+        for key, spec in TEACHER_ANIMATIONS.items():
+            errors += check_animation(game.teacher_animations, key, spec.loop)
+        pygame.quit()
+    finally:
+        shutil.rmtree(assets_dir, ignore_errors=True)
+
+    for error in errors:
+        print(f"[ERROR] {error}")
+    if not errors:
+        print(f"Анимаций проверено: {len(PLAYER_ANIMATIONS) + len(TEACHER_ANIMATIONS)}, ошибок нет")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
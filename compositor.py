@@ -0,0 +1,149 @@
+"""Экраны итогов (GAME_OVER, WIN) поверх последнего кадра игры.
+
+Game один раз снимает последний кадр раунда и накладывает на снимок
+эффекты post_effects() (размытие, тонировка, виньетка - одним проходом
+через NumPy/surfarray) и надписи. Дальше экран итогов - один blit готовой
+поверхности из Compositor. Переход от снимка к итогу - несколько заранее
+посчитанных кадров плавного перехода, которые показываются по времени и
+освобождаются после окончания анимации.
+
+NumPy импортируется при первом экране итогов, а не при запуске игры.
+Без NumPy эффекты заменяются средствами pygame: размытие - уменьшение и
+увеличение smoothscale, тонировка - полупрозрачная заливка, виньетки нет.
+"""
+import time
+from typing import Hashable, List, Optional, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+TRANSITION_TIME = 0.3    # Секунд на переход от снимка к экрану итогов
+TRANSITION_FRAMES = 6    # Заранее посчитанных кадров перехода (последний - сам итог)
+
+
+def _display_format(surface: pygame.Surface) -> pygame.Surface:
+    # Поверхность в формате экрана выводится blit'ом без преобразования пикселей
+    return surface.convert() if pygame.display.get_surface() is not None else surface
+
+
+def _numpy():
+    """Модуль numpy или None, если его нет (импорт - только при первом вызове)"""
+    try:
+        import numpy
+        import pygame.surfarray  # noqa: F401
+    except ImportError:
+        return None
+    return numpy
+
+
+def _box_blur(pixels, radius: int, axis: int):
+    """Среднее по окну 2*radius+1 вдоль оси через накопленные суммы"""
+    import numpy
+    window = 2 * radius + 1
+    pad = [(0, 0)] * pixels.ndim
+    pad[axis] = (radius + 1, radius)
+    sums = numpy.cumsum(numpy.pad(pixels, pad, mode="edge"), axis=axis, dtype=numpy.float32)
+    size = pixels.shape[axis]
+    upper = numpy.take(sums, numpy.arange(window, window + size), axis=axis)
+    lower = numpy.take(sums, numpy.arange(size), axis=axis)
+    return (upper - lower) / window
+
+
+def post_effects(surface: pygame.Surface, blur: int = 0, tint: Optional[Color] = None,
+                 tint_amount: float = 0.0, vignette: float = 0.0) -> pygame.Surface:
+    """Копия surface с эффектами: размытие радиуса blur, смешивание с цветом tint
+    в доле tint_amount (0..1), затемнение краёв (в углах яркость падает на долю vignette).
+
+    Размытие считается на уменьшенном вдвое кадре (два прохода прямоугольного
+    фильтра - почти гаусс) и растягивается обратно smoothscale.
+    """
+    size = surface.get_size()
+    width, height = size
+    numpy = _numpy()
+    if numpy is None:
+        result = surface.copy()
+        if blur > 0:
+            small = pygame.transform.smoothscale(surface, (max(1, width // blur), max(1, height // blur)))
+            result = pygame.transform.smoothscale(small, size)
+        if tint is not None and tint_amount > 0:
+            overlay = pygame.Surface(size)
+            overlay.fill(tint)
+            overlay.set_alpha(int(tint_amount * 255))
+            result.blit(overlay, (0, 0))
+        return _display_format(result)
+
+    if blur > 0:
+        half = pygame.transform.smoothscale(surface, (max(1, width // 2), max(1, height // 2)))
+        pixels = pygame.surfarray.array3d(half).astype(numpy.float32)
+        radius = max(1, blur // 2)
+        for _ in range(2):
+            pixels = _box_blur(_box_blur(pixels, radius, 0), radius, 1)
+        half = pygame.surfarray.make_surface(pixels.astype(numpy.uint8))
+        pixels = pygame.surfarray.array3d(pygame.transform.smoothscale(half, size)).astype(numpy.float32)
+    else:
+        pixels = pygame.surfarray.array3d(surface).astype(numpy.float32)
+    if tint is not None and tint_amount > 0:
+        pixels += (numpy.array(tint, dtype=numpy.float32) - pixels) * tint_amount
+    if vignette > 0:
+        x = numpy.linspace(-1.0, 1.0, width, dtype=numpy.float32)[:, None]
+        y = numpy.linspace(-1.0, 1.0, height, dtype=numpy.float32)[None, :]
+        pixels *= (1.0 - vignette * (x * x + y * y) / 2.0)[:, :, None]
+    return _display_format(pygame.surfarray.make_surface(numpy.clip(pixels, 0, 255).astype(numpy.uint8)))
+
+
+def crossfade(start: pygame.Surface, final: pygame.Surface, steps: int) -> List[pygame.Surface]:
+    """Кадры перехода start -> final; последний кадр - сам final"""
+    frames = []
+    overlay = final.copy()
+    for i in range(1, steps):
+        frame = start.copy()
+        overlay.set_alpha(int(255 * i / steps))
+        frame.blit(overlay, (0, 0))
+        frames.append(frame)
+    frames.append(final)
+    return frames
+
+
+class Compositor:
+    """Готовый экран итогов и заранее посчитанный переход к нему"""
+
+    def __init__(self, steps: int = TRANSITION_FRAMES, duration: float = TRANSITION_TIME):
+        self.steps = steps
+        self.duration = duration
+        self.key: Optional[Hashable] = None
+        self.result: Optional[pygame.Surface] = None
+        self._frames: List[pygame.Surface] = []
+        self._started = 0.0
+
+    def compose(self, key: Hashable, start: Optional[pygame.Surface], final: pygame.Surface):
+        """Запомнить итог final; если есть снимок start - подготовить переход от него"""
+        self.key = key
+        self.result = final
+        self._frames = crossfade(start, final, self.steps) if start is not None and self.steps > 1 else []
+        self._started = time.perf_counter()
+
+    def reset(self):
+        """Забыть итог (экран итогов закрыт)"""
+        self.key = None
+        self.result = None
+        self._frames = []
+
+    @property
+    def animating(self) -> bool:
+        return bool(self._frames)
+
+    def index(self) -> int:
+        """Номер показываемого кадра перехода; после перехода кадры освобождаются"""
+        if not self._frames:
+            return self.steps
+        index = int((time.perf_counter() - self._started) / self.duration * len(self._frames))
+        if index >= len(self._frames):
+            self._frames = []
+            return self.steps
+        return index
+
+    def current(self) -> pygame.Surface:
+        """Поверхность для вывода: кадр перехода или готовый итог"""
+        index = self.index()
+        return self._frames[index] if self._frames else self.result
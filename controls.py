@@ -0,0 +1,179 @@
+"""Ввод для мобильного макета 540x960.
+
+InputLayer раз в кадр забирает всю очередь событий SDL и сворачивает её
+в один InputFrame:
+- движения мыши и пальцев схлопываются до последней позиции указателя;
+- левая кнопка мыши срабатывает сразу при нажатии (как раньше);
+- касание пальцем - жест: короткое касание без сдвига - тап (срабатывает
+  при отпускании), удержание дольше HOLD_TIME - hold, тап после него не
+  срабатывает. Пальцы отслеживаются независимо (мультитач);
+- синтетические события мыши, которые SDL делает из касаний, отбрасываются.
+
+ButtonIndex раскладывает кнопки по клеткам сетки, так что попадание
+указателя проверяется по одной клетке, а не по всем кнопкам.
+
+Задержка ввода - от момента, когда событие забрано из очереди, до вывода
+кадра с результатом; p50/p95 показываются в оверлее F3 (задержку внутри
+очереди SDL pygame не сообщает).
+"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+HOLD_TIME = 0.5  # Секунд до удержания
+TAP_SLOP = 24    # На сколько пикселей палец может сдвинуться, оставаясь тапом
+CELL_SIZE = 40   # Клетка индекса кнопок
+
+NO_POINTER = (-1, -1)  # Указателя нет (палец отпущен) - ничего не подсвечено
+
+# События, после которых окно нужно перерисовать целиком
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, getattr(pygame, "WINDOWEXPOSED", pygame.VIDEOEXPOSE))
+
+# Остальные события SDL не кладёт в очередь вовсе
+ALLOWED_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+                  pygame.FINGERDOWN, pygame.FINGERMOTION, pygame.FINGERUP) + EXPOSE_EVENTS
+
+
+@dataclass
+class InputFrame:
+    """Ввод за один кадр"""
+    quit: bool = False
+    expose: bool = False
+    keys: List[int] = field(default_factory=list)
+    # Срабатывания (клик или тап): позиция и время, когда событие забрано из очереди
+    presses: List[Tuple[Tuple[int, int], float]] = field(default_factory=list)
+    holds: List[Tuple[int, int]] = field(default_factory=list)
+    pointer: Optional[Tuple[int, int]] = None  # Новая позиция указателя, если он двигался
+
+
+class _Finger:
+    __slots__ = ("x", "y", "start_x", "start_y", "started", "held")
+
+    def __init__(self, x: int, y: int, started: float):
+        self.x = self.start_x = x
+        self.y = self.start_y = y
+        self.started = started
+        self.held = False
+
+    @property
+    def moved(self) -> bool:
+        return abs(self.x - self.start_x) > TAP_SLOP or abs(self.y - self.start_y) > TAP_SLOP
+
+
+class InputLayer:
+    """Очередь событий -> InputFrame, жесты касаний и замер задержки"""
+
+    def __init__(self, size: Tuple[int, int], history: int = 120):
+        self.size = size
+        self.fingers: Dict[Tuple[int, int], _Finger] = {}
+        self.latencies: Deque[float] = deque(maxlen=history)
+        self._waiting: List[float] = []  # Срабатывания, ещё не показанные на экране
+        self._stashed: List[pygame.event.Event] = []  # Событие, разбудившее wait()
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(ALLOWED_EVENTS))
+
+    def _finger_pos(self, event) -> Tuple[int, int]:
+        # Координаты пальца нормированы на окно (0..1), а холст в окне может
+        # быть увеличен и (во весь экран) окружён полями
+        window_w, window_h = pygame.display.get_window_size()
+        width, height = self.size
+        scale = min(window_w / width, window_h / height)
+        x = (event.x * window_w - (window_w - width * scale) / 2) / scale
+        y = (event.y * window_h - (window_h - height * scale) / 2) / scale
+        return int(x), int(y)
+
+    def poll(self) -> InputFrame:
+        """Забрать все события кадра"""
+        now = time.perf_counter()
+        frame = InputFrame()
+        events = pygame.event.get()
+        if self._stashed:
+            events = self._stashed + events
+            self._stashed = []
+        for event in events:
+            kind = event.type
+            if kind == pygame.MOUSEMOTION:
+                if not getattr(event, "touch", False):
+                    frame.pointer = event.pos
+            elif kind == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1 and not getattr(event, "touch", False):
+                    frame.pointer = event.pos
+                    frame.presses.append((event.pos, now))
+            elif kind == pygame.FINGERDOWN:
+                pos = self._finger_pos(event)
+                self.fingers[(event.touch_id, event.finger_id)] = _Finger(pos[0], pos[1], now)
+                frame.pointer = pos
+            elif kind == pygame.FINGERMOTION:
+                finger = self.fingers.get((event.touch_id, event.finger_id))
+                if finger is not None:
+                    finger.x, finger.y = self._finger_pos(event)
+                    frame.pointer = (finger.x, finger.y)
+            elif kind == pygame.FINGERUP:
+                finger = self.fingers.pop((event.touch_id, event.finger_id), None)
+                if finger is not None:
+                    finger.x, finger.y = self._finger_pos(event)
+                    if not finger.held and not finger.moved:
+                        frame.presses.append(((finger.x, finger.y), now))
+                if not self.fingers:
+                    frame.pointer = NO_POINTER
+            elif kind == pygame.KEYDOWN:
+                frame.keys.append(event.key)
+            elif kind == pygame.QUIT:
+                frame.quit = True
+            elif kind in EXPOSE_EVENTS:
+                frame.expose = True
+
+        for finger in self.fingers.values():
+            if not finger.held and not finger.moved and now - finger.started >= HOLD_TIME:
+                finger.held = True
+                frame.holds.append((finger.x, finger.y))
+        self._waiting.extend(received for _, received in frame.presses)
+        return frame
+
+    def wait(self, timeout: int):
+        """Спать до первого события или timeout мс; событие разберёт следующий poll()"""
+        event = pygame.event.wait(timeout)
+        if event.type != pygame.NOEVENT:
+            self._stashed.append(event)
+
+    def frame_presented(self):
+        """Кадр выведен на экран: срабатывания этого кадра получили отклик"""
+        if self._waiting:
+            now = time.perf_counter()
+            self.latencies.extend(now - received for received in self._waiting)
+            self._waiting.clear()
+
+    def latency_line(self) -> str:
+        """Строка оверлея: задержка ввода p50/p95"""
+        if not self.latencies:
+            return "input: -"
+        samples = sorted(self.latencies)
+        p50 = samples[len(samples) // 2] * 1000
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+        return f"input p50 {p50:.1f}  p95 {p95:.1f} ms ({len(samples)})"
+
+
+class ButtonIndex:
+    """Кнопки по клеткам сетки для поиска кнопки под указателем"""
+
+    def __init__(self, buttons: Sequence, cell_size: int = CELL_SIZE):
+        self.buttons = buttons
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], list] = {}
+        for button in buttons:
+            rect = button.rect
+            for cy in range(rect.top // cell_size, (rect.bottom - 1) // cell_size + 1):
+                for cx in range(rect.left // cell_size, (rect.right - 1) // cell_size + 1):
+                    self.cells.setdefault((cx, cy), []).append(button)
+
+    def hit(self, pos: Tuple[int, int]):
+        """Кнопка под точкой pos или None"""
+        bucket = self.cells.get((pos[0] // self.cell_size, pos[1] // self.cell_size))
+        if bucket:
+            for button in bucket:
+                if button.rect.collidepoint(pos):
+                    return button
+        return None
@@ -0,0 +1,275 @@
+"""Экзаменационный зал: много студентов и преподавателей.
+
+Как и simulation.py, модуль не импортирует pygame. Студенты сидят за
+партами рядами и сами начинают активности (списать, поиграть, поспать,
+поесть), но не тогда, когда на них смотрят. Преподаватели ходят по залу,
+останавливаются и смотрят в одну сторону: кто занят чем-то запрещённым
+внутри конуса обзора - пойман.
+
+Зал событийный, как ExamSimulation: начало и конец активностей, начало и
+конец взглядов лежат в одной очереди (heapq), поэтому тик стоит столько,
+сколько в нём событий, а не сколько в зале людей. Студенты разложены по
+равномерной сетке (UniformGrid), и конус обзора проверяет только
+студентов из клеток рядом с преподавателем.
+
+Пример:
+    python hall.py --students 500 --teachers 8 --seconds 60
+"""
+import argparse
+import heapq
+import math
+import random
+import sys
+import time
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from simulation import ACTIVITY_POINTS, SIM_FPS, StudentActivity, StudentModel
+
+# Активности, которые студенты зала выбирают сами
+HALL_ACTIVITIES = (StudentActivity.CHEAT, StudentActivity.GAMES, StudentActivity.SLEEP, StudentActivity.EAT)
+
+DESK_SPACING = (64, 76)  # Шаг парт по x и y (пиксели мира)
+HALL_MARGIN = 80         # Проход вдоль стен
+SIGHT_RANGE = 230        # Дальность обзора преподавателя
+SIGHT_ANGLE = 70         # Ширина конуса обзора в градусах
+TEACHER_SPEED = 90       # Скорость ходьбы (пикселей в секунду)
+
+
+class HallEvent(IntEnum):
+    """События зала; при совпадении тиков обрабатываются в этом порядке"""
+    ACTIVITY_DONE = 0  # Студент закончил активность - очки
+    LOOK_END = 1       # Преподаватель перестал смотреть и идёт дальше
+    LOOK_START = 2     # Преподаватель дошёл до точки и смотрит
+    STUDENT_START = 3  # Студент решил чем-нибудь заняться
+
+
+class UniformGrid:
+    """Равномерная сетка для поиска точек в прямоугольнике.
+
+    Точка с координатами (x, y) попадает в клетку (x // cell, y // cell);
+    запрос перебирает только клетки, пересекающие прямоугольник.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def insert(self, item: int, x: float, y: float):
+        key = (int(x // self.cell_size), int(y // self.cell_size))
+        self.cells.setdefault(key, []).append(item)
+
+    def query_rect(self, left: float, top: float, right: float, bottom: float) -> Iterator[int]:
+        """Элементы из клеток, пересекающих прямоугольник (проверку точного попадания делает вызывающий)"""
+        size = self.cell_size
+        cells = self.cells
+        for cy in range(int(top // size), int(bottom // size) + 1):
+            for cx in range(int(left // size), int(right // size) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def query_radius(self, x: float, y: float, radius: float) -> Iterator[int]:
+        return self.query_rect(x - radius, y - radius, x + radius, y + radius)
+
+
+class HallStudent:
+    """Студент за партой"""
+    __slots__ = ("x", "y", "activity", "activity_end", "score", "caught")
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+        self.activity = StudentActivity.NORMAL
+        self.activity_end = 0
+        self.score = 0
+        self.caught = False
+
+    @property
+    def busy(self) -> bool:
+        return self.activity != StudentActivity.NORMAL
+
+
+class HallTeacher:
+    """Преподаватель: идёт из (from_x, from_y) в (x, y), затем смотрит в сторону facing"""
+    __slots__ = ("from_x", "from_y", "x", "y", "walk_start", "walk_end", "look_end", "facing", "looking")
+
+    def __init__(self, x: float, y: float):
+        self.from_x = self.x = x
+        self.from_y = self.y = y
+        self.walk_start = self.walk_end = 0
+        self.look_end = 0
+        self.facing = 0.0  # Направление взгляда в радианах
+        self.looking = False
+
+    def position(self, tick: float) -> Tuple[float, float]:
+        """Положение на (дробном) тике - между событиями считается, а не хранится"""
+        if tick >= self.walk_end or self.walk_end <= self.walk_start:
+            return self.x, self.y
+        t = max(0.0, (tick - self.walk_start) / (self.walk_end - self.walk_start))
+        return self.from_x + (self.x - self.from_x) * t, self.from_y + (self.y - self.from_y) * t
+
+    def sees(self, x: float, y: float, cos_half_angle: float) -> bool:
+        """Точка внутри конуса обзора (дальность проверяет вызывающий)"""
+        dx = x - self.x
+        dy = y - self.y
+        distance = math.hypot(dx, dy)
+        if distance == 0.0:
+            return True
+        return (dx * math.cos(self.facing) + dy * math.sin(self.facing)) / distance >= cos_half_angle
+
+
+class ExamHall:
+    """Зал из students студентов и teachers преподавателей"""
+
+    def __init__(self, students: int = 300, teachers: int = 6, seed: Optional[int] = None,
+                 tick_rate: int = SIM_FPS, sight_range: float = SIGHT_RANGE, sight_angle: float = SIGHT_ANGLE):
+        self.tick_rate = tick_rate
+        self.rng = random.Random(seed)
+        self.sight_range = sight_range
+        self.cos_half_angle = math.cos(math.radians(sight_angle) / 2)
+        self.durations = {activity: frames * tick_rate // SIM_FPS
+                          for activity, frames in StudentModel.ACTIVITY_DURATIONS.items()}
+
+        # Парты почти квадратным блоком
+        cols = max(1, math.ceil(math.sqrt(students * 1.2)))
+        rows = max(1, math.ceil(students / cols))
+        self.width = cols * DESK_SPACING[0] + 2 * HALL_MARGIN
+        self.height = rows * DESK_SPACING[1] + 2 * HALL_MARGIN
+        self.students = [HallStudent(HALL_MARGIN + (i % cols + 0.5) * DESK_SPACING[0],
+                                     HALL_MARGIN + (i // cols + 0.5) * DESK_SPACING[1])
+                         for i in range(students)]
+        # Клетка сетки - дальность обзора: конус задевает не больше 3x3 клеток
+        self.grid = UniformGrid(sight_range)
+        for i, student in enumerate(self.students):
+            self.grid.insert(i, student.x, student.y)
+        self.teachers = [HallTeacher(*self._random_point()) for _ in range(teachers)]
+
+        self.events: List[Tuple[int, HallEvent, int]] = []
+        self.game_time = 0
+        self.score = 0
+        self.caught = 0
+        self.busy = 0
+        self.events_processed = 0
+        for i in range(students):
+            self._schedule_student(i)
+        for i in range(teachers):
+            self._plan_walk(i)
+
+    def ticks(self, seconds: float) -> int:
+        return int(seconds * self.tick_rate)
+
+    def _random_point(self) -> Tuple[float, float]:
+        return (self.rng.uniform(HALL_MARGIN / 2, self.width - HALL_MARGIN / 2),
+                self.rng.uniform(HALL_MARGIN / 2, self.height - HALL_MARGIN / 2))
+
+    def _schedule_student(self, index: int):
+        """Студент отдыхает 1-6 секунд, потом пробует чем-нибудь заняться"""
+        delay = self.rng.randint(self.ticks(1), self.ticks(6))
+        heapq.heappush(self.events, (self.game_time + delay, HallEvent.STUDENT_START, index))
+
+    def _plan_walk(self, index: int):
+        """Преподаватель идёт к случайной точке зала"""
+        teacher = self.teachers[index]
+        teacher.from_x, teacher.from_y = teacher.x, teacher.y
+        teacher.x, teacher.y = self._random_point()
+        distance = math.hypot(teacher.x - teacher.from_x, teacher.y - teacher.from_y)
+        teacher.walk_start = self.game_time
+        teacher.walk_end = self.game_time + max(1, int(distance / TEACHER_SPEED * self.tick_rate))
+        heapq.heappush(self.events, (teacher.walk_end, HallEvent.LOOK_START, index))
+
+    def seen_by(self, student: HallStudent) -> bool:
+        """Смотрит ли на студента хоть один преподаватель"""
+        range_sq = self.sight_range ** 2
+        for teacher in self.teachers:
+            if (teacher.looking and (student.x - teacher.x) ** 2 + (student.y - teacher.y) ** 2 <= range_sq
+                    and teacher.sees(student.x, student.y, self.cos_half_angle)):
+                return True
+        return False
+
+    def _look(self, teacher: HallTeacher) -> int:
+        """Проверить конус обзора: пойманы все занятые студенты внутри. Возвращает число пойманных"""
+        students = self.students
+        range_sq = self.sight_range ** 2
+        caught = 0
+        for i in self.grid.query_radius(teacher.x, teacher.y, self.sight_range):
+            student = students[i]
+            if student.caught or not student.busy:
+                continue
+            if ((student.x - teacher.x) ** 2 + (student.y - teacher.y) ** 2 <= range_sq
+                    and teacher.sees(student.x, student.y, self.cos_half_angle)):
+                student.caught = True
+                student.activity_end = 0
+                caught += 1
+        self.caught += caught
+        self.busy -= caught
+        return caught
+
+    def advance(self, tick: int):
+        """Обработать все события до тика tick включительно"""
+        events = self.events
+        students = self.students
+        while events and events[0][0] <= tick:
+            event_tick, event, index = heapq.heappop(events)
+            self.game_time = event_tick
+            self.events_processed += 1
+            if event == HallEvent.ACTIVITY_DONE:
+                student = students[index]
+                if student.caught or student.activity_end != event_tick:
+                    continue
+                points = ACTIVITY_POINTS[student.activity]
+                student.score += points
+                self.score += points
+                student.activity = StudentActivity.NORMAL
+                self.busy -= 1
+                self._schedule_student(index)
+            elif event == HallEvent.STUDENT_START:
+                student = students[index]
+                if student.caught:
+                    continue
+                if self.seen_by(student):
+                    self._schedule_student(index)  # На него смотрят - подождать
+                    continue
+                student.activity = self.rng.choice(HALL_ACTIVITIES)
+                student.activity_end = event_tick + self.durations[student.activity]
+                self.busy += 1
+                heapq.heappush(events, (student.activity_end, HallEvent.ACTIVITY_DONE, index))
+            elif event == HallEvent.LOOK_START:
+                teacher = self.teachers[index]
+                teacher.looking = True
+                teacher.facing = self.rng.uniform(-math.pi, math.pi)
+                teacher.look_end = event_tick + self.rng.randint(self.ticks(1), self.ticks(3))
+                heapq.heappush(events, (teacher.look_end, HallEvent.LOOK_END, index))
+                self._look(teacher)
+            else:  # LOOK_END
+                self.teachers[index].looking = False
+                self._plan_walk(index)
+        self.game_time = tick
+
+    def step(self):
+        """Продвинуть зал на один тик"""
+        self.advance(self.game_time + 1)
+
+
+def main(argv=None):
+    """Прогнать зал без окна и вывести итоги"""
+    parser = argparse.ArgumentParser(description="Экзаменационный зал без окна")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--teachers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tick-rate", type=int, default=SIM_FPS)
+    args = parser.parse_args(argv)
+
+    hall = ExamHall(args.students, args.teachers, seed=args.seed, tick_rate=args.tick_rate)
+    started = time.perf_counter()
+    hall.advance(hall.ticks(args.seconds))
+    elapsed = time.perf_counter() - started
+    print(f"Студентов: {len(hall.students)}, преподавателей: {len(hall.teachers)}, зал {hall.width}x{hall.height}")
+    print(f"Поймано: {hall.caught}, очков: {hall.score}, заняты сейчас: {hall.busy}")
+    print(f"Событий: {hall.events_processed} за {elapsed:.3f} с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
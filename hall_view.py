@@ -0,0 +1,249 @@
+"""Окно экзаменационного зала (python main.py --hall 300).
+
+Зал больше экрана, камера двигается стрелками или перетаскиванием мышью.
+Каждый кадр:
+- пол и парты всего зала - один заранее собранный слой, из него
+  копируется только видимая часть;
+- студенты отбираются через UniformGrid зала (только клетки в кадре) и
+  выводятся одним вызовом Surface.blits();
+- конусы обзора рисуются на общем прозрачном слое и накладываются одним blit.
+"""
+import math
+import time
+from typing import List, Optional, Tuple
+
+import pygame
+
+from assets import AssetPipeline
+from hall import DESK_SPACING, ExamHall
+from profiler import FrameProfiler, draw_overlay
+from render import open_display, text_cache
+from simulation import SIM_FPS, StudentActivity
+
+STUDENT_SIZE = (40, 44)
+TEACHER_SIZE = (48, 56)
+MAX_FRAME_TIME = 0.25  # Как в Game.run(): защита от "спирали смерти"
+CAMERA_SPEED = 600     # Пикселей в секунду при прокрутке стрелками
+CONE_SEGMENTS = 8      # Отрезков на дугу конуса обзора
+
+FLOOR = (222, 214, 196)
+DESK = (180, 140, 100)
+DESK_EDGE = (120, 90, 60)
+CONE_COLOR = (220, 50, 50, 70)
+HUD_BACKGROUND = (23, 55, 94)
+WHITE = (255, 255, 255)
+
+STUDENT_FILES = {
+    StudentActivity.NORMAL: "player-sit.png",
+    StudentActivity.CHEAT: "player-cheating.png",
+    StudentActivity.GAMES: "player-game.png",
+    StudentActivity.SLEEP: "player-sleep.png",
+    StudentActivity.EAT: "player-eat.png",
+}
+TEACHER_FILES = {False: "enemy-sleep.png", True: "enemy-watch.png"}
+
+# Цвет резервной фигуры, если спрайта нет
+FALLBACK_COLORS = {
+    StudentActivity.NORMAL: (50, 100, 200),
+    StudentActivity.CHEAT: (255, 140, 0),
+    StudentActivity.GAMES: (50, 200, 50),
+    StudentActivity.SLEEP: (128, 128, 128),
+    StudentActivity.EAT: (255, 220, 0),
+}
+
+
+def fallback_figure(size: Tuple[int, int], color) -> pygame.Surface:
+    """Голова и туловище вместо спрайта"""
+    w, h = size
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.circle(surface, (255, 220, 177), (w // 2, h // 4), h // 5)
+    pygame.draw.rect(surface, color, (w // 4, h // 2 - 2, w // 2, h // 2))
+    return surface
+
+
+def tinted(surface: pygame.Surface, color) -> pygame.Surface:
+    """Копия спрайта, умноженная на цвет (пойманные студенты - красные)"""
+    result = surface.copy()
+    result.fill(color + (255,), special_flags=pygame.BLEND_RGBA_MULT)
+    return result
+
+
+class HallView:
+    """Отрисовка зала с камерой, отсечением и пакетным выводом спрайтов"""
+
+    def __init__(self, hall: ExamHall, screen: pygame.Surface, pipeline: Optional[AssetPipeline] = None):
+        self.hall = hall
+        self.screen = screen
+        self.camera = pygame.Rect((0, 0), screen.get_size())
+        self.camera.center = (hall.width // 2, hall.height // 2)
+        # Положение камеры дробное: при высоком FPS сдвиг за кадр меньше пикселя
+        self.camera_x, self.camera_y = float(self.camera.x), float(self.camera.y)
+        self.clamp_camera()
+        self.floor = self.build_floor()
+        pipeline = pipeline or AssetPipeline()
+        self.student_sprites = {activity: self.load_sprite(pipeline, name, STUDENT_SIZE, FALLBACK_COLORS[activity])
+                                for activity, name in STUDENT_FILES.items()}
+        self.caught_sprites = {activity: tinted(sprite, (255, 90, 90))
+                               for activity, sprite in self.student_sprites.items()}
+        self.teacher_sprites = {looking: self.load_sprite(pipeline, name, TEACHER_SIZE, (139, 69, 19))
+                                for looking, name in TEACHER_FILES.items()}
+        self.cones = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        self.font = text_cache.font(24)
+        self.visible_agents = 0
+
+    @staticmethod
+    def load_sprite(pipeline: AssetPipeline, name: str, size: Tuple[int, int], color) -> pygame.Surface:
+        try:
+            return pipeline.load_scaled(name, size).convert_alpha()
+        except (OSError, pygame.error) as e:
+            print(f"[WARNING] Не удалось загрузить изображение: {e}")
+            return fallback_figure(size, color)
+
+    def build_floor(self) -> pygame.Surface:
+        """Пол и парты всего зала одним слоем"""
+        hall = self.hall
+        floor = pygame.Surface((hall.width, hall.height)).convert()
+        floor.fill(FLOOR)
+        desk_w, desk_h = DESK_SPACING[0] - 14, 16
+        for student in hall.students:
+            desk = pygame.Rect(0, 0, desk_w, desk_h)
+            desk.midtop = (int(student.x), int(student.y + 6))
+            pygame.draw.rect(floor, DESK, desk)
+            pygame.draw.rect(floor, DESK_EDGE, desk, 1)
+        return floor
+
+    def clamp_camera(self):
+        """Не выпускать камеру за пределы зала; округляется только camera"""
+        camera = self.camera
+        self.camera_x = min(max(self.camera_x, 0.0), max(0, self.hall.width - camera.width))
+        self.camera_y = min(max(self.camera_y, 0.0), max(0, self.hall.height - camera.height))
+        camera.topleft = (round(self.camera_x), round(self.camera_y))
+
+    def move_camera(self, dx: float, dy: float):
+        self.camera_x += dx
+        self.camera_y += dy
+        self.clamp_camera()
+
+    def cone_points(self, x: float, y: float, facing: float) -> List[Tuple[float, float]]:
+        """Многоугольник конуса обзора в координатах экрана"""
+        hall = self.hall
+        half = math.acos(hall.cos_half_angle)
+        radius = hall.sight_range
+        points = [(x, y)]
+        for i in range(CONE_SEGMENTS + 1):
+            angle = facing - half + 2 * half * i / CONE_SEGMENTS
+            points.append((x + radius * math.cos(angle), y + radius * math.sin(angle)))
+        return points
+
+    def draw(self, alpha: float = 0.0):
+        screen = self.screen
+        camera = self.camera
+        hall = self.hall
+        screen.blit(self.floor, (0, 0), camera)
+
+        # Студенты: только из клеток сетки, попавших в кадр, одним blits()
+        w, h = STUDENT_SIZE
+        left = camera.x + w // 2
+        top = camera.y + h // 2
+        students = hall.students
+        normal, caught = self.student_sprites, self.caught_sprites
+        batch = []
+        for i in hall.grid.query_rect(camera.left - w, camera.top - h, camera.right + w, camera.bottom + h):
+            student = students[i]
+            sprites = caught if student.caught else normal
+            batch.append((sprites[student.activity], (student.x - left, student.y - top)))
+        screen.blits(batch, doreturn=False)
+        self.visible_agents = len(batch)
+
+        # Преподаватели и их конусы (положение интерполируется между тиками)
+        tick = hall.game_time + alpha
+        view = camera.inflate(2 * hall.sight_range, 2 * hall.sight_range)
+        teachers = []
+        cones = False
+        for teacher in hall.teachers:
+            x, y = teacher.position(tick)
+            if not view.collidepoint(x, y):
+                continue
+            x -= camera.x
+            y -= camera.y
+            teachers.append((self.teacher_sprites[teacher.looking],
+                             (x - TEACHER_SIZE[0] // 2, y - TEACHER_SIZE[1] // 2)))
+            if teacher.looking:
+                if not cones:
+                    self.cones.fill((0, 0, 0, 0))
+                    cones = True
+                pygame.draw.polygon(self.cones, CONE_COLOR, self.cone_points(x, y, teacher.facing))
+        if cones:
+            screen.blit(self.cones, (0, 0))
+        screen.blits(teachers, doreturn=False)
+        self.visible_agents += len(teachers)
+
+        self.draw_hud()
+
+    def draw_hud(self):
+        hall = self.hall
+        pygame.draw.rect(self.screen, HUD_BACKGROUND, (0, 0, self.screen.get_width(), 34))
+        text = (f"Студенты {len(hall.students)}  Поймано {hall.caught}  "
+                f"Очки {hall.score}  В кадре {self.visible_agents}")
+        self.screen.blit(text_cache.render(self.font, text, WHITE), (8, 8))
+
+
+def run_hall(students: int, teachers: int, size: Tuple[int, int], seed: Optional[int] = None,
+             sim_hz: int = SIM_FPS, render_fps: int = 60, fullscreen: bool = False) -> int:
+    """Открыть окно зала; стрелки или мышь - камера, F3 - профилировщик, Esc - выход"""
+    pygame.display.init()
+    screen, _ = open_display(size, fullscreen)
+    pygame.display.set_caption("UTM Cheating Simulator - экзаменационный зал")
+    hall = ExamHall(students, teachers, seed=seed, tick_rate=sim_hz)
+    view = HallView(hall, screen)
+    profiler = FrameProfiler(render_fps)
+    clock = pygame.time.Clock()
+    sim_step = 1.0 / sim_hz
+    accumulator = 0.0
+    previous = time.perf_counter()
+    profiler_lines: List[str] = []
+
+    running = True
+    while running:
+        profiler.begin_frame()
+        with profiler.section("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle_overlay()
+                elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+                    view.move_camera(-event.rel[0], -event.rel[1])
+
+        now = time.perf_counter()
+        frame_time = min(now - previous, MAX_FRAME_TIME)
+        previous = now
+        keys = pygame.key.get_pressed()
+        dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * CAMERA_SPEED * frame_time
+        dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * CAMERA_SPEED * frame_time
+        if dx or dy:
+            view.move_camera(dx, dy)
+
+        # Все накопившиеся тики за один вызов: зал обрабатывает только события
+        accumulator += frame_time
+        with profiler.section("update"):
+            ticks = int(accumulator / sim_step)
+            if ticks:
+                hall.advance(hall.game_time + ticks)
+                accumulator -= ticks * sim_step
+
+        with profiler.section("draw_hall"):
+            view.draw(accumulator / sim_step)
+        if profiler.overlay_visible:
+            if not profiler_lines or profiler.frames % 30 == 0:
+                profiler_lines = profiler.overlay_lines()
+            draw_overlay(screen, profiler_lines, view.font, text_cache.render, (8, 42))
+        with profiler.section("present"):
+            pygame.display.flip()
+        clock.tick(render_fps)
+
+    pygame.quit()
+    return 0
@@ -0,0 +1,218 @@
+"""История раундов в SQLite.
+
+Каждый законченный раунд - строка таблицы runs: сложность, исход, очки,
+длительность и активность, на которой студента поймали. Game только
+кладёт запись в очередь (record() не ждёт диск), а отдельный поток
+пишет всё накопившееся одной транзакцией: запись либо сохранена целиком,
+либо её нет. Индекс (difficulty, score) отдаёт лучшие раунды сложности
+без перебора всей таблицы.
+
+Пример:
+    python history.py --top 10 --difficulty hard
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from simulation import Difficulty, RoundOutcome, StudentActivity
+
+HISTORY_FILE = "runs.db"
+WRITE_ATTEMPTS = 3   # Попыток записать пачку раундов
+RETRY_DELAY = 0.2    # Секунд перед повтором (растёт с каждой попыткой)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    difficulty TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    activity TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (difficulty, score DESC);
+"""
+
+
+@dataclass
+class RunRecord:
+    """Итог одного раунда; activity - чем был занят студент, когда его поймали"""
+    difficulty: Difficulty
+    outcome: RoundOutcome
+    score: int
+    ticks: int
+    duration: float
+    activity: Optional[StudentActivity] = None
+    finished_at: float = 0.0
+    id: Optional[int] = None  # Номер строки в runs; выставляется писателем внутри транзакции
+
+    def row(self) -> tuple:
+        return (self.finished_at or time.time(), self.difficulty.name, self.outcome.name, self.score,
+                self.ticks, self.duration, self.activity.name if self.activity is not None else None)
+
+
+class RunHistory:
+    """Хранилище раундов с записью в фоновом потоке"""
+
+    def __init__(self, path: str = HISTORY_FILE):
+        self.path = path
+        self._queue: "queue.Queue[Optional[RunRecord]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.available = True
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        # WAL: чтение не ждёт записи, NORMAL - без fsync на каждую транзакцию
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, run: RunRecord):
+        """Поставить раунд в очередь записи (не блокирует кадр)"""
+        if not self.available:
+            return
+        if run.finished_at == 0.0:
+            run.finished_at = time.time()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="run-history", daemon=True)
+            self._thread.start()
+        self._queue.put(run)
+
+    def _writer(self):
+        try:
+            conn = self._connect()
+            conn.executescript(SCHEMA)  # Файл создаётся при первой записи
+        except sqlite3.Error as e:
+            # Файл не открыть - история в этой сессии не пишется
+            print(f"[WARNING] Не удалось открыть историю раундов: {e}")
+            self.available = False
+            return
+        unsaved: List[RunRecord] = []  # Пачка, которую не удалось записать, - уйдёт со следующей
+        try:
+            running = True
+            while running:
+                batch = unsaved + [self._queue.get()]
+                # Всё, что успело накопиться, - одной транзакцией
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in batch:
+                    running = False
+                    batch = [run for run in batch if run is not None]
+                unsaved = [] if not batch or self._write(conn, batch) else batch
+            if unsaved:
+                print(f"[WARNING] История раундов: не сохранено раундов - {len(unsaved)}")
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[RunRecord]) -> bool:
+        """Записать пачку одной транзакцией; при ошибке (например, база занята
+        читателем) транзакция откатывается и повторяется. False - не записано"""
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                with conn:  # Откат при исключении
+                    for run in batch:
+                        run.id = conn.execute(
+                            "INSERT INTO runs (finished_at, difficulty, outcome, score, ticks, duration, activity)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?)", run.row()).lastrowid
+                return True
+            except sqlite3.Error as e:
+                for run in batch:
+                    run.id = None  # Транзакция откатилась
+                if attempt == WRITE_ATTEMPTS:
+                    print(f"[WARNING] Не удалось сохранить историю раундов, повтор со следующим раундом: {e}")
+                    return False
+                print(f"[WARNING] Запись истории раундов не удалась, повтор: {e}")
+                time.sleep(RETRY_DELAY * attempt)
+
+    def close(self, timeout: float = 2.0):
+        """Дописать очередь и остановить поток"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        if not self.available or not os.path.exists(self.path):
+            return []
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[WARNING] Не удалось прочитать историю раундов: {e}")
+            return []
+
+    def best_score(self) -> int:
+        """Лучший счёт: максимум по каждой сложности отдельно - каждый берётся
+        из индекса (difficulty, score) одним поиском, без обхода таблицы"""
+        per_difficulty = " UNION ALL ".join(["SELECT MAX(score) AS best FROM runs WHERE difficulty = ?"]
+                                            * len(Difficulty))
+        rows = self._query(f"SELECT MAX(best) FROM ({per_difficulty})", tuple(d.name for d in Difficulty))
+        return (rows[0][0] or 0) if rows else 0
+
+    def top(self, difficulty: Difficulty, limit: int = 10) -> List[Tuple[int, str, float, float]]:
+        """Лучшие раунды сложности: (очки, исход, длительность, время окончания)"""
+        return self._query("SELECT score, outcome, duration, finished_at FROM runs WHERE difficulty = ?"
+                           " ORDER BY score DESC LIMIT ?", (difficulty.name, limit))
+
+    def last_id(self) -> int:
+        """Номер последней сохранённой строки (0 - раундов нет)"""
+        rows = self._query("SELECT MAX(id) FROM runs")
+        return (rows[0][0] or 0) if rows else 0
+
+    def last_run(self) -> Optional[Tuple[Difficulty, int]]:
+        """Сложность и очки последнего сохранённого раунда (None - раундов нет)"""
+        rows = self._query("SELECT difficulty, score FROM runs ORDER BY id DESC LIMIT 1")
+        return (Difficulty[rows[0][0]], rows[0][1]) if rows else None
+
+    def scores(self, difficulty: Optional[Difficulty] = None, up_to: Optional[int] = None) -> List[int]:
+        """Очки всех раундов (сложности difficulty или всех) по возрастанию;
+        up_to - только строки с id не больше него"""
+        where, params = [], []
+        if difficulty is not None:
+            where.append("difficulty = ?")
+            params.append(difficulty.name)
+        if up_to is not None:
+            where.append("id <= ?")
+            params.append(up_to)
+        condition = f" WHERE {' AND '.join(where)}" if where else ""
+        rows = self._query(f"SELECT score FROM runs{condition} ORDER BY score", tuple(params))
+        return [score for score, in rows]
+
+
+def main(argv=None):
+    """Показать лучшие раунды"""
+    parser = argparse.ArgumentParser(description="История раундов")
+    parser.add_argument("--db", default=HISTORY_FILE)
+    parser.add_argument("--difficulty", choices=[d.name.lower() for d in Difficulty], default=None)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"[ERROR] Нет файла истории {args.db}")
+        return 1
+    history = RunHistory(args.db)
+    difficulties = [Difficulty[args.difficulty.upper()]] if args.difficulty else list(Difficulty)
+    for difficulty in difficulties:
+        rows = history.top(difficulty, args.top)
+        print(f"{difficulty.name}: {len(history.scores(difficulty))} раундов")
+        for place, (score, outcome, duration, finished_at) in enumerate(rows, 1):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished_at))
+            print(f"{place:>4}. {score:>7} {outcome:<7} {duration:>6.1f} с  {when}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Таблица лидеров по истории раундов.
+
+Очки каждой сложности (и всех вместе) хранятся отсортированным массивом
+array("q"): место и процентиль - два bisect, O(log n), лучшие N - срез с
+конца. Новый раунд вставляется insort (сдвиг памяти, без пересортировки).
+На миллионе раундов это ~8 МБ на массив и микросекунды на запрос.
+
+Загрузка из history.py идёт в фоновом потоке: SQLite отдаёт очки уже
+упорядоченными по индексу (difficulty, score), массивы всех сложностей
+сливаются heapq.merge без сортировки. Загрузка читает строки до
+последнего id на момент старта; раунд, добавленный во время загрузки,
+досчитывается, только если писатель истории сохранил его позже (или ещё
+не сохранил) - иначе он уже пришёл из базы.
+"""
+import bisect
+import heapq
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from history import RunHistory, RunRecord
+from simulation import Difficulty
+
+
+class Leaderboard:
+    """Отсортированные очки раундов с запросами места и процентиля"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scores: Dict[Difficulty, array] = {difficulty: array("q") for difficulty in Difficulty}
+        self._all = array("q")
+        self._pending: List[RunRecord] = []  # Раунды, добавленные во время загрузки
+        self.last: Optional[Tuple[Difficulty, int]] = None  # Сложность и очки последнего раунда
+        self.ready = False
+
+    def load(self, history: RunHistory):
+        """Прочитать все раунды из истории (можно вызывать не из главного потока)"""
+        watermark = history.last_id()
+        scores = {difficulty: array("q", history.scores(difficulty, up_to=watermark)) for difficulty in Difficulty}
+        merged = array("q", heapq.merge(*scores.values()))
+        last = history.last_run()
+        with self._lock:
+            for run in self._pending:
+                # id выставляется до коммита: строка с id <= watermark уже прочитана из базы
+                if run.id is None or run.id > watermark:
+                    bisect.insort(scores[run.difficulty], run.score)
+                    bisect.insort(merged, run.score)
+            if self._pending:
+                last = (self._pending[-1].difficulty, self._pending[-1].score)
+            self._pending = []
+            self.last = last
+            self._scores = scores
+            self._all = merged
+            self.ready = True
+
+    def load_async(self, history: RunHistory) -> threading.Thread:
+        thread = threading.Thread(target=self.load, args=(history,), name="leaderboard", daemon=True)
+        thread.start()
+        return thread
+
+    def add(self, run: RunRecord):
+        """Учесть новый раунд (тот же объект, что передан в RunHistory.record())"""
+        with self._lock:
+            if not self.ready:
+                self._pending.append(run)
+            bisect.insort(self._scores[run.difficulty], run.score)
+            bisect.insort(self._all, run.score)
+            self.last = (run.difficulty, run.score)
+
+    def _array(self, difficulty: Optional[Difficulty]) -> array:
+        return self._all if difficulty is None else self._scores[difficulty]
+
+    def count(self, difficulty: Optional[Difficulty] = None) -> int:
+        return len(self._array(difficulty))
+
+    def top(self, difficulty: Optional[Difficulty] = None, limit: int = 10) -> List[int]:
+        """Лучшие limit очков по убыванию"""
+        scores = self._array(difficulty)
+        return list(reversed(scores[max(0, len(scores) - limit):]))
+
+    def rank(self, score: int, difficulty: Optional[Difficulty] = None) -> int:
+        """Место счёта score: 1 + число раундов с большим счётом"""
+        scores = self._array(difficulty)
+        return len(scores) - bisect.bisect_right(scores, score) + 1
+
+    def percentile(self, score: int, difficulty: Optional[Difficulty] = None) -> float:
+        """Доля раундов (в процентах) со счётом ниже score"""
+        scores = self._array(difficulty)
+        if not scores:
+            return 100.0
+        return bisect.bisect_left(scores, score) * 100.0 / len(scores)
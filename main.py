@@ -1,20 +1,40 @@
+import time
+
+# Начало отсчёта для --startup-profile (импорт pygame входит в этап "import")
+STARTUP_STARTED = time.perf_counter()
+
 import pygame
-import random
+import argparse
 import sys
 import json
 import os
+import math
+import threading
 from enum import Enum
-from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
-# Инициализация Pygame
-pygame.init()
-pygame.mixer.init()
+from animation import Animation, Animator, ParticlePool, SheetSpec, fade_frames, slice_sheet
+from assets import AssetLoader, AssetPipeline, pack_atlas
+from compositor import Compositor, post_effects
+from controls import NO_POINTER, ButtonIndex, InputLayer
+from history import RunHistory, RunRecord
+from leaderboard import Leaderboard
+from profiler import FrameGovernor, FrameProfiler, StartupTimer, draw_overlay
+from render import DirtyRegions, LayerCache, open_display, text_cache, vertical_gradient
+from simulation import (
+    ACTIVITY_POINTS, DIFFICULTY_SETTINGS, SIM_FPS, Difficulty, ExamSimulation,
+    RoundOutcome, RoundSession, StudentActivity, StudentModel, TeacherModel,
+)
+
+# Подсистемы SDL не запускаются при импорте: дисплей поднимает Game,
+# шрифты - text_cache.font(), звук - MusicManager при первом использовании
 
 # Константы - мобильный формат 9:16 (540x960)
 SCREEN_WIDTH = 540
 SCREEN_HEIGHT = 960
-FPS = 60
+FPS = SIM_FPS  # Частота отрисовки по умолчанию
+# Максимальный шаг реального времени за кадр (защита от "спирали смерти" после зависаний)
+MAX_FRAME_TIME = 0.25
 IS_MOBILE = True
 
 # Границы безопасной области для элементов (отступ от краев)
@@ -26,6 +46,46 @@ SAFE_BOTTOM = SCREEN_HEIGHT - SAFE_MARGIN
 SAFE_WIDTH = SAFE_RIGHT - SAFE_LEFT
 SAFE_HEIGHT = SAFE_BOTTOM - SAFE_TOP
 
+# Строка индикатора фоновой загрузки изображений
+LOADING_RECT = pygame.Rect(0, SCREEN_HEIGHT - 40, SCREEN_WIDTH, 30)
+
+# Таблица лидеров: строки прошлого раунда в главном меню, лучших очков под кнопкой сложности
+LAST_RUN_Y = 630
+TOP_SCORES = 3
+
+# Экран Game Over: радиус размытия последнего кадра, доля красного, затемнение углов
+GAME_OVER_BLUR = 4
+GAME_OVER_TINT = 200 / 255  # Как прежняя заливка RED с alpha 200
+GAME_OVER_VIGNETTE = 0.5
+
+# Покадровые анимации: если листа assets/<имя>-sheet.png нет, рисуется статичный спрайт
+PLAYER_ANIMATIONS = {
+    StudentActivity.NORMAL: SheetSpec("player-sit-sheet.png", 4, 4),
+    StudentActivity.CHEAT: SheetSpec("player-cheating-sheet.png", 6, 10),
+    StudentActivity.EAT: SheetSpec("player-eat-sheet.png", 6, 8),
+}
+# Поворот головы к студенту: проигрывается один раз и остаётся на последнем кадре
+TEACHER_ANIMATIONS = {
+    'watch': SheetSpec("enemy-turn-sheet.png", 5, 15, loop=False),
+}
+
+# Частицы: "+очки" над студентом и искры вокруг "!"
+POP_LIFE = 0.8     # Секунд
+POP_SPEED = -70    # Пикселей в секунду (вверх)
+SPARKS = 8
+SPARK_LIFE = 0.5
+SPARK_SPEED = 140
+SPARK_GRAVITY = 300
+
+# Кнопки игрового экрана -> активности
+GAME_ACTIONS = {
+    "cheat": StudentActivity.CHEAT,
+    "games": StudentActivity.GAMES,
+    "sleep": StudentActivity.SLEEP,
+    "eat": StudentActivity.EAT,
+    "normal": StudentActivity.NORMAL,
+}
+
 # Цвета
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -49,61 +109,117 @@ CREAM = (250, 248, 245)
 DARK_CREAM = (240, 235, 225)
 
 class MusicManager:
-    """Менеджер для управления музыкой в игре"""
+    """Менеджер для управления музыкой в игре.
+
+    Длинные треки (фон) не декодируются в память, а играют потоком через
+    pygame.mixer.music. Резидентными Sound остаются только короткие
+    стингеры (проигрыш, победа): они декодируются в фоновом потоке, а
+    пока не готовы - тоже играют потоком. Отсутствующий или битый файл
+    отключает только свой трек.
+    """
+    STREAMED = {"background": "game.mp3"}
+    STINGERS = {"game_over": "gameover.mp3", "win": "winer.mp3"}
+
     def __init__(self):
         self.music_folder = "mp3"
         self.current_music = None
-        self.background_music = None
         self.game_over_played = False
         self.win_played = False
-        
-        # Загружаем музыку
-        self.load_music()
+        self.sounds = {}  # Декодированные стингеры: трек -> Sound
+        self.unavailable = set()  # Треки, которые не удалось открыть
+        self.mixer_failed = False
+        self._lock = threading.Lock()
+        self._loader = None
     
-    def load_music(self):
-        """Загрузить все музыкальные файлы"""
+    def ensure_mixer(self) -> bool:
+        """Запустить звуковую подсистему при первом обращении"""
+        if not pygame.mixer.get_init() and not self.mixer_failed:
+            try:
+                pygame.mixer.init()
+            except pygame.error as e:
+                print(f"[WARNING] Звук недоступен: {e}")
+                self.mixer_failed = True
+        return bool(pygame.mixer.get_init())
+    
+    def _track_path(self, track: str) -> Optional[str]:
+        """Путь к файлу трека или None, если трек отключён"""
+        if track in self.unavailable or not pygame.mixer.get_init():
+            return None
+        filename = self.STREAMED.get(track) or self.STINGERS[track]
+        path = os.path.join(self.music_folder, filename)
+        if not os.path.exists(path):
+            print(f"[WARNING] Не удалось загрузить музыку: нет файла {path}")
+            self.unavailable.add(track)
+            return None
+        return path
+    
+    def preload(self):
+        """Запустить фоновое декодирование стингеров"""
+        if self._loader is None and self.ensure_mixer():
+            self._loader = threading.Thread(target=self._load_stingers, name="music-preload", daemon=True)
+            self._loader.start()
+    
+    def _load_stingers(self):
+        for track in self.STINGERS:
+            path = self._track_path(track)
+            if path is None:
+                continue
+            try:
+                sound = pygame.mixer.Sound(path)
+            except pygame.error as e:
+                # Трек ещё может сыграть потоком
+                print(f"[WARNING] Не удалось декодировать {path}: {e}")
+                continue
+            with self._lock:
+                self.sounds[track] = sound
+    
+    def _play(self, track: str, loops: int) -> bool:
+        """Проиграть трек из памяти, если он декодирован, иначе потоком"""
+        if not self.ensure_mixer():
+            return False
+        with self._lock:
+            sound = self.sounds.get(track)
+        if sound is not None:
+            try:
+                sound.play(loops)
+                return True
+            except pygame.error as e:
+                print(f"[WARNING] Ошибка при проигрывании музыки: {e}")
+        
+        path = self._track_path(track)
+        if path is None:
+            return False
         try:
-            self.background_music = pygame.mixer.Sound(os.path.join(self.music_folder, "game.mp3"))
-            self.game_over_music = pygame.mixer.Sound(os.path.join(self.music_folder, "gameover.mp3"))
-            self.win_music = pygame.mixer.Sound(os.path.join(self.music_folder, "winer.mp3"))
-        except Exception as e:
-            print(f"[WARNING] Не удалось загрузить музыку: {e}")
-            self.background_music = None
-            self.game_over_music = None
-            self.win_music = None
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.play(loops)
+            return True
+        except pygame.error as e:
+            print(f"[WARNING] Ошибка при проигрывании музыки {path}: {e}")
+            self.unavailable.add(track)
+            return False
     
     def play_background_music(self):
         """Проигрывать фоновую музыку в цикле"""
-        if self.background_music:
-            try:
-                self.background_music.play(-1)  # -1 означает бесконечный цикл
-                self.current_music = "background"
-            except Exception as e:
-                print(f"[WARNING] Ошибка при проигрывании фоновой музыки: {e}")
+        if self._play("background", -1):  # -1 означает бесконечный цикл
+            self.current_music = "background"
     
     def play_game_over_music(self):
         """Проиграть музыку проигрыша один раз"""
-        if self.game_over_music and not self.game_over_played:
-            try:
-                self.game_over_music.play(0)  # 0 означает проиграть один раз
-                self.current_music = "game_over"
-                self.game_over_played = True
-            except Exception as e:
-                print(f"[WARNING] Ошибка при проигрывании музыки проигрыша: {e}")
+        if not self.game_over_played and self._play("game_over", 0):
+            self.current_music = "game_over"
+            self.game_over_played = True
     
     def play_win_music(self):
         """Проиграть музыку победы один раз"""
-        if self.win_music and not self.win_played:
-            try:
-                self.win_music.play(0)  # 0 означает проиграть один раз
-                self.current_music = "win"
-                self.win_played = True
-            except Exception as e:
-                print(f"[WARNING] Ошибка при проигрывании музыки победы: {e}")
+        if not self.win_played and self._play("win", 0):
+            self.current_music = "win"
+            self.win_played = True
     
     def stop_all_music(self):
         """Остановить всю музыку"""
-        pygame.mixer.stop()
+        if pygame.mixer.get_init():
+            pygame.mixer.stop()
+            pygame.mixer.music.stop()
         self.current_music = None
     
     def reset_one_time_flags(self):
@@ -119,66 +235,17 @@ class GameState(Enum):
     WIN = 5
     RULES_MENU = 6
 
-class StudentActivity(Enum):
-    NORMAL = 1
-    CHEAT = 2
-    GAMES = 3
-    SLEEP = 4
-    EAT = 5
-
-class Difficulty(Enum):
-    EASY = 1
-    MEDIUM = 2
-    HARD = 3
-    IMPOSSIBLE = 4
-
-@dataclass
-class Student:
+class Student(StudentModel):
     """Главный герой - студент"""
-    x: float = 400
-    y: float = 500
-    current_activity: StudentActivity = StudentActivity.NORMAL
-    score: int = 0
-    activity_progress: int = 0  # 0-100
-    activity_timer: int = 0
-    activity_duration: int = 0  # Длительность в кадрах
-    
-    # Длительности активностей (в кадрах при 60 FPS)
-    ACTIVITY_DURATIONS = {
-        StudentActivity.NORMAL: 0,      # Мгновенно
-        StudentActivity.CHEAT: 180,     # 3 секунды (3 * 60)
-        StudentActivity.GAMES: 120,     # 2 секунды (2 * 60)
-        StudentActivity.SLEEP: 240,     # 4 секунды (4 * 60)
-        StudentActivity.EAT: 150,       # 2.5 секунды (2.5 * 60)
-    }
-    
-    def start_activity(self, activity: StudentActivity):
-        """Начать новую активность"""
-        self.current_activity = activity
-        self.activity_timer = 0
-        self.activity_progress = 0
-        self.activity_duration = self.ACTIVITY_DURATIONS[activity]
-    
-    def update_activity(self):
-        """Обновить прогресс активности"""
-        if self.activity_duration > 0 and self.activity_timer < self.activity_duration:
-            self.activity_timer += 1
-            self.activity_progress = int((self.activity_timer / self.activity_duration) * 100)
-            return False  # Активность ещё выполняется
-        elif self.activity_duration > 0:
-            # Активность завершена - полностью прерываем её
-            self.current_activity = StudentActivity.NORMAL
-            self.activity_progress = 0
-            self.activity_timer = 0
-            self.activity_duration = 0  # Очищаем длительность
-            return True  # Активность завершена
-        return False
-    
-    def draw(self, screen: pygame.Surface, player_sprites: dict = None):
-        """Нарисовать студента"""
+    __slots__ = ()  # Только отрисовка, состояние - в слотах StudentModel
+
+    def draw(self, screen: pygame.Surface, player_sprites: dict = None, alpha: float = 0.0,
+             frame: Optional[pygame.Surface] = None):
+        """Нарисовать студента (alpha - доля тика для плавного прогресс-бара,
+        frame - кадр анимации вместо статичного спрайта)"""
         # Если есть спрайты, используем их
-        if player_sprites and self.current_activity in player_sprites:
-            sprite = player_sprites[self.current_activity]
+        if frame is not None or (player_sprites and self.current_activity in player_sprites):
+            sprite = frame if frame is not None else player_sprites[self.current_activity]
             # Центруем спрайт по позиции студента
             sprite_rect = sprite.get_rect(center=(int(self.x), int(self.y + 10)))
             screen.blit(sprite, sprite_rect)
@@ -213,8 +280,7 @@ class Student:
         
         icon = icons.get(self.current_activity, "")
         if icon:
-            font = pygame.font.Font(None, 28)
-            icon_text = font.render(icon, True, BLACK)
+            icon_text = text_cache.render(text_cache.font(28), icon, BLACK)
             screen.blit(icon_text, (int(self.x - 15), int(self.y - 50)))
         
         # Прогресс-бар активности
@@ -227,29 +293,24 @@ class Student:
             # Фон прогресс-бара
             pygame.draw.rect(screen, LIGHT_GRAY, (bar_x, bar_y, bar_width, bar_height))
             
-            # Заполненная часть
-            filled_width = int(bar_width * self.activity_progress / 100)
+            # Заполненная часть (интерполяция между тиками симуляции)
+            filled_width = int(bar_width * self.progress_fraction(alpha))
             color = GREEN if self.activity_progress < 100 else ORANGE
             pygame.draw.rect(screen, color, (bar_x, bar_y, filled_width, bar_height))
 
-@dataclass
-class Teacher:
+class Teacher(TeacherModel):
     """Учитель, следящий за студентом"""
-    x: float = 1000
-    y: float = 150
-    looking_at_student: bool = False
-    look_timer: int = 0
-    look_duration: int = 0
-    warning_timer: int = 0  # Таймер для отображения предупреждающего знака
-    
-    def draw(self, screen: pygame.Surface, teacher_sprites: dict = None):
-        """Нарисовать учителя"""
+    __slots__ = ()
+
+    def draw(self, screen: pygame.Surface, teacher_sprites: dict = None, tick_rate: int = SIM_FPS,
+             blink: bool = True, frame: Optional[pygame.Surface] = None):
+        """Нарисовать учителя (blink=False - "!" не мигает, frame - кадр анимации)"""
         # Если есть спрайты, используем их
-        if teacher_sprites and teacher_sprites:
+        if frame is not None or teacher_sprites:
             # Выбираем спрайт в зависимости от состояния
             sprite_key = 'watch' if self.looking_at_student else 'sleep'
-            if sprite_key in teacher_sprites:
-                sprite = teacher_sprites[sprite_key]
+            if frame is not None or sprite_key in teacher_sprites:
+                sprite = frame if frame is not None else teacher_sprites[sprite_key]
                 # Центруем спрайт по позиции учителя
                 sprite_rect = sprite.get_rect(center=(int(self.x), int(self.y + 10)))
                 screen.blit(sprite, sprite_rect)
@@ -261,88 +322,110 @@ class Teacher:
             self._draw_fallback(screen)
         
         # Рисовать предупреждающий знак если учитель начал смотреть
-        self.draw_warning_sign(screen)
+        self.draw_warning_sign(screen, tick_rate, blink)
         
         # Указатель внимания (красный кружок если смотрит)
         # if self.looking_at_student:
         #     pygame.draw.circle(screen, RED, (int(self.x), int(self.y - 50)), 12, 3)
     
-    def draw_warning_sign(self, screen: pygame.Surface):
+    def draw_warning_sign(self, screen: pygame.Surface, tick_rate: int = SIM_FPS, blink: bool = True):
         """Нарисовать предупреждающий знак ⚠️ когда учитель смотрит"""
         if self.warning_timer > 0:
             # Использовать шрифт для отображения знака
-            font_size = 80
-            font = pygame.font.Font(None, font_size)
+            font = text_cache.font(80)
             
-            # Частота мигания (мигает каждые 10 кадров)
-            if (self.warning_timer // 12) % 2 == 0:
+            # Частота мигания (мигает каждые 12 кадров при 60 FPS)
+            if self.warning_visible(tick_rate, blink):
                 # Отрисовать предупреждающий знак рядом с учителем (выше и левее)
-                warning_text = font.render("!", True, ORANGE)
+                warning_text = text_cache.render(font, "!", ORANGE)
                 text_rect = warning_text.get_rect(center=(int(self.x - 80), int(self.y - 80)))
                 screen.blit(warning_text, text_rect)
     
-    # def _draw_fallback(self, screen: pygame.Surface):
-    #     """Резервная отрисовка учителя геометрическими фигурами"""
-    #     # Голова
-    #     pygame.draw.circle(screen, LIGHT_BROWN, (int(self.x), int(self.y - 25)), 15)
-        
-    #     # Туловище
-    #     pygame.draw.rect(screen, (139, 69, 19), (int(self.x - 20), int(self.y), 40, 50))
-        
-    #     # Руки
-    #     pygame.draw.line(screen, LIGHT_BROWN, (int(self.x - 20), int(self.y + 10)), 
-    #                     (int(self.x - 40), int(self.y + 15)), 5)
-    #     pygame.draw.line(screen, LIGHT_BROWN, (int(self.x + 20), int(self.y + 10)), 
-    #                     (int(self.x + 40), int(self.y + 15)), 5)
-        
-    #     # Ноги
-    #     pygame.draw.line(screen, DARK_GRAY, (int(self.x - 10), int(self.y + 50)), 
-    #                     (int(self.x - 10), int(self.y + 80)), 4)
-    #     pygame.draw.line(screen, DARK_GRAY, (int(self.x + 10), int(self.y + 50)), 
-    #                     (int(self.x + 10), int(self.y + 80)), 4)
-        
-    #     # Глаза - если смотрит на студента, то красные
-    #     eye_color = RED if self.looking_at_student else BLACK
-    #     pygame.draw.circle(screen, eye_color, (int(self.x - 7), int(self.y - 28)), 4)
-    #     pygame.draw.circle(screen, eye_color, (int(self.x + 7), int(self.y - 28)), 4)
+    def _draw_fallback(self, screen: pygame.Surface):
+        """Резервная отрисовка учителя геометрическими фигурами"""
+        # Голова
+        pygame.draw.circle(screen, LIGHT_BROWN, (int(self.x), int(self.y - 25)), 15)
+        
+        # Туловище
+        pygame.draw.rect(screen, (139, 69, 19), (int(self.x - 20), int(self.y), 40, 50))
+        
+        # Руки
+        pygame.draw.line(screen, LIGHT_BROWN, (int(self.x - 20), int(self.y + 10)), 
+                        (int(self.x - 40), int(self.y + 15)), 5)
+        pygame.draw.line(screen, LIGHT_BROWN, (int(self.x + 20), int(self.y + 10)), 
+                        (int(self.x + 40), int(self.y + 15)), 5)
+        
+        # Ноги
+        pygame.draw.line(screen, DARK_GRAY, (int(self.x - 10), int(self.y + 50)), 
+                        (int(self.x - 10), int(self.y + 80)), 4)
+        pygame.draw.line(screen, DARK_GRAY, (int(self.x + 10), int(self.y + 50)), 
+                        (int(self.x + 10), int(self.y + 80)), 4)
+        
+        # Глаза - если смотрит на студента, то красные
+        eye_color = RED if self.looking_at_student else BLACK
+        pygame.draw.circle(screen, eye_color, (int(self.x - 7), int(self.y - 28)), 4)
+        pygame.draw.circle(screen, eye_color, (int(self.x + 7), int(self.y - 28)), 4)
 
 class Button:
+    """Кнопка меню. Вид в обычном состоянии и при наведении рисуется один раз
+    в поверхность (общий кэш для всех кнопок с тем же текстом, размером и шрифтом),
+    а кадр - это один blit."""
+    
+    # (текст, размер, шрифт, наведение) -> (поверхность, смещение от rect.topleft)
+    _baked: Dict[tuple, Tuple[pygame.Surface, Tuple[int, int]]] = {}
+    
     def __init__(self, x: int, y: int, width: int, height: int, text: str, action: Optional[str] = None):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.action = action
         self.hovered = False
-        
-    def draw(self, screen: pygame.Surface, font: pygame.font.Font):
+    
+    def bake(self, font: pygame.font.Font, hovered: bool) -> Tuple[pygame.Surface, Tuple[int, int]]:
+        """Готовый вид кнопки; пересобирается только при смене текста, размера или шрифта"""
+        key = (self.text, self.rect.size, font, hovered)
+        baked = Button._baked.get(key)
+        if baked is None:
+            baked = Button._baked[key] = self._render(font, hovered)
+        return baked
+    
+    def _render(self, font: pygame.font.Font, hovered: bool) -> Tuple[pygame.Surface, Tuple[int, int]]:
         # Современный стиль с тенью и скруглением
-        color = UTM_GOLD if self.hovered else UTM_PURPLE
-        hover_color = ORANGE if self.hovered else UTM_DARK_PURPLE
+        color = UTM_GOLD if hovered else UTM_PURPLE
+        hover_color = ORANGE if hovered else UTM_DARK_PURPLE
+        
+        # Многострочный текст (мобильные размеры - мельче шрифт для узких кнопок);
+        # текст может выходить за кнопку, поэтому поверхность охватывает всё
+        body = pygame.Rect((0, 0), self.rect.size)
+        lines = self.text.split('\n')
+        line_spacing = 16
+        y_start = body.centery - len(lines) * line_spacing // 2
+        texts = []
+        for i, line in enumerate(lines):
+            text_surface = text_cache.render(font, line, WHITE)
+            texts.append((text_surface, text_surface.get_rect(center=(body.centerx, y_start + i * line_spacing))))
         
         # Тень кнопки
-        shadow_rect = self.rect.copy()
-        shadow_rect.y += 4
-        pygame.draw.rect(screen, (0, 0, 0, 50), shadow_rect, border_radius=15)
+        shadow_rect = body.move(0, 4)
+        bounds = body.union(shadow_rect).unionall([rect for _, rect in texts])
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        offset = (-bounds.x, -bounds.y)
+        pygame.draw.rect(surface, BLACK, shadow_rect.move(offset), border_radius=15)
         
         # Основная кнопка с границей
-        pygame.draw.rect(screen, color, self.rect, border_radius=15)
-        pygame.draw.rect(screen, hover_color, self.rect, 3, border_radius=15)
+        pygame.draw.rect(surface, color, body.move(offset), border_radius=15)
+        pygame.draw.rect(surface, hover_color, body.move(offset), 3, border_radius=15)
         
         # Эффект при наведении
-        if self.hovered:
-            pygame.draw.rect(screen, YELLOW, self.rect, 1, border_radius=15)
+        if hovered:
+            pygame.draw.rect(surface, YELLOW, body.move(offset), 1, border_radius=15)
         
-        # Многострочный текст
-        lines = self.text.split('\n')
+        for text_surface, text_rect in texts:
+            surface.blit(text_surface, text_rect.move(offset))
+        return surface, (bounds.x, bounds.y)
         
-        # Мобильные размеры - мельче шрифт для узких кнопок
-        line_spacing = 16
-        total_height = len(lines) * line_spacing
-        y_start = self.rect.centery - total_height // 2
-        
-        for i, line in enumerate(lines):
-            text_surface = font.render(line, True, WHITE)
-            text_rect = text_surface.get_rect(center=(self.rect.centerx, y_start + i * line_spacing))
-            screen.blit(text_surface, text_rect)
+    def draw(self, screen: pygame.Surface, font: pygame.font.Font):
+        surface, (dx, dy) = self.bake(font, self.hovered)
+        screen.blit(surface, (self.rect.x + dx, self.rect.y + dy))
         
     def is_clicked(self, pos: Tuple[int, int]) -> bool:
         return self.rect.collidepoint(pos)
@@ -351,121 +434,260 @@ class Button:
         self.hovered = self.rect.collidepoint(pos)
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    def __init__(self, sim_hz: int = SIM_FPS, render_fps: int = FPS, trace_path: Optional[str] = None,
+                 record_dir: Optional[str] = None, startup: Optional[StartupTimer] = None,
+                 fullscreen: bool = False):
+        # Засечки запуска для --startup-profile: после загрузки печатается отчёт и игра закрывается
+        self.startup = startup
+        pygame.display.init()
+        # Логический холст 540x960; до размера окна его масштабирует SDL
+        self.screen, self.display_bucket = open_display((SCREEN_WIDTH, SCREEN_HEIGHT), fullscreen)
         pygame.display.set_caption("UTM Cheating Simulator - Списывай, пока не видит!")
         self.clock = pygame.time.Clock()
+        # Отрисовка с частотой render_fps (0 - без ограничения), правила - с фиксированным шагом sim_hz
+        self.render_fps = render_fps
+        self.render_alpha = 0.0
+        # Замеры кадра: оверлей по F3, трасса Chrome по F4 и при выходе
+        self.profiler = FrameProfiler(render_fps)
+        # Простой на статичных экранах и сброс эффектов, когда кадр не укладывается в бюджет
+        self.governor = FrameGovernor(render_fps)
+        self.trace_path = trace_path
+        self.profiler_lines: List[str] = []
+        # Перерисовываются только изменившиеся области экрана
+        self.dirty = DirtyRegions(self.screen.get_rect())
+        self.drawn_state = None
+        # Статичные слои экранов (фон, градиенты, заголовки) строятся один раз
+        self.layers = LayerCache()
+        # Экраны итогов собираются один раз из последнего кадра раунда
+        self.compositor = Compositor()
+        self.mark_startup("display")
         
         # Адаптивные размеры шрифтов для мобильного
-        self.font_large = pygame.font.Font(None, 48)
-        self.font_medium = pygame.font.Font(None, 32)
-        self.font_small = pygame.font.Font(None, 24)
+        self.font_large = text_cache.font(48)
+        self.font_medium = text_cache.font(32)
+        self.font_small = text_cache.font(24)
+        self.mark_startup("fonts")
         
         # Инициализация музыки
         self.music_manager = MusicManager()
         
-        # Загрузка изображений
+        # Загрузка изображений в фоне: пока картинок нет, рисуются градиенты и фигуры
         self.bg_start_menu = None
         self.bg_game = None
-        self.load_images()
+        self.player_sprites = {}
+        self.teacher_sprites = {}
+        self.player_animations: Dict[StudentActivity, Animation] = {}
+        self.teacher_animations: Dict[str, Animation] = {}
+        self.sheets: Dict[tuple, pygame.Surface] = {}
+        self.student_animator = Animator()
+        self.teacher_animator = Animator()
+        # Частицы из заранее созданного пула; кадры затухания готовятся один раз
+        self.particles = ParticlePool()
+        self.pop_frames: Dict[int, List[pygame.Surface]] = {}
+        spark = pygame.Surface((8, 8), pygame.SRCALPHA)
+        pygame.draw.circle(spark, ORANGE, (4, 4), 4)
+        self.spark_frames = fade_frames(spark)
+        self.assets = AssetLoader(AssetPipeline())
+        self.assets_total = 0
+        self.assets_ready = False
         
         self.state = GameState.MAIN_MENU
-        self.student = Student()
-        self.teacher = Teacher()
-        self.score = 0
-        self.time_remaining = 0
-        self.game_time = 0
+        # Правила раунда вынесены в headless-симуляцию (simulation.py)
+        self.difficulty_settings = DIFFICULTY_SETTINGS
+        self.sim = ExamSimulation(student=Student(), teacher=Teacher(), settings=self.difficulty_settings,
+                                  tick_rate=sim_hz)
+        # Сообщения и запись нажатий для воспроизведения (replay.py)
+        recorder = None
+        if record_dir:
+            from replay import Recorder  # Нужен только с --record
+            recorder = Recorder(record_dir)
+        self.session = RoundSession(self.sim, recorder)
         self.buttons: List[Button] = []
-        self.messages: List[Tuple[str, int]] = []
+        # Ввод: очередь событий раз в кадр, жесты касаний, индекс кнопок для попаданий
+        self.input = InputLayer((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.pointer = NO_POINTER
+        self.hovered_button: Optional[Button] = None
+        self.button_index: Optional[ButtonIndex] = None
         
         # Параметры сложности
         self.difficulty = Difficulty.EASY
-        self.teacher_look_chance = 15  # Вероятность в процентах
-        
-        # Словарь параметров сложности
-        self.difficulty_settings = {
-            Difficulty.EASY: {"time": 30, "chance": 15, "name": "ЛЕГКИЙ", "description": "30 сек, 15% риск"},
-            Difficulty.MEDIUM: {"time": 45, "chance": 30, "name": "СРЕДНИЙ", "description": "45 сек, 30% риск"},
-            Difficulty.HARD: {"time": 50, "chance": 40, "name": "СЛОЖНЫЙ", "description": "45 сек, 40% риск"},
-            Difficulty.IMPOSSIBLE: {"time": 60, "chance": 50, "name": "НЕВОЗМОЖНЫЙ", "description": "50 сек, 50% риск"},
-        }
         
-        # Лучший счет игрока
+        # Лучший счет игрока и история раундов
         self.best_score = 0
         self.scores_file = "scores.json"
+        self.history = RunHistory()
+        self.leaderboard = Leaderboard()  # Загружается в фоне вместе с картинками
+        self.top_scores: Tuple[int, List[str]] = (-1, [])  # (раундов в таблице, строки лучших очков)
         self.load_best_score()
         
         self.create_menu_buttons()
+        self.mark_startup("game")
+
+    # Состояние раунда хранится в симуляции
+    @property
+    def student(self) -> Student:
+        return self.sim.student
+
+    @property
+    def teacher(self) -> Teacher:
+        return self.sim.teacher
+
+    @property
+    def score(self) -> int:
+        return self.sim.score
+
+    @property
+    def time_remaining(self) -> int:
+        return self.sim.time_remaining
+
+    @property
+    def game_time(self) -> int:
+        return self.sim.game_time
+
+    @property
+    def teacher_look_chance(self) -> int:
+        return self.sim.teacher_look_chance
+
+    @property
+    def messages(self) -> List[Tuple[str, int]]:
+        return self.session.messages
+
+    @messages.setter
+    def messages(self, value: List[Tuple[str, int]]):
+        self.session.messages = value
 
     def load_images(self):
-        """Загрузить изображения из assets папки"""
-        try:
-            # Загружаем фоны
-            self.bg_start_menu = pygame.image.load("assets/back-start-menu.png")
-            self.bg_start_menu = pygame.transform.scale(self.bg_start_menu, (SCREEN_WIDTH, SCREEN_HEIGHT))
-            
-            self.bg_game = pygame.image.load("assets/background.png")
-            self.bg_game = pygame.transform.scale(self.bg_game, (SCREEN_WIDTH, SCREEN_HEIGHT))
-            
-            # Загружаем спрайты игрока для разных состояний
-            self.player_sprites = {}
-            self.player_sprites[StudentActivity.NORMAL] = pygame.image.load("assets/player-sit.png")
-            self.player_sprites[StudentActivity.CHEAT] = pygame.image.load("assets/player-cheating.png")
-            self.player_sprites[StudentActivity.GAMES] = pygame.image.load("assets/player-game.png")
-            self.player_sprites[StudentActivity.SLEEP] = pygame.image.load("assets/player-sleep.png")
-            self.player_sprites[StudentActivity.EAT] = pygame.image.load("assets/player-eat.png")
-            
-            # Масштабируем спрайты игрока до нужного размера (примерно 60x80 пикселей)
-            player_width = 220
-            player_height = 240
-            for activity in self.player_sprites:
-                self.player_sprites[activity] = pygame.transform.scale(self.player_sprites[activity], (player_width, player_height))
-            
-            # Загружаем спрайты учителя для разных состояний
-            self.teacher_sprites = {}
-            self.teacher_sprites['sleep'] = pygame.image.load("assets/enemy-sleep.png")
-            self.teacher_sprites['watch'] = pygame.image.load("assets/enemy-watch.png")
-            
-            # Масштабируем спрайты учителя до нужного размера
-            teacher_width = 280
-            teacher_height = 330
-            for state in self.teacher_sprites:
-                self.teacher_sprites[state] = pygame.transform.scale(self.teacher_sprites[state], (teacher_width, teacher_height))
-                
-        except FileNotFoundError as e:
-            print(f"[WARNING] Не удалось загрузить изображение: {e}")
-            # Если файлы не найдены, используем None (будут рисованы градиенты и фигуры)
-            self.bg_start_menu = None
-            self.bg_game = None
-            self.player_sprites = {}
-            self.teacher_sprites = {}
+        """Поставить изображения из assets папки в фоновую загрузку"""
+        # Фоны (в формате дисплея)
+        self.assets.request("bg_start_menu", "back-start-menu.png", (SCREEN_WIDTH, SCREEN_HEIGHT), opaque=True)
+        self.assets.request("bg_game", "background.png", (SCREEN_WIDTH, SCREEN_HEIGHT), opaque=True)
+        
+        # Спрайты игрока и учителя
+        player_size = (220, 240)
+        teacher_size = (280, 330)
+        sprites = {
+            StudentActivity.NORMAL: ("player-sit.png", player_size),
+            StudentActivity.CHEAT: ("player-cheating.png", player_size),
+            StudentActivity.GAMES: ("player-game.png", player_size),
+            StudentActivity.SLEEP: ("player-sleep.png", player_size),
+            StudentActivity.EAT: ("player-eat.png", player_size),
+            'sleep': ("enemy-sleep.png", teacher_size),
+            'watch': ("enemy-watch.png", teacher_size),
+        }
+        for key, (name, size) in sprites.items():
+            self.assets.request(key, name, size)
+        
+        # Спрайт-листы анимаций - только те, что есть в assets
+        sheets = [(key, spec, player_size) for key, spec in PLAYER_ANIMATIONS.items()]
+        sheets += [(key, spec, teacher_size) for key, spec in TEACHER_ANIMATIONS.items()]
+        for key, spec, (width, height) in sheets:
+            if os.path.exists(os.path.join(self.assets.pipeline.assets_dir, spec.name)):
+                self.assets.request(("sheet", key), spec.name, (width * spec.frames, height))
+        self.assets_total = self.assets.pending
     
-    def load_best_score(self):
-        """Загрузить лучший счет из файла"""
-        try:
-            if os.path.exists(self.scores_file):
-                with open(self.scores_file, 'r') as f:
-                    data = json.load(f)
-                    self.best_score = data.get('best_score', 0)
+    def poll_assets(self, wait: bool = False):
+        """Подхватить загруженные изображения (wait=True - дождаться всех)"""
+        if self.assets_ready:
+            return
+        if self.assets_total == 0:
+            # Загрузка стартует после первого кадра, чтобы потоки не тормозили его
+            self.music_manager.preload()
+            self.mark_startup("mixer")
+            self.leaderboard.load_async(self.history)
+            self.load_images()
+        for key, surface in self.assets.poll(wait).items():
+            if key in ("bg_start_menu", "bg_game"):
+                setattr(self, key, surface)
+            elif isinstance(key, tuple):
+                self.sheets[key] = surface
+            elif isinstance(key, StudentActivity):
+                self.player_sprites[key] = surface
             else:
-                self.best_score = 0
-        except:
-            self.best_score = 0
+                self.teacher_sprites[key] = surface
+            self.dirty.invalidate()
+        
+        if self.assets.pending == 0:
+            # Всё загружено - спрайты упаковываются в один атлас
+            sprites = pack_atlas({**self.player_sprites, **self.teacher_sprites, **self.sheets})
+            self.player_sprites = {key: sprites[key] for key in self.player_sprites}
+            self.teacher_sprites = {key: sprites[key] for key in self.teacher_sprites}
+            self.player_animations = self.build_animations(sprites, PLAYER_ANIMATIONS)
+            self.teacher_animations = self.build_animations(sprites, TEACHER_ANIMATIONS)
+            self.sheets = {}
+            self.assets.close()
+            self.assets_ready = True
+            self.dirty.invalidate()
+            self.mark_startup("assets")
     
-    def save_best_score(self):
-        """Сохранить лучший счет в файл"""
-        try:
-            data = {'best_score': self.best_score}
-            with open(self.scores_file, 'w') as f:
-                json.dump(data, f)
-        except:
-            pass
+    @staticmethod
+    def build_animations(sprites: Dict, specs: Dict) -> Dict:
+        """Анимации из листов, попавших в атлас"""
+        return {key: Animation(slice_sheet(sprites[("sheet", key)], spec.frames), spec.fps, spec.loop)
+                for key, spec in specs.items() if ("sheet", key) in sprites}
+    
+    def mark_startup(self, name: str):
+        """Засечка этапа запуска (только с --startup-profile)"""
+        if self.startup is not None:
+            self.startup.mark(name)
+    
+    def load_best_score(self):
+        """Лучший счет: максимум из истории раундов и старого scores.json"""
+        legacy = 0
+        if os.path.exists(self.scores_file):
+            try:
+                with open(self.scores_file, 'r') as f:
+                    legacy = int(json.load(f).get('best_score', 0))
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"[WARNING] Не удалось прочитать {self.scores_file}: {e}")
+        self.best_score = max(legacy, self.history.best_score())
     
     def update_best_score(self, score: int):
         """Обновить лучший счет если текущий выше"""
         if score > self.best_score:
             self.best_score = score
-            self.save_best_score()
+    
+    def finish_round(self, outcome: RoundOutcome):
+        """Раунд закончен: рекорд в памяти, запись в историю - в фоновом потоке"""
+        self.update_best_score(self.score)
+        activity = self.student.current_activity if outcome == RoundOutcome.CAUGHT else None
+        run = RunRecord(self.difficulty, outcome, self.score, self.sim.game_time,
+                        self.sim.game_time / self.sim.tick_rate, activity)
+        self.history.record(run)
+        self.leaderboard.add(run)
+    
+    def best_score_label(self) -> str:
+        """Текст рамки лучшего счета: его место среди всех раундов, когда таблица лидеров загружена"""
+        leaderboard = self.leaderboard
+        if not leaderboard.ready or leaderboard.count() == 0:
+            return f"Лучший счет: {self.best_score}"
+        total = leaderboard.count()
+        if leaderboard.top(None, 1)[0] < self.best_score:
+            # Рекорд из старого scores.json в таблице не хранится: место ищется тем же bisect
+            total += 1
+        return f"Лучший счет: {self.best_score} (#{leaderboard.rank(self.best_score)} из {total})"
+    
+    def last_run_lines(self) -> List[str]:
+        """Очки прошлого раунда, его место и процентиль среди раундов той же сложности"""
+        leaderboard = self.leaderboard
+        if not leaderboard.ready or leaderboard.last is None:
+            return []
+        difficulty, score = leaderboard.last
+        rank = leaderboard.rank(score, difficulty)
+        percentile = leaderboard.percentile(score, difficulty)
+        name = self.difficulty_settings[difficulty]["name"]
+        return [f"Прошлый раунд ({name}): {score}",
+                f"#{rank} из {leaderboard.count(difficulty)}, лучше {percentile:.0f}% раундов"]
+    
+    def top_scores_labels(self) -> List[str]:
+        """Лучшие очки каждой сложности для меню выбора сложности (пересчёт - после нового раунда)"""
+        count = self.leaderboard.count()
+        if self.top_scores[0] != count:
+            labels = []
+            for difficulty in Difficulty:
+                top = self.leaderboard.top(difficulty, TOP_SCORES)
+                labels.append("Лучшие: " + " · ".join(map(str, top)) if top else "Раундов пока нет")
+            self.top_scores = (count, labels)
+        return self.top_scores[1]
     
     def create_menu_buttons(self):
         """Создать кнопки главного меню"""
@@ -503,6 +725,14 @@ class Game:
             Button(x, start_y + spacing * 4, button_width, button_height, "← НАЗАД", action="back"),
         ]
     
+    def create_rules_buttons(self):
+        """Создать кнопку "Назад" внизу экрана правил"""
+        button_width = 150
+        button_height = 60
+        button_x = (SCREEN_WIDTH - button_width) // 2
+        button_y = SCREEN_HEIGHT - 100
+        self.buttons = [Button(button_x, button_y, button_width, button_height, "← НАЗАД", action="back_to_menu")]
+    
     def create_game_buttons(self):
         """Создать кнопки активностей в игре"""
         button_width = 90
@@ -539,149 +769,86 @@ class Game:
             Button(start_x + spacing_x * 3, start_y, button_width, button_height, "\nЕСТЬ\n2.5 сек", action="eat"),
             Button(start_x + spacing_x * 4, start_y, button_width, button_height, "\nОтменить\nДействие", action="normal"),
         ]
-        self.update_button_labels()
-    
-    def update_button_labels(self):
-        """Обновить текст кнопок"""
-        self.buttons[0].text = "\nСПИСАТЬ\n3 сек"
-        self.buttons[1].text = "\nИГРАТЬ\n2 сек"
-        self.buttons[2].text = "\nСПАТЬ\n4 сек"
-        self.buttons[3].text = "\nЕСТЬ\n2.5 сек"
     
     def start_game(self):
         """Начать новую игру"""
         self.state = GameState.GAME
-        self.student = Student(score=0)
-        self.teacher = Teacher()
-        self.score = 0
-        self.game_time = 0
-        
-        # Установить параметры в зависимости от сложности
-        settings = self.difficulty_settings[self.difficulty]
-        self.time_remaining = settings["time"] * 60  # Перевести в фреймы
-        self.teacher_look_chance = settings["chance"]
-        
-        self.messages = []
+        # Сброс студента и учителя (те же объекты), таймеры, первый взгляд учителя и приветствие
+        self.session.start(self.difficulty)
+        self.place_actors()
+        self.particles.clear()
         self.create_game_buttons()
         
         # Сбросить флаги музыки и проигрывать фоновую музыку
         self.music_manager.reset_one_time_flags()
         self.music_manager.play_background_music()
-        
-        difficulty_name = settings["name"]
-        self.add_message(f"{difficulty_name} уровень! Списывай и не попадайся!", 120)
-        self.schedule_teacher_actions()
-    
-    def schedule_teacher_actions(self):
-        """Запланировать движения учителя"""
-        delay = random.randint(2, 5)
-        # Вероятность того, что учитель посмотрит на студента
-        look_duration = random.randint(60, 180)
-        self.teacher.look_timer = delay * FPS
-        self.teacher.look_duration = look_duration
-        # Активировать предупреждающий знак ТОЛЬКО в последнюю секунду (60 кадров = 1 сек перед взглядом)
-        # Если delay больше 1 сек, показываем предупреждение только в конце
-        self.teacher.warning_timer = 60  # Мигает только последнюю 1 секунду перед взглядом
+    
+    def place_actors(self):
+        """Расставить персонажей (мобильный вертикальный макет)"""
+        # Позиции персонажей с ограничениями
+        self.student.x = max(SAFE_LEFT + 30, min(SAFE_RIGHT - 30, SCREEN_WIDTH // 2))
+        self.student.y = max(SAFE_TOP + 30, min(SAFE_BOTTOM - 60, 650))
+        self.teacher.x = max(SAFE_LEFT + 30, min(SAFE_RIGHT - 30, SCREEN_WIDTH - 70))
+        self.teacher.y = max(SAFE_TOP + 30, min(SAFE_BOTTOM - 80, 400))
     
     def add_message(self, text: str, duration: int = 120):
-        """Добавить сообщение на экран"""
-        self.messages.append((text, duration))
+        """Добавить сообщение на экран (duration - в кадрах при 60 FPS)"""
+        self.session.add_message(text, duration)
     
-    def draw_main_menu(self):
-        """Отрисовать главное меню"""
-        # Используем фоновое изображение если загружено, иначе градиент
+    def draw_menu_background(self, surface: pygame.Surface, top: Tuple[int, int, int], bottom: Tuple[int, int, int]):
+        """Фон меню: картинка, если загружена, иначе градиент"""
         if self.bg_start_menu:
-            self.screen.blit(self.bg_start_menu, (0, 0))
+            surface.blit(self.bg_start_menu, (0, 0))
         else:
             # Резервный градиентный фон
-            for y in range(SCREEN_HEIGHT):
-                color_val = int(UTM_PURPLE[0] + (UTM_DARK_PURPLE[0] - UTM_PURPLE[0]) * y / SCREEN_HEIGHT)
-                pygame.draw.line(self.screen, 
-                               (color_val, int(UTM_PURPLE[1] + (UTM_DARK_PURPLE[1] - UTM_PURPLE[1]) * y / SCREEN_HEIGHT), 
-                                int(UTM_PURPLE[2] + (UTM_DARK_PURPLE[2] - UTM_PURPLE[2]) * y / SCREEN_HEIGHT)),
-                               (0, y), (SCREEN_WIDTH, y))
+            surface.blit(vertical_gradient(surface.get_size(), top, bottom), (0, 0))
+    
+    def build_main_menu_layer(self, surface: pygame.Surface):
+        """Статичный слой главного меню"""
+        self.draw_menu_background(surface, UTM_PURPLE, UTM_DARK_PURPLE)
         
         # Заголовок (большой)
         title = self.font_large.render("UTM CHEATING", True, UTM_GOLD)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 80))
-        self.screen.blit(title, title_rect)
+        surface.blit(title, title_rect)
         
         title2 = self.font_medium.render("SIMULATOR", True, WHITE)
         title2_rect = title2.get_rect(center=(SCREEN_WIDTH // 2, 140))
-        self.screen.blit(title2, title2_rect)
+        surface.blit(title2, title2_rect)
         
         # Подзаголовок
         subtitle = self.font_small.render("Списывай пока не видит!", True, YELLOW)
         subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH // 2, 180))
-        self.screen.blit(subtitle, subtitle_rect)
+        surface.blit(subtitle, subtitle_rect)
         
         # Декоративная линия
-        pygame.draw.line(self.screen, UTM_GOLD, (SCREEN_WIDTH // 2 - 80, 200), 
+        pygame.draw.line(surface, UTM_GOLD, (SCREEN_WIDTH // 2 - 80, 200), 
                         (SCREEN_WIDTH // 2 + 80, 200), 2)
-        
-        # Кнопки
-        for button in self.buttons:
-            button.draw(self.screen, self.font_small)
-        
-        # Лучший счет внизу экрана
-        best_score_text = self.font_small.render(f"Лучший счет: {self.best_score}", True, UTM_GOLD)
-        best_score_rect = best_score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 730))
-        
-        # Фон для счета
-        bg_rect = best_score_rect.inflate(30, 20)
-        pygame.draw.rect(self.screen, (0, 0, 0, 50), bg_rect, border_radius=10)
-        pygame.draw.rect(self.screen, UTM_GOLD, bg_rect, 2, border_radius=10)
-        
-        self.screen.blit(best_score_text, best_score_rect)
     
-    def draw_difficulty_menu(self):
-        """Отрисовать меню выбора сложности"""
-        # Используем фоновое изображение если загружено, иначе градиент
-        if self.bg_start_menu:
-            self.screen.blit(self.bg_start_menu, (0, 0))
-        else:
-            # Резервный градиентный фон
-            for y in range(SCREEN_HEIGHT):
-                color_val = int(UTM_DARK_PURPLE[0] + (UTM_PURPLE[0] - UTM_DARK_PURPLE[0]) * y / SCREEN_HEIGHT)
-                pygame.draw.line(self.screen, 
-                               (color_val, int(UTM_DARK_PURPLE[1] + (UTM_PURPLE[1] - UTM_DARK_PURPLE[1]) * y / SCREEN_HEIGHT), 
-                                int(UTM_DARK_PURPLE[2] + (UTM_PURPLE[2] - UTM_DARK_PURPLE[2]) * y / SCREEN_HEIGHT)),
-                               (0, y), (SCREEN_WIDTH, y))
+    def build_difficulty_menu_layer(self, surface: pygame.Surface):
+        """Статичный слой меню выбора сложности"""
+        self.draw_menu_background(surface, UTM_DARK_PURPLE, UTM_PURPLE)
         
         # Заголовок
         title = self.font_large.render("ВЫБЕРИ СЛОЖНОСТЬ", True, UTM_GOLD)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 60))
-        self.screen.blit(title, title_rect)
+        surface.blit(title, title_rect)
         
         # Декоративная линия
-        pygame.draw.line(self.screen, UTM_GOLD, (SCREEN_WIDTH // 2 - 100, 100), 
+        pygame.draw.line(surface, UTM_GOLD, (SCREEN_WIDTH // 2 - 100, 100), 
                         (SCREEN_WIDTH // 2 + 100, 100), 2)
-        
-        # Кнопки
-        for button in self.buttons:
-            button.draw(self.screen, self.font_small)
     
-    def draw_rules_menu(self):
-        """Отрисовать меню с правилами"""
-        # Используем фоновое изображение если загружено, иначе градиент
-        if self.bg_start_menu:
-            self.screen.blit(self.bg_start_menu, (0, 0))
-        else:
-            # Резервный градиентный фон
-            for y in range(SCREEN_HEIGHT):
-                color_val = int(UTM_DARK_PURPLE[0] + (UTM_PURPLE[0] - UTM_DARK_PURPLE[0]) * y / SCREEN_HEIGHT)
-                pygame.draw.line(self.screen, 
-                               (color_val, int(UTM_DARK_PURPLE[1] + (UTM_PURPLE[1] - UTM_DARK_PURPLE[1]) * y / SCREEN_HEIGHT), 
-                                int(UTM_DARK_PURPLE[2] + (UTM_PURPLE[2] - UTM_DARK_PURPLE[2]) * y / SCREEN_HEIGHT)),
-                               (0, y), (SCREEN_WIDTH, y))
+    def build_rules_menu_layer(self, surface: pygame.Surface):
+        """Статичный слой меню правил"""
+        self.draw_menu_background(surface, UTM_DARK_PURPLE, UTM_PURPLE)
         
         # Заголовок
         title = self.font_large.render("ПРАВИЛА", True, UTM_GOLD)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 80))
-        self.screen.blit(title, title_rect)
+        surface.blit(title, title_rect)
         
         # Декоративная линия
-        pygame.draw.line(self.screen, UTM_GOLD, (SCREEN_WIDTH // 2 - 80, 130), 
+        pygame.draw.line(surface, UTM_GOLD, (SCREEN_WIDTH // 2 - 80, 130), 
                         (SCREEN_WIDTH // 2 + 80, 130), 2)
         
         # Текст правил
@@ -698,49 +865,86 @@ class Game:
         bg_box_height = 280
         bg_box_y = 160
         bg_box_rect = pygame.Rect(20, bg_box_y, SCREEN_WIDTH - 40, bg_box_height)
-        pygame.draw.rect(self.screen, (0, 0, 0, 100), bg_box_rect, border_radius=15)
-        pygame.draw.rect(self.screen, UTM_GOLD, bg_box_rect, 3, border_radius=15)
+        pygame.draw.rect(surface, (0, 0, 0, 100), bg_box_rect, border_radius=15)
+        pygame.draw.rect(surface, UTM_GOLD, bg_box_rect, 3, border_radius=15)
         
         # Текст правил внутри фона
         y_pos = 190
         for line in rules_text:
             text_surface = self.font_small.render(line, True, WHITE)
             text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, y_pos))
-            self.screen.blit(text_surface, text_rect)
+            surface.blit(text_surface, text_rect)
             y_pos += 40
+    
+    def build_game_layer(self, surface: pygame.Surface):
+        """Фон игрового экрана"""
+        # Используем фоновое изображение если загружено, иначе рисуем градиент
+        if self.bg_game:
+            surface.blit(self.bg_game, (0, 0))
+        else:
+            # Резервный красивый фон: градиент неба на кремовом
+            surface.blit(vertical_gradient(surface.get_size(), LIGHT_BLUE, CREAM,
+                                           height=SCREEN_HEIGHT // 2, fill=CREAM), (0, 0))
+    
+    def build_win_layer(self, surface: pygame.Surface):
+        """Градиентный фон экрана победы"""
+        surface.blit(vertical_gradient(surface.get_size(), GREEN, DARK_GREEN), (0, 0))
+    
+    def draw_main_menu(self):
+        """Отрисовать главное меню"""
+        # Фон, заголовки и декоративная линия - готовый слой
+        self.screen.blit(self.layers.layer("main_menu", self.screen.get_size(), self.build_main_menu_layer,
+                                           deps=(self.bg_start_menu,)), (0, 0))
+        
+        # Кнопки
+        for button in self.buttons:
+            button.draw(self.screen, self.font_small)
+        
+        # Лучший счет и его место среди всех сыгранных раундов
+        best_score_text = text_cache.render(self.font_small, self.best_score_label(), UTM_GOLD)
+        best_score_rect = best_score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 730))
+        
+        # Фон для счета
+        bg_rect = best_score_rect.inflate(30, 20)
+        pygame.draw.rect(self.screen, (0, 0, 0, 50), bg_rect, border_radius=10)
+        pygame.draw.rect(self.screen, UTM_GOLD, bg_rect, 2, border_radius=10)
+        
+        self.screen.blit(best_score_text, best_score_rect)
+        
+        # Прошлый раунд среди раундов своей сложности
+        for i, line in enumerate(self.last_run_lines()):
+            text = text_cache.render(self.font_small, line, WHITE)
+            self.screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, LAST_RUN_Y + i * 30)))
+    
+    def draw_difficulty_menu(self):
+        """Отрисовать меню выбора сложности"""
+        self.screen.blit(self.layers.layer("difficulty_menu", self.screen.get_size(), self.build_difficulty_menu_layer,
+                                           deps=(self.bg_start_menu,)), (0, 0))
+        
+        # Кнопки
+        for button in self.buttons:
+            button.draw(self.screen, self.font_small)
+        
+        # Лучшие очки под кнопкой каждой сложности (кнопки идут в порядке Difficulty)
+        if self.leaderboard.ready:
+            for button, label in zip(self.buttons, self.top_scores_labels()):
+                text = text_cache.render(self.font_small, label, UTM_GOLD)
+                self.screen.blit(text, text.get_rect(center=(button.rect.centerx, button.rect.bottom + 20)))
+    
+    def draw_rules_menu(self):
+        """Отрисовать меню с правилами"""
+        # Фон, заголовок и текст правил - готовый слой
+        self.screen.blit(self.layers.layer("rules_menu", self.screen.get_size(), self.build_rules_menu_layer,
+                                           deps=(self.bg_start_menu,)), (0, 0))
         
         # Кнопка назад внизу
-        # Обновляем первую кнопку в списке для использования как кнопка "назад"
-        if self.buttons and self.buttons[0].text != "← НАЗАД":
-            self.buttons[0].text = "← НАЗАД"
-            self.buttons[0].action = "back_to_menu"
-            # Переразмещаем кнопку внизу
-            button_width = 150
-            button_height = 60
-            button_x = (SCREEN_WIDTH - button_width) // 2
-            button_y = SCREEN_HEIGHT - 100
-            self.buttons[0].rect = pygame.Rect(button_x, button_y, button_width, button_height)
-        
-        # Рисуем кнопку назад
-        if self.buttons:
-            self.buttons[0].draw(self.screen, self.font_small)
+        for button in self.buttons:
+            button.draw(self.screen, self.font_small)
     
     def draw_game(self):
         """Отрисовать игровой экран"""
-        # Используем фоновое изображение если загружено, иначе рисуем градиент
-        if self.bg_game:
-            self.screen.blit(self.bg_game, (0, 0))
-        else:
-            # Резервный красивый фон
-            self.screen.fill(CREAM)
-            
-            # Градиент неба
-            for y in range(SCREEN_HEIGHT // 2):
-                color_val = int(LIGHT_BLUE[0] + (CREAM[0] - LIGHT_BLUE[0]) * y / (SCREEN_HEIGHT // 2))
-                pygame.draw.line(self.screen, 
-                               (color_val, int(LIGHT_BLUE[1] + (CREAM[1] - LIGHT_BLUE[1]) * y / (SCREEN_HEIGHT // 2)), 
-                                int(LIGHT_BLUE[2] + (CREAM[2] - LIGHT_BLUE[2]) * y / (SCREEN_HEIGHT // 2))),
-                               (0, y), (SCREEN_WIDTH, y))
+        self.screen.blit(self.layers.layer("game", self.screen.get_size(), self.build_game_layer,
+                                           deps=(self.bg_game,)), (0, 0))
         
         # Мобильный макет (вертикальный)
         # Парта учителя (вверху, маленькая)
@@ -751,21 +955,20 @@ class Game:
         # pygame.draw.rect(self.screen, (200, 150, 100), (15, 600, 510, 120))
         # pygame.draw.rect(self.screen, BLACK, (15, 600, 510, 120), 2)
         
-        # Позиции персонажей с ограничениями
-        self.student.x = max(SAFE_LEFT + 30, min(SAFE_RIGHT - 30, SCREEN_WIDTH // 2))
-        self.student.y = max(SAFE_TOP + 30, min(SAFE_BOTTOM - 60, 650))
-        self.teacher.x = max(SAFE_LEFT + 30, min(SAFE_RIGHT - 30, SCREEN_WIDTH - 70))
-        self.teacher.y = max(SAFE_TOP + 30, min(SAFE_BOTTOM - 80, 400))
-        
         # Рисуем персонажей
-        self.student.draw(self.screen, self.player_sprites)
-        self.teacher.draw(self.screen, self.teacher_sprites)
+        self.student.draw(self.screen, self.player_sprites, self.render_alpha,
+                          self.student_animator.sprite(self.player_animations))
+        self.teacher.draw(self.screen, self.teacher_sprites, self.sim.tick_rate, blink=not self.governor.shedding,
+                          frame=self.teacher_animator.sprite(self.teacher_animations))
+        self.particles.draw(self.screen, self.animation_time())
         
         # UI сверху
-        self.draw_ui()
+        with self.profiler.section("draw_ui"):
+            self.draw_ui()
         
         # Сообщения
-        self.draw_messages()
+        with self.profiler.section("draw_messages"):
+            self.draw_messages()
         
         # Кнопки активностей (внизу, в линию)
         for button in self.buttons:
@@ -780,21 +983,21 @@ class Game:
         
         # Очки (слева)
         score_text = f"Очки: {self.score}"
-        score_surface = self.font_medium.render(score_text, True, UTM_GOLD)
+        score_surface = text_cache.render(self.font_medium, score_text, UTM_GOLD)
         self.screen.blit(score_surface, (15, 15))
         
         # Время (справа)
-        time_sec = self.time_remaining // FPS
+        time_sec = self.time_remaining // self.sim.tick_rate
         time_text = f"Время: {time_sec}s"
         time_color = RED if time_sec < 10 else YELLOW
-        time_surface = self.font_medium.render(time_text, True, time_color)
+        time_surface = text_cache.render(self.font_medium, time_text, time_color)
         time_rect = time_surface.get_rect(topright=(SCREEN_WIDTH - 15, 15))
         self.screen.blit(time_surface, time_rect)
         
         # Статус учителя (по центру)
         teacher_status = "[WARNING] УЧИТЕЛЬ СМОТРИТ!" if self.teacher.looking_at_student else "[OK] БЕЗОПАСНО"
         teacher_color = RED if self.teacher.looking_at_student else GREEN
-        teacher_text = self.font_small.render(teacher_status, True, teacher_color)
+        teacher_text = text_cache.render(self.font_small, teacher_status, teacher_color)
         teacher_rect = teacher_text.get_rect(center=(SCREEN_WIDTH // 2, 60))
         
         # Фон статуса
@@ -809,7 +1012,7 @@ class Game:
         max_messages = 2
         
         for i, (msg_text, _) in enumerate(self.messages[:max_messages]):
-            msg_surface = self.font_small.render(msg_text, True, BLACK)
+            msg_surface = text_cache.render(self.font_small, msg_text, BLACK)
             msg_rect = msg_surface.get_rect(center=(SCREEN_WIDTH // 2, message_y))
             
             # Фон сообщения
@@ -820,80 +1023,76 @@ class Game:
             self.screen.blit(msg_surface, msg_rect)
             message_y += 50
     
-    def draw_game_over(self):
-        """Отрисовать экран Game Over"""
-        # Полупрозрачное затемнение
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill(RED)
-        self.screen.blit(overlay, (0, 0))
-        
-        title = self.font_large.render("ПОЙМАЛИ!", True, YELLOW)
+    def compose_final_screen(self):
+        """Собрать экран итогов один раз: последний кадр раунда, эффекты и надписи"""
+        # На экране ещё последний кадр игры - снимок для эффектов и перехода
+        snapshot = self.screen.copy()
+        if self.state == GameState.GAME_OVER:
+            # Размытый кадр под красной тонировкой, края затемнены
+            final = post_effects(snapshot, blur=GAME_OVER_BLUR, tint=RED, tint_amount=GAME_OVER_TINT,
+                                 vignette=GAME_OVER_VIGNETTE)
+            self.draw_game_over(final)
+        else:
+            final = self.layers.layer("win", self.screen.get_size(), self.build_win_layer).copy()
+            self.draw_win(final)
+        self.compositor.compose((self.state, self.score), snapshot, final)
+    
+    def draw_game_over(self, surface: pygame.Surface):
+        """Надписи экрана Game Over"""
+        title = text_cache.render(self.font_large, "ПОЙМАЛИ!", YELLOW)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 150))
-        self.screen.blit(title, title_rect)
+        surface.blit(title, title_rect)
         
-        message = self.font_small.render("Учитель увидел твою активность!", True, WHITE)
+        message = text_cache.render(self.font_small, "Учитель увидел твою активность!", WHITE)
         message_rect = message.get_rect(center=(SCREEN_WIDTH // 2, 250))
-        self.screen.blit(message, message_rect)
+        surface.blit(message, message_rect)
         
-        score_text = self.font_medium.render(f"Очки: {self.score}", True, YELLOW)
+        score_text = text_cache.render(self.font_medium, f"Очки: {self.score}", YELLOW)
         score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, 350))
-        self.screen.blit(score_text, score_rect)
+        surface.blit(score_text, score_rect)
         
-        hint = self.font_small.render("Нажми ENTER для меню", True, WHITE)
+        hint = text_cache.render(self.font_small, "Нажми ENTER для меню", WHITE)
         hint_rect = hint.get_rect(center=(SCREEN_WIDTH // 2, 500))
-        self.screen.blit(hint, hint_rect)
-    
-    def draw_win(self):
-        """Отрисовать экран победы"""
-        # Градиент победы
-        for y in range(SCREEN_HEIGHT):
-            color_val = int(GREEN[0] + (DARK_GREEN[0] - GREEN[0]) * y / SCREEN_HEIGHT)
-            pygame.draw.line(self.screen,
-                           (color_val, int(GREEN[1] + (DARK_GREEN[1] - GREEN[1]) * y / SCREEN_HEIGHT),
-                            int(GREEN[2] + (DARK_GREEN[2] - GREEN[2]) * y / SCREEN_HEIGHT)),
-                           (0, y), (SCREEN_WIDTH, y))
-        
-        title = self.font_large.render("УСПЕХ!", True, YELLOW)
+        surface.blit(hint, hint_rect)
+    
+    def draw_win(self, surface: pygame.Surface):
+        """Надписи экрана победы"""
+        title = text_cache.render(self.font_large, "УСПЕХ!", YELLOW)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 150))
-        self.screen.blit(title, title_rect)
+        surface.blit(title, title_rect)
         
-        message = self.font_small.render("Ты пережил экзамен безнаказанно!", True, WHITE)
+        message = text_cache.render(self.font_small, "Ты пережил экзамен безнаказанно!", WHITE)
         message_rect = message.get_rect(center=(SCREEN_WIDTH // 2, 250))
-        self.screen.blit(message, message_rect)
+        surface.blit(message, message_rect)
         
-        score_text = self.font_large.render(f"Счёт: {self.score}", True, YELLOW)
+        score_text = text_cache.render(self.font_large, f"Счёт: {self.score}", YELLOW)
         score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, 350))
-        self.screen.blit(score_text, score_rect)
+        surface.blit(score_text, score_rect)
         
-        hint = self.font_small.render("Нажми ENTER для меню", True, WHITE)
+        hint = text_cache.render(self.font_small, "Нажми ENTER для меню", WHITE)
         hint_rect = hint.get_rect(center=(SCREEN_WIDTH // 2, 500))
-        self.screen.blit(hint, hint_rect)
+        surface.blit(hint, hint_rect)
     
-    def handle_menu_click(self, pos: Tuple[int, int]):
+    def handle_menu_click(self, button: Button):
         """Обработить клик в меню"""
-        for button in self.buttons:
-            if button.is_clicked(pos):
-                if button.action == "start":
-                    self.state = GameState.DIFFICULTY_MENU
-                    self.create_difficulty_buttons()
-                elif button.action == "rules":
-                    self.state = GameState.RULES_MENU
-                    self.create_menu_buttons()  # Для кнопки "Назад"
-                elif button.action == "exit":
-                    return False
+        if button.action == "start":
+            self.state = GameState.DIFFICULTY_MENU
+            self.create_difficulty_buttons()
+        elif button.action == "rules":
+            self.state = GameState.RULES_MENU
+            self.create_rules_buttons()
+        elif button.action == "exit":
+            return False
         return True
     
-    def handle_rules_click(self, pos: Tuple[int, int]):
+    def handle_rules_click(self, button: Button):
         """Обработить клик в меню правил"""
-        for button in self.buttons:
-            if button.is_clicked(pos):
-                if button.action == "back_to_menu" or button.action == "back":
-                    self.state = GameState.MAIN_MENU
-                    self.create_menu_buttons()
+        if button.action == "back_to_menu" or button.action == "back":
+            self.state = GameState.MAIN_MENU
+            self.create_menu_buttons()
         return True
     
-    def handle_difficulty_click(self, pos: Tuple[int, int]):
+    def handle_difficulty_click(self, button: Button):
         """Обработить клик в меню выбора сложности"""
         difficulty_map = {
             "easy": Difficulty.EASY,
@@ -902,196 +1101,352 @@ class Game:
             "impossible": Difficulty.IMPOSSIBLE,
         }
         
-        for button in self.buttons:
-            if button.is_clicked(pos):
-                if button.action in difficulty_map:
-                    self.difficulty = difficulty_map[button.action]
-                    self.start_game()
-                elif button.action == "back":
-                    self.state = GameState.MAIN_MENU
-                    self.create_menu_buttons()
+        if button.action in difficulty_map:
+            self.difficulty = difficulty_map[button.action]
+            self.start_game()
+        elif button.action == "back":
+            self.state = GameState.MAIN_MENU
+            self.create_menu_buttons()
         return True
     
-    def handle_game_click(self, pos: Tuple[int, int]):
+    def handle_game_click(self, button: Button):
         """Обработить клик в игре"""
-        for button in self.buttons:
-            if button.is_clicked(pos) and button.action:
-                # Маппинг кнопок на активности
-                action_map = {
-                    "cheat": StudentActivity.CHEAT,
-                    "games": StudentActivity.GAMES,
-                    "sleep": StudentActivity.SLEEP,
-                    "eat": StudentActivity.EAT,
-                }
-                
-                if button.action in action_map:
-                    target_activity = action_map[button.action]
-                    
-                    # Только начинаем действие если студент в нормальном состоянии
-                    if self.student.current_activity == StudentActivity.NORMAL:
-                        self.student.start_activity(target_activity)
-                    else:
-                        # Если есть активное действие - показываем предупреждение
-                        self.add_message("[WARNING] Заверши текущее действие!", 100)
-                    
-                    # Сообщения
-                    # messages = {
-                    #     "cheat": "[CHEAT] Начала списывать ответ! (3 сек)",
-                    #     "games": "[GAMES] Начала играть в телефон! (2 сек)",
-                    #     "sleep": "[SLEEP] Начала спать! (4 сек)",
-                    #     "eat": "[EAT] Начала есть! (2.5 сек)",
-                    # }
-                    # self.add_message(messages.get(button.action, ""), 120)
-                
-                elif button.action == "normal":
-                    # "ОТМЕНИТЬ" - прерывает любое действие
-                    # if self.student.activity_duration > 0:
-                    #     self.add_message("[STOP] Остановила текущее действие!", 100)
-                    # else:
-                    #     self.add_message("[INFO] Нет активного действия для отмены", 100)
-                    
-                    self.student.current_activity = StudentActivity.NORMAL
-                    self.student.activity_duration = 0
-                    self.student.activity_timer = 0
-                break
+        if button.action in GAME_ACTIONS:
+            # Только начинаем действие если студент в нормальном состоянии,
+            # иначе сессия покажет предупреждение. "normal" ("ОТМЕНИТЬ") прерывает любое действие
+            self.session.click(GAME_ACTIONS[button.action])
+    
+    def hit_button(self, pos: Tuple[int, int]) -> Optional[Button]:
+        """Кнопка под точкой (индекс перестраивается, когда меняется набор кнопок)"""
+        if self.button_index is None or self.button_index.buttons is not self.buttons:
+            self.button_index = ButtonIndex(self.buttons)
+        return self.button_index.hit(pos)
     
     def handle_click(self, pos: Tuple[int, int]):
-        """Обработить клик мыши"""
+        """Обработить клик мыши или тап"""
+        button = self.hit_button(pos)
+        if button is None:
+            return True
         if self.state == GameState.MAIN_MENU:
-            return self.handle_menu_click(pos)
+            return self.handle_menu_click(button)
         elif self.state == GameState.RULES_MENU:
-            return self.handle_rules_click(pos)
+            return self.handle_rules_click(button)
         elif self.state == GameState.DIFFICULTY_MENU:
-            return self.handle_difficulty_click(pos)
+            return self.handle_difficulty_click(button)
         elif self.state == GameState.GAME:
-            self.handle_game_click(pos)
-        elif self.state in [GameState.GAME_OVER, GameState.WIN]:
-            pass
+            self.handle_game_click(button)
         return True
     
+    def handle_hold(self, pos: Tuple[int, int]):
+        """Удержание пальца на кнопке активности - подсказка вместо действия"""
+        button = self.hit_button(pos)
+        if self.state != GameState.GAME or button is None or button.action not in GAME_ACTIONS:
+            return
+        activity = GAME_ACTIONS[button.action]
+        if activity == StudentActivity.NORMAL:
+            self.session.add_message("[INFO] Прервать текущее действие", 120)
+        else:
+            label = button.text.split()[0]
+            seconds = StudentModel.ACTIVITY_DURATIONS[activity] / SIM_FPS
+            self.session.add_message(f"[INFO] {label}: +{ACTIVITY_POINTS[activity]} очков за {seconds:g} сек", 120)
+    
     def handle_key(self, key):
         """Обработить нажатие клавиши"""
         if key == pygame.K_RETURN:
             if self.state in [GameState.GAME_OVER, GameState.WIN]:
                 self.state = GameState.MAIN_MENU
+                self.compositor.reset()
                 self.music_manager.stop_all_music()
                 self.create_menu_buttons()
+        elif key == pygame.K_F3:
+            self.profiler.toggle_overlay()
+        elif key == pygame.K_F4:
+            self.save_trace()
+    
+    def save_trace(self):
+        """Сохранить трассу кадров (Chrome trace JSON)"""
+        path = self.trace_path or "trace.json"
+        try:
+            self.profiler.export_trace(path)
+            print(f"[INFO] Трасса сохранена: {path}")
+        except OSError as e:
+            print(f"[WARNING] Не удалось сохранить трассу: {e}")
     
     def update(self):
         """Обновить состояние игры"""
         if self.state == GameState.GAME:
-            # Обновить сообщения
-            self.messages = [(msg, time - 1) for msg, time in self.messages if time > 0]
-            
-            # Обновить метки кнопок
-            self.update_button_labels()
-            
-            # Сохранить активность ДО обновления
-            was_activity = self.student.current_activity
-            
-            # Обновить активность студента
-            activity_completed = self.student.update_activity()
-            
-            # Если активность завершена - дать очки
-            if activity_completed and was_activity != StudentActivity.NORMAL:
-                activity = was_activity
-                points = {
-                    StudentActivity.CHEAT: 20,
-                    StudentActivity.GAMES: 10,
-                    StudentActivity.SLEEP: 5,
-                    StudentActivity.EAT: 5,
-                    StudentActivity.NORMAL: 0,
-                }
-                self.score += points.get(activity, 0)
-                if points.get(activity, 0) > 0:
-                    self.add_message(f"[SUCCESS] Успешно! +{points[activity]} очков", 120)
-            
-            # Обновить время
-            self.time_remaining -= 1
-            self.game_time += 1
+            # Шаг правил (активность студента, таймер, учитель) и сообщения о нём
+            warned = self.teacher.warning_timer > 0
+            outcome = self.session.step()
+            self.spawn_particles(warned)
             
             # Проверить конец времени
-            if self.time_remaining <= 0:
-                self.update_best_score(self.score)
+            if outcome == RoundOutcome.WIN:
+                self.finish_round(outcome)
                 self.state = GameState.WIN
                 self.music_manager.stop_all_music()
                 self.music_manager.play_win_music()
-                self.add_message("[WIN] Время вышло! Ты выжил!", 240)
                 return
             
-            # Обновить состояние учителя
-            if self.teacher.look_timer > 0:
-                self.teacher.look_timer -= 1
-                # Активировать предупреждающий знак когда осталось 1 секунда до взгляда
-                if self.teacher.look_timer <= 60 and self.teacher.look_timer > 0:
-                    self.teacher.warning_timer = self.teacher.look_timer
-                else:
-                    self.teacher.warning_timer = 0
-            else:
-                # Проверить вероятность того, что учитель посмотрит
-                if random.randint(1, 100) <= self.teacher_look_chance:
-                    # Учитель начинает смотреть
-                    self.teacher.looking_at_student = True
-                    
-                    # Проверить - поймана ли студентка?
-                    if self.student.activity_duration > 0:
-                        self.update_best_score(self.score)
-                        self.add_message("[CAUGHT] ПОЙМАНА! Учитель заметил активность!", 180)
-                        self.state = GameState.GAME_OVER
-                        self.music_manager.stop_all_music()
-                        self.music_manager.play_game_over_music()
-                        return
-                
-                if self.teacher.look_duration > 0:
-                    self.teacher.look_duration -= 1
-                else:
-                    # Прекратить смотреть
-                    self.teacher.looking_at_student = False
-                    self.schedule_teacher_actions()
-        
-        # Обновить позицию мыши для наведения
-        mouse_pos = pygame.mouse.get_pos()
-        for button in self.buttons:
-            button.update_hover(mouse_pos)
+            # Проверить - поймана ли студентка?
+            if outcome == RoundOutcome.CAUGHT:
+                self.finish_round(outcome)
+                self.state = GameState.GAME_OVER
+                self.music_manager.stop_all_music()
+                self.music_manager.play_game_over_music()
+                return
+    
+    def spawn_particles(self, warned: bool):
+        """Частицы тика: "+очки" за законченную активность и искры при появлении "!" над учителем"""
+        if self.governor.shedding:
+            return  # Под перегрузкой эффекты не запускаются
+        now = self.sim.game_time / self.sim.tick_rate
+        points = self.sim.last_points
+        if points > 0:
+            frames = self.pop_frames.get(points)
+            if frames is None:
+                frames = fade_frames(text_cache.render(self.font_medium, f"+{points}", UTM_GOLD))
+                self.pop_frames[points] = frames
+            self.particles.spawn(frames, self.student.x, self.student.y - 90, 0, POP_SPEED, now, POP_LIFE)
+        teacher = self.teacher
+        if teacher.warning_timer > 0 and not warned:
+            for i in range(SPARKS):
+                angle = 2 * math.pi * i / SPARKS
+                self.particles.spawn(self.spark_frames, teacher.x - 80, teacher.y - 80,
+                                     SPARK_SPEED * math.cos(angle), SPARK_SPEED * math.sin(angle),
+                                     now, SPARK_LIFE, SPARK_GRAVITY)
+    
+    def animation_time(self) -> float:
+        """Время раунда в секундах для анимаций и частиц (с долей текущего тика)"""
+        return (self.sim.game_time + self.render_alpha) / self.sim.tick_rate
     
-    def draw(self):
-        """Отрисовать кадр"""
+    def update_hover(self):
+        """Подсветить кнопку под последней позицией указателя"""
+        button = self.hit_button(self.pointer)
+        if button is not self.hovered_button:
+            if self.hovered_button is not None:
+                self.hovered_button.hovered = False
+            if button is not None:
+                button.hovered = True
+            self.hovered_button = button
+    
+    def track_regions(self):
+        """Описать видимые элементы экрана, чтобы найти изменившиеся области"""
+        final = self.state in [GameState.GAME_OVER, GameState.WIN]
+        if final and self.compositor.key != (self.state, self.score):
+            self.compose_final_screen()
+        if self.state != self.drawn_state:
+            self.drawn_state = self.state
+            self.dirty.invalidate()
+        
+        # Кнопки: на финальных экранах их не видно
+        buttons = [] if final else self.buttons
+        for i, button in enumerate(buttons):
+            # Тень кнопки смещена на 4 пикселя вниз
+            self.dirty.track(("button", i), button.rect.inflate(0, 8), (button.text, button.hovered))
+        
         if self.state == GameState.MAIN_MENU:
-            self.draw_main_menu()
+            self.dirty.track("best_score", (0, SCREEN_HEIGHT - 760, SCREEN_WIDTH, 60),
+                             (self.best_score, self.leaderboard.ready, self.leaderboard.count()))
+            self.dirty.track("last_run", (0, LAST_RUN_Y - 20, SCREEN_WIDTH, 70),
+                             (self.leaderboard.ready, self.leaderboard.last, self.leaderboard.count()))
         elif self.state == GameState.DIFFICULTY_MENU:
-            self.draw_difficulty_menu()
-        elif self.state == GameState.RULES_MENU:
-            self.draw_rules_menu()
+            for i, button in enumerate(self.buttons[:len(Difficulty)]):
+                self.dirty.track(("top_scores", i), (0, button.rect.bottom + 4, SCREEN_WIDTH, 32),
+                                 (self.leaderboard.ready, self.leaderboard.count()))
+        elif final:
+            # Готовый экран итогов меняется, только пока идёт переход к нему
+            self.dirty.track("final", self.screen.get_rect(), self.compositor.index())
         elif self.state == GameState.GAME:
-            self.draw_game()
-        elif self.state == GameState.GAME_OVER:
-            self.draw_game_over()
-        elif self.state == GameState.WIN:
-            self.draw_win()
-        
-        pygame.display.flip()
+            student, teacher = self.student, self.teacher
+            now = self.animation_time()
+            self.particles.update(now)
+            self.dirty.track("ui", (0, 0, SCREEN_WIDTH, 102),
+                             (self.score, self.time_remaining // self.sim.tick_rate, teacher.looking_at_student))
+            
+            # Студент и прогресс-бар над головой
+            sprite = self.player_sprites.get(student.current_activity)
+            size = sprite.get_size() if sprite else (80, 130)
+            student_rect = pygame.Rect(0, 0, *size)
+            student_rect.center = (int(student.x), int(student.y + 10))
+            student_rect.union_ip((int(student.x - 20), int(student.y - 65), 40, 5))
+            progress = int(40 * student.progress_fraction(self.render_alpha))  # Ширина заполнения бара
+            frame = self.student_animator.update(self.player_animations, student.current_activity, now)
+            self.dirty.track("student", student_rect, (student.current_activity, progress, frame))
+            
+            # Учитель и мигающий "!"
+            sprite = self.teacher_sprites.get('watch' if teacher.looking_at_student else 'sleep')
+            size = sprite.get_size() if sprite else (90, 150)
+            teacher_rect = pygame.Rect(0, 0, *size)
+            teacher_rect.center = (int(teacher.x), int(teacher.y + 10))
+            teacher_rect.union_ip((int(teacher.x - 110), int(teacher.y - 115), 60, 70))
+            blink = not self.governor.shedding
+            frame = self.teacher_animator.update(self.teacher_animations,
+                                                 'watch' if teacher.looking_at_student else 'sleep', now)
+            self.dirty.track("teacher", teacher_rect,
+                             (teacher.looking_at_student, teacher.warning_visible(self.sim.tick_rate, blink), frame))
+            
+            if self.particles.active:
+                # Частицы двигаются каждый кадр, пока живы
+                self.dirty.track("particles", self.particles.bounds(now), now)
+            
+            self.dirty.track("messages", (0, 175, SCREEN_WIDTH, 100), tuple(text for text, _ in self.messages[:2]))
+        
+        if not self.assets_ready:
+            self.dirty.track("loading", LOADING_RECT, self.assets_total - self.assets.pending)
+        
+        if self.profiler.overlay_visible:
+            # Цифры оверлея обновляются дважды в секунду, а не каждый кадр (при перегрузке - реже)
+            interval = 120 if self.governor.shedding else 30
+            if not self.profiler_lines or self.profiler.frames % interval == 0:
+                self.profiler_lines = self.profiler.overlay_lines() + [self.input.latency_line(),
+                                                                       self.governor.status_line()]
+            self.dirty.track("profiler", (0, 285, SCREEN_WIDTH, 170), tuple(self.profiler_lines))
+    
+    def draw_loading(self):
+        """Индикатор фоновой загрузки изображений"""
+        label = "Загрузка..."
+        if self.assets_total:
+            label += f" {self.assets_total - self.assets.pending}/{self.assets_total}"
+        text = text_cache.render(self.font_small, label, WHITE)
+        self.screen.blit(text, text.get_rect(center=LOADING_RECT.center))
+    
+    def draw(self) -> bool:
+        """Отрисовать кадр (выводятся только изменившиеся области); False - выводить было нечего"""
+        self.track_regions()
+        rects = self.dirty.collect()
+        if not rects:
+            return False  # Ничего не изменилось - кадр не перерисовываем
+        
+        # Всё, что за пределами изменившихся областей, не рисуется
+        self.screen.set_clip(rects[0].unionall(rects[1:]))
+        
+        with self.profiler.section("draw_" + self.state.name.lower()):
+            if self.state == GameState.MAIN_MENU:
+                self.draw_main_menu()
+            elif self.state == GameState.DIFFICULTY_MENU:
+                self.draw_difficulty_menu()
+            elif self.state == GameState.RULES_MENU:
+                self.draw_rules_menu()
+            elif self.state == GameState.GAME:
+                self.draw_game()
+            elif self.state in [GameState.GAME_OVER, GameState.WIN]:
+                self.screen.blit(self.compositor.current(), (0, 0))
+        
+        if not self.assets_ready:
+            self.draw_loading()
+        
+        if self.profiler.overlay_visible and self.profiler_lines:
+            draw_overlay(self.screen, self.profiler_lines, self.font_small, text_cache.render, (8, 290))
+        
+        self.screen.set_clip(None)
+        with self.profiler.section("present"):
+            pygame.display.update(rects)
+        return True
+    
+    def can_idle(self) -> bool:
+        """Экран статичен (меню, итоги) и фоновая загрузка закончена - можно ждать событий"""
+        return (self.state != GameState.GAME and self.assets_ready and self.leaderboard.ready
+                and not self.profiler.overlay_visible and self.startup is None
+                and not self.compositor.animating)
     
     def run(self):
-        """Главный цикл игры"""
+        """Главный цикл игры: правила с фиксированным шагом, отрисовка - сколько успевает"""
         running = True
+        sim_step = 1.0 / self.sim.tick_rate
+        accumulator = 0.0
+        previous = time.perf_counter()
+        
+        profiler = self.profiler
         
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            profiler.begin_frame()
+            frame_started = time.perf_counter()
+            with profiler.section("events"):
+                frame = self.input.poll()
+                if frame.pointer is not None:
+                    self.pointer = frame.pointer
+                for pos, _ in frame.presses:
+                    if running:
+                        running = self.handle_click(pos)
+                for pos in frame.holds:
+                    self.handle_hold(pos)
+                for key in frame.keys:
+                    self.handle_key(key)
+                if frame.expose:
+                    # Окно перекрыли/восстановили - перерисовать целиком
+                    self.dirty.invalidate()
+                if frame.quit:
                     running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:
-                        running = self.handle_click(event.pos)
-                elif event.type == pygame.KEYDOWN:
-                    self.handle_key(event.key)
             
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
-        
+            # Накопить реальное время и отработать целое число тиков симуляции
+            now = time.perf_counter()
+            accumulator += min(now - previous, MAX_FRAME_TIME)
+            previous = now
+            with profiler.section("update"):
+                while accumulator >= sim_step:
+                    self.update()
+                    accumulator -= sim_step
+            # Под перегрузкой прогресс-бар двигается только по тикам - меньше перерисовок
+            self.render_alpha = 0.0 if self.governor.shedding else accumulator / sim_step
+            
+            self.update_hover()
+            changed = self.draw()
+            self.input.frame_presented()
+            if profiler.frames == 0:
+                self.mark_startup("first_frame")
+            with profiler.section("assets"):
+                self.poll_assets()
+            if self.startup is not None and self.assets_ready:
+                print("\n".join(self.startup.report()))
+                running = False
+            
+            self.governor.frame_done(changed, self.can_idle(), time.perf_counter() - frame_started)
+            if self.governor.should_idle:
+                # Статичный экран: спать до события вместо 60 пустых кадров в секунду
+                profiler.pause()
+                self.input.wait(self.governor.IDLE_TIMEOUT)
+                self.governor.woke()
+                previous = time.perf_counter()
+                accumulator = 0.0
+            else:
+                self.clock.tick(self.render_fps)
+        
+        if self.trace_path:
+            self.save_trace()
+        self.assets.close()
+        self.history.close()
+        if self.session.recorder is not None:
+            # Незаконченный раунд остаётся в записи без итога
+            self.session.recorder.close()
         pygame.quit()
         sys.exit()
 
+def parse_args(argv=None):
+    """Параметры командной строки"""
+    parser = argparse.ArgumentParser(description="UTM Cheating Simulator")
+    parser.add_argument("--sim-hz", type=int, default=SIM_FPS, help="частота симуляции (тиков в секунду)")
+    parser.add_argument("--fps", type=int, default=FPS, help="ограничение частоты отрисовки (0 - без ограничения)")
+    parser.add_argument("--trace", default=None, help="файл трассы кадров (Chrome trace JSON), пишется при выходе")
+    parser.add_argument("--record", default=None, metavar="DIR", help="записывать раунды для replay.py в папку DIR")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="вывести время этапов запуска и выйти после загрузки")
+    parser.add_argument("--fullscreen", action="store_true", help="во весь экран (холст масштабируется)")
+    parser.add_argument("--hall", type=int, default=0, metavar="N",
+                        help="экзаменационный зал на N студентов вместо обычного раунда")
+    parser.add_argument("--teachers", type=int, default=6, help="число преподавателей в зале (--hall)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    game = Game()
+    args = parse_args()
+    if args.hall:
+        from hall_view import run_hall
+        sys.exit(run_hall(args.hall, args.teachers, (SCREEN_WIDTH, SCREEN_HEIGHT),
+                          sim_hz=args.sim_hz, render_fps=args.fps, fullscreen=args.fullscreen))
+    startup = None
+    if args.startup_profile:
+        startup = StartupTimer(STARTUP_STARTED)
+        startup.mark("import")
+    game = Game(sim_hz=args.sim_hz, render_fps=args.fps, trace_path=args.trace, record_dir=args.record,
+                startup=startup, fullscreen=args.fullscreen)
     game.run()
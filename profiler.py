@@ -0,0 +1,217 @@
+"""Профилировщик кадров.
+
+Замеряет время подсистем кадра (события, update, draw_*, вывод на экран),
+хранит скользящую историю длительностей кадров и показывает оверлей с
+p50/p95/p99 и числом пропущенных кадров. Последние события можно
+сохранить в формате Chrome trace (chrome://tracing, Perfetto).
+
+StartupTimer - засечки этапов запуска игры (импорт, подсистемы SDL,
+первый кадр, загрузка картинок) для отчёта --startup-profile.
+
+FrameGovernor решает, когда статичный экран может ждать событий вместо
+кадров, и когда кадр не укладывается в бюджет настолько, что стоит
+отключить необязательные эффекты.
+"""
+import json
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import pygame
+
+_clock = time.perf_counter
+
+
+class _Section:
+    """Контекстный менеджер одного замера (переиспользуется для каждого имени)"""
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler: "FrameProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.started, _clock())
+        return False
+
+
+class FrameProfiler:
+    """Замеры подсистем кадра, статистика и экспорт трассы"""
+
+    def __init__(self, target_fps: int = 60, history: int = 600, trace_capacity: int = 20000):
+        self.budget = 1.0 / target_fps if target_fps > 0 else 1.0 / 60
+        self.frame_times: Deque[float] = deque(maxlen=history)
+        self.dropped_frames = 0
+        self.frames = 0
+        self.overlay_visible = False
+        # Сумма времени по подсистемам за текущий кадр и сглаженная история
+        self._sections: Dict[str, _Section] = {}
+        self._frame_totals: Dict[str, float] = {}
+        self.section_averages: Dict[str, float] = {}
+        # Кольцевой буфер событий трассы: (имя, начало, длительность) в секундах
+        self.trace: Deque[Tuple[str, float, float]] = deque(maxlen=trace_capacity)
+        self._origin = _clock()
+        self._frame_started: Optional[float] = None
+        self._stats_cache: Optional[dict] = None
+
+    def section(self, name: str) -> _Section:
+        """with profiler.section("update"): ..."""
+        section = self._sections.get(name)
+        if section is None:
+            section = self._sections[name] = _Section(self, name)
+        return section
+
+    def record(self, name: str, started: float, finished: float):
+        duration = finished - started
+        self._frame_totals[name] = self._frame_totals.get(name, 0.0) + duration
+        self.trace.append((name, started, duration))
+
+    def begin_frame(self):
+        """Начало кадра; длительность кадра - интервал между begin_frame()"""
+        now = _clock()
+        if self._frame_started is not None:
+            frame_time = now - self._frame_started
+            self.frame_times.append(frame_time)
+            self.frames += 1
+            if frame_time > self.budget * 1.5:
+                self.dropped_frames += 1
+            self.trace.append(("frame", self._frame_started, frame_time))
+            # Экспоненциальное сглаживание времени подсистем для оверлея
+            averages = self.section_averages
+            for name in set(averages) | set(self._frame_totals):
+                value = self._frame_totals.get(name, 0.0)
+                averages[name] = averages.get(name, value) * 0.95 + value * 0.05
+            self._stats_cache = None
+        self._frame_totals = {}
+        self._frame_started = now
+
+    def stats(self) -> dict:
+        """Перцентили длительности кадра (мс) и число пропущенных кадров"""
+        if self._stats_cache is None:
+            samples = sorted(self.frame_times)
+            if samples:
+                def pct(p):
+                    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+                self._stats_cache = {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99),
+                                     "dropped": self.dropped_frames, "frames": self.frames}
+            else:
+                self._stats_cache = {"p50": 0.0, "p95": 0.0, "p99": 0.0, "dropped": 0, "frames": 0}
+        return self._stats_cache
+
+    def overlay_lines(self) -> List[str]:
+        """Строки оверлея (округлены, чтобы не менялись каждый кадр)"""
+        stats = self.stats()
+        lines = [f"p50 {stats['p50']:.1f}  p95 {stats['p95']:.1f}  p99 {stats['p99']:.1f} ms",
+                 f"dropped {stats['dropped']} / {stats['frames']}"]
+        for name, value in sorted(self.section_averages.items(), key=lambda item: -item[1])[:6]:
+            lines.append(f"{name}: {value * 1000:.2f} ms")
+        return lines
+
+    def pause(self):
+        """Закончить кадр перед ожиданием событий: простой не считается кадром"""
+        self.begin_frame()
+        self._frame_started = None
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+    def export_trace(self, path: str):
+        """Сохранить кольцевой буфер в формате Chrome trace JSON"""
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "pid": pid, "tid": 0 if name == "frame" else 1,
+                   "ts": round((started - self._origin) * 1e6, 1), "dur": round(duration * 1e6, 1)}
+                  for name, started, duration in list(self.trace)]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        os.replace(tmp_path, path)
+
+
+class StartupTimer:
+    """Длительности этапов запуска: каждый этап - от предыдущей засечки"""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = _clock() if started is None else started
+        self.marks: List[Tuple[str, float]] = []
+        self._last = self.started
+
+    def mark(self, name: str):
+        now = _clock()
+        self.marks.append((name, now - self._last))
+        self._last = now
+
+    def report(self) -> List[str]:
+        """Строки отчёта: этап, длительность и время от старта (мс)"""
+        lines = []
+        elapsed = 0.0
+        for name, duration in self.marks:
+            elapsed += duration
+            lines.append(f"{name:<14}{duration * 1000:>9.1f} ms{elapsed * 1000:>10.1f} ms")
+        return lines
+
+
+class FrameGovernor:
+    """Темп кадров: простой на статичных экранах и сброс эффектов при перегрузке"""
+
+    IDLE_AFTER = 3         # Кадров без изменений на экране до перехода в простой
+    IDLE_TIMEOUT = 1000    # Мс: в простое всё равно просыпаться раз в секунду
+    SHED_AFTER = 30        # Кадров подряд сверх бюджета до сброса эффектов
+    RESTORE_AFTER = 120    # Кадров подряд с запасом до их возврата
+    RESTORE_MARGIN = 0.6   # "С запасом" - работа кадра меньше 60% бюджета
+
+    def __init__(self, target_fps: int = 60):
+        self.budget = 1.0 / target_fps if target_fps > 0 else 1.0 / 60
+        self.quiet_frames = 0
+        self.shedding = False
+        self.idle_waits = 0
+        self._over = 0
+        self._under = 0
+
+    def frame_done(self, changed: bool, can_idle: bool, work: float):
+        """Учесть кадр: changed - было ли что-то выведено, work - время работы кадра (с)"""
+        self.quiet_frames = self.quiet_frames + 1 if can_idle and not changed else 0
+        if work > self.budget:
+            self._over += 1
+            self._under = 0
+        elif work < self.budget * self.RESTORE_MARGIN:
+            self._under += 1
+            self._over = 0
+        if not self.shedding and self._over >= self.SHED_AFTER:
+            self.shedding = True
+        elif self.shedding and self._under >= self.RESTORE_AFTER:
+            self.shedding = False
+
+    @property
+    def should_idle(self) -> bool:
+        return self.quiet_frames >= self.IDLE_AFTER
+
+    def woke(self):
+        """Простой прерван событием или таймаутом: снова полный темп"""
+        self.idle_waits += 1
+        self.quiet_frames = 0
+
+    def status_line(self) -> str:
+        return f"governor: {'shed' if self.shedding else 'full'}  idle waits {self.idle_waits}"
+
+
+def draw_overlay(screen: pygame.Surface, lines: List[str], font: pygame.font.Font,
+                 render_text, topleft: Tuple[int, int] = (8, 108)) -> pygame.Rect:
+    """Нарисовать полупрозрачную панель со строками статистики"""
+    surfaces = [render_text(font, line, (255, 255, 255)) for line in lines]
+    width = max(surface.get_width() for surface in surfaces) + 12
+    height = sum(surface.get_height() for surface in surfaces) + 12
+    panel = pygame.Surface((width, height))
+    panel.set_alpha(180)
+    panel.fill((0, 0, 0))
+    rect = screen.blit(panel, topleft)
+    y = topleft[1] + 6
+    for surface in surfaces:
+        screen.blit(surface, (topleft[0] + 6, y))
+        y += surface.get_height()
+    return rect
@@ -0,0 +1,219 @@
+"""Вспомогательные классы отрисовки.
+
+DirtyRegions - учёт изменившихся областей экрана: каждый кадр Game
+описывает видимые элементы парой (прямоугольник, значение), и на экран
+выводятся только те области, чьё значение или положение изменилось.
+
+LayerCache - готовые поверхности статичных слоёв (градиенты, фон с
+заголовками), которые строятся один раз, а не рисуются построчно.
+
+TextCache - общий LRU-кэш отрисованного текста и объектов Font, чтобы
+в установившемся режиме кадры не растеризовали шрифты заново.
+
+open_display() - окно с логическим холстом: игра рисует в 540x960, а SDL
+масштабирует холст до размера окна одним аппаратным blit (pygame.SCALED).
+"""
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+
+class DirtyRegions:
+    """Отслеживание изменившихся областей экрана между кадрами"""
+
+    def __init__(self, screen_rect: pygame.Rect):
+        self.screen_rect = pygame.Rect(screen_rect)
+        self._regions: Dict[Hashable, Tuple[pygame.Rect, object]] = {}
+        self._seen = set()
+        self._dirty: List[pygame.Rect] = []
+        self._full = True
+
+    def invalidate(self, rect: Optional[pygame.Rect] = None):
+        """Пометить область (или весь экран) для перерисовки"""
+        if rect is None:
+            self._full = True
+        else:
+            self._dirty.append(pygame.Rect(rect))
+
+    def track(self, name: Hashable, rect: pygame.Rect, value: object = None):
+        """Сообщить, что элемент name виден в rect и выглядит как value"""
+        self._seen.add(name)
+        previous = self._regions.get(name)
+        if previous is not None and previous[1] == value and previous[0] == rect:
+            return
+        rect = pygame.Rect(rect)
+        if previous is not None:
+            self._dirty.append(previous[0])
+        self._dirty.append(rect)
+        self._regions[name] = (rect, value)
+
+    def collect(self) -> List[pygame.Rect]:
+        """Забрать области для перерисовки (пустой список - кадр не изменился).
+
+        Элементы, которые не были переданы в track() с прошлого вызова,
+        считаются исчезнувшими - их старые области тоже перерисовываются.
+        """
+        for name in [name for name in self._regions if name not in self._seen]:
+            self._dirty.append(self._regions.pop(name)[0])
+        self._seen = set()
+
+        if self._full:
+            self._full = False
+            self._dirty = []
+            return [self.screen_rect.copy()]
+
+        rects = [rect.clip(self.screen_rect) for rect in self._dirty]
+        self._dirty = []
+        return [rect for rect in rects if rect.width > 0 and rect.height > 0]
+
+
+def vertical_gradient(size: Tuple[int, int], top: Color, bottom: Color,
+                      height: Optional[int] = None, fill: Optional[Color] = None) -> pygame.Surface:
+    """Вертикальный градиент top -> bottom на первых height строках.
+
+    Цвет строки y такой же, как при прежней построчной отрисовке:
+    int(top + (bottom - top) * y / height). Строки ниже height заливаются fill.
+    """
+    width, full_height = size
+    height = full_height if height is None else height
+    surface = pygame.Surface(size)
+    if fill is not None:
+        surface.fill(fill)
+    if height <= 0 or width <= 0:
+        return surface
+
+    # Столбец в 1 пиксель, растянутый по ширине. Градиент рисуется уже в
+    # первом кадре, поэтому NumPy здесь не нужен: так же быстро, а импорт дорогой
+    column = pygame.Surface((1, height))
+    for y in range(height):
+        column.set_at((0, y), tuple(int(a + (b - a) * y / height) for a, b in zip(top, bottom)))
+    surface.blit(pygame.transform.scale(column, (width, height)), (0, 0))
+    return surface
+
+
+class LayerCache:
+    """Кэш статичных слоёв экрана.
+
+    Слой строится функцией build(surface) один раз и пересобирается
+    только при смене размера экрана или зависимостей (deps), например
+    загруженной фоновой картинки или цветовой темы.
+    """
+
+    def __init__(self):
+        self._layers: Dict[Hashable, pygame.Surface] = {}
+
+    def layer(self, name: Hashable, size: Tuple[int, int],
+              build: Callable[[pygame.Surface], None], deps: Tuple = ()) -> pygame.Surface:
+        key = (name, tuple(size), deps)
+        surface = self._layers.get(key)
+        if surface is None:
+            # Устаревшие версии этого слоя больше не нужны
+            for stale in [k for k in self._layers if k[0] == name]:
+                del self._layers[stale]
+            surface = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            build(surface)
+            self._layers[key] = surface
+        return surface
+
+    def clear(self):
+        """Сбросить все слои (например, при смене темы)"""
+        self._layers.clear()
+
+
+class TextCache:
+    """LRU-кэш поверхностей текста по ключу (шрифт, текст, цвет)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+        self._surfaces: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size: int, name: Optional[str] = None) -> pygame.font.Font:
+        """Объект Font создаётся один раз на пару (файл, размер)"""
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(name, size)
+            self._fonts[key] = font
+        return font
+
+    def render(self, font: pygame.font.Font, text: str, color: Color, antialias: bool = True) -> pygame.Surface:
+        """То же, что font.render(), но повторные вызовы берутся из кэша"""
+        key = (font, text, color, antialias)
+        surfaces = self._surfaces
+        surface = surfaces.get(key)
+        if surface is not None:
+            surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        surfaces[key] = surface
+        if len(surfaces) > self.max_entries:
+            surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+# Общий кэш текста для всех экранов и виджетов
+text_cache = TextCache()
+
+
+HEADLESS_DRIVERS = ("dummy", "offscreen")
+
+
+@dataclass(frozen=True)
+class DisplayBucket:
+    """Группа плотности экрана: масштаб логического холста и фильтр масштабирования"""
+    name: str
+    scale: float
+    filter: str  # "nearest" - целый масштаб без размытия, "linear" - дробный
+
+
+def choose_bucket(physical: Tuple[int, int], logical: Tuple[int, int], fullscreen: bool = False) -> DisplayBucket:
+    """Группа для экрана physical.
+
+    В окне SDL увеличивает холст в целое число раз (720x1280 -> 1x,
+    1080x1920 -> 2x), пиксели просто повторяются. Во весь экран масштаб
+    обычно дробный, тогда нужен линейный фильтр, иначе строки пикселей
+    повторяются неравномерно. Экран меньше холста - всегда во весь экран.
+    """
+    fit = min(physical[0] / logical[0], physical[1] / logical[1])
+    if fit < 1:
+        return DisplayBucket("fit", fit, "linear")
+    if fullscreen and fit != int(fit):
+        return DisplayBucket(f"{fit:.2f}x", fit, "linear")
+    return DisplayBucket(f"{int(fit)}x", float(int(fit)), "nearest")
+
+
+def open_display(logical: Tuple[int, int], fullscreen: bool = False) -> Tuple[pygame.Surface, DisplayBucket]:
+    """Окно с логическим холстом logical, масштабируемым под экран"""
+    if pygame.display.get_driver() in HEADLESS_DRIVERS:
+        # Без экрана масштабировать некуда, а программный рендерер SDL только замедлит кадр
+        return pygame.display.set_mode(logical), DisplayBucket("1x", 1.0, "nearest")
+    sizes = pygame.display.get_desktop_sizes()
+    bucket = choose_bucket(sizes[0] if sizes else logical, logical, fullscreen)
+    # Фильтр читается SDL при создании окна; заданный пользователем не трогаем
+    os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", bucket.filter)
+    flags = pygame.SCALED
+    if fullscreen or bucket.scale < 1:
+        flags |= pygame.FULLSCREEN
+    try:
+        return pygame.display.set_mode(logical, flags), bucket
+    except pygame.error as e:
+        print(f"[WARNING] Масштабируемое окно недоступно, окно без масштабирования: {e}")
+        return pygame.display.set_mode(logical), DisplayBucket("1x", 1.0, "nearest")
@@ -0,0 +1,245 @@
+"""Запись и воспроизведение раундов.
+
+Раунд полностью определяется сидом, параметрами сложности и нажатиями
+игрока с номером тика, на котором они случились. Recorder пишет их в
+компактный двоичный файл (.utmr), ReplayPlayer проигрывает раунд без
+окна на максимальной скорости и делает снимки состояния каждые
+snapshot_interval тиков, так что перемотка к любому тику требует не
+больше snapshot_interval шагов.
+
+Пример:
+    python main.py --record recordings
+    python replay.py recordings --verify
+    python replay.py recordings/round-....utmr --seek 900
+"""
+import argparse
+import bisect
+import glob
+import os
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from simulation import (
+    DIFFICULTY_SETTINGS, Difficulty, ExamSimulation, RoundOutcome, RoundResult,
+    RoundSession, SimSnapshot, StudentActivity,
+)
+
+MAGIC = b"UTMR"
+VERSION = 2  # 2 - событийная симуляция (взгляды учителя разыгрываются иначе)
+# Заголовок: сигнатура, версия, сид, сложность, частота тиков, время раунда (сек), шанс взгляда (%)
+HEADER = struct.Struct("<4sBQBHHd")
+# Запись: тик, тип, аргумент (активность или исход), значение (счёт для END)
+RECORD = struct.Struct("<IBBi")
+KIND_ACTION = 1
+KIND_END = 2
+EXTENSION = ".utmr"
+
+
+class Recorder:
+    """Пишет каждый раунд в отдельный файл папки directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._file = None
+
+    def begin(self, seed: int, sim: ExamSimulation):
+        """Начало раунда: заголовок с сидом и параметрами"""
+        self.close()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"round-{time.strftime('%Y%m%d-%H%M%S')}-{seed:016x}{EXTENSION}"
+            self.path = os.path.join(self.directory, name)
+            self._file = open(self.path, "wb")
+            settings = sim.settings[sim.difficulty]
+            self._file.write(HEADER.pack(MAGIC, VERSION, seed, sim.difficulty.value, sim.tick_rate,
+                                         settings["time"], settings["chance"]))
+        except OSError as e:
+            print(f"[WARNING] Не удалось начать запись раунда: {e}")
+            self._file = None
+
+    def action(self, tick: int, activity: StudentActivity):
+        if self._file is not None:
+            self._file.write(RECORD.pack(tick, KIND_ACTION, activity.value, 0))
+
+    def end(self, tick: int, outcome: RoundOutcome, score: int):
+        """Итог раунда - по нему replay.py проверяет воспроизводимость"""
+        if self._file is not None:
+            self._file.write(RECORD.pack(tick, KIND_END, outcome.value, score))
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError as e:
+                print(f"[WARNING] Не удалось сохранить запись раунда: {e}")
+            self._file = None
+
+
+@dataclass
+class Replay:
+    """Содержимое файла записи"""
+    seed: int
+    difficulty: Difficulty
+    tick_rate: int
+    time: int
+    chance: float
+    actions: List[Tuple[int, StudentActivity]] = field(default_factory=list)
+    end: Optional[Tuple[int, RoundOutcome, int]] = None
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path}: файл слишком короткий")
+        magic, version, seed, difficulty, tick_rate, round_time, chance = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: не файл записи раунда")
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия записи {version}")
+        replay = cls(seed, Difficulty(difficulty), tick_rate, round_time, chance)
+        # Обрезанный хвост (игра закрыта посреди записи) просто отбрасываем
+        usable = HEADER.size + (len(data) - HEADER.size) // RECORD.size * RECORD.size
+        for tick, kind, arg, value in RECORD.iter_unpack(data[HEADER.size:usable]):
+            if kind == KIND_ACTION:
+                replay.actions.append((tick, StudentActivity(arg)))
+            elif kind == KIND_END:
+                replay.end = (tick, RoundOutcome(arg), value)
+        return replay
+
+
+@dataclass
+class ReplaySnapshot:
+    """Снимок проигрывателя: правила, сообщения и позиция в списке нажатий"""
+    sim: SimSnapshot
+    messages: List[Tuple[str, int]]
+    next_action: int
+    outcome: RoundOutcome
+
+
+class ReplayPlayer:
+    """Проигрывание записи без окна с перемоткой по снимкам"""
+
+    def __init__(self, replay: Replay, snapshot_interval: int = 600):
+        self.replay = replay
+        self.snapshot_interval = snapshot_interval
+        settings = dict(DIFFICULTY_SETTINGS)
+        settings[replay.difficulty] = {**settings[replay.difficulty], "time": replay.time, "chance": replay.chance}
+        self.sim = ExamSimulation(settings=settings, tick_rate=replay.tick_rate)
+        self.session = RoundSession(self.sim)
+        self.session.start(replay.difficulty, seed=replay.seed)
+        self.outcome = RoundOutcome.RUNNING
+        self._next_action = 0
+        self._snapshot_ticks: List[int] = [0]
+        self._snapshots: List[ReplaySnapshot] = [self._snapshot()]
+
+    @property
+    def tick(self) -> int:
+        return self.sim.game_time
+
+    def _snapshot(self) -> ReplaySnapshot:
+        return ReplaySnapshot(self.sim.snapshot(), list(self.session.messages), self._next_action, self.outcome)
+
+    def _restore(self, snapshot: ReplaySnapshot):
+        self.sim.restore(snapshot.sim)
+        self.session.messages = list(snapshot.messages)
+        self._next_action = snapshot.next_action
+        self.outcome = snapshot.outcome
+
+    def step(self) -> RoundOutcome:
+        """Применить нажатия текущего тика и сделать шаг"""
+        actions = self.replay.actions
+        tick = self.sim.game_time
+        while self._next_action < len(actions) and actions[self._next_action][0] <= tick:
+            self.session.click(actions[self._next_action][1])
+            self._next_action += 1
+        self.outcome = self.session.step()
+
+        tick = self.sim.game_time
+        if tick % self.snapshot_interval == 0 and tick > self._snapshot_ticks[-1]:
+            self._snapshot_ticks.append(tick)
+            self._snapshots.append(self._snapshot())
+        return self.outcome
+
+    def run(self) -> RoundResult:
+        """Доиграть раунд до конца"""
+        while self.outcome == RoundOutcome.RUNNING:
+            self.step()
+        return RoundResult(self.outcome, self.sim.score, self.sim.game_time)
+
+    def seek(self, tick: int):
+        """Перейти к состоянию после tick тиков (или к концу раунда, если он раньше)"""
+        index = bisect.bisect_right(self._snapshot_ticks, tick) - 1
+        if not (index == len(self._snapshot_ticks) - 1 and self._snapshot_ticks[index] <= self.tick <= tick):
+            self._restore(self._snapshots[index])
+        while self.sim.game_time < tick and self.outcome == RoundOutcome.RUNNING:
+            self.step()
+
+    def describe(self) -> str:
+        """Текстовое описание текущего состояния"""
+        student, teacher = self.sim.student, self.sim.teacher
+        lines = [
+            f"тик {self.sim.game_time}, исход {self.outcome.name}, очки {self.sim.score}, "
+            f"осталось {self.sim.time_remaining} тиков",
+            f"студент: {student.current_activity.name} {student.activity_timer}/{student.activity_duration}",
+            f"учитель: смотрит={teacher.looking_at_student} look_timer={teacher.look_timer} "
+            f"look_duration={teacher.look_duration} warning_timer={teacher.warning_timer}",
+        ]
+        lines.extend(f"сообщение: {text} ({ticks})" for text, ticks in self.session.messages)
+        return "\n".join(lines)
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    """Папки раскрываются в список файлов записи"""
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            result.extend(sorted(glob.glob(os.path.join(path, f"*{EXTENSION}"))))
+        else:
+            result.append(path)
+    return result
+
+
+def main(argv=None):
+    """Проверить или перемотать записи раундов"""
+    parser = argparse.ArgumentParser(description="Воспроизведение записанных раундов")
+    parser.add_argument("paths", nargs="+", help="файлы .utmr или папки с ними")
+    parser.add_argument("--seek", type=int, default=None, help="показать состояние на этом тике")
+    parser.add_argument("--verify", action="store_true", help="сверить итог с записанным")
+    parser.add_argument("--snapshot-interval", type=int, default=600)
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for path in expand_paths(args.paths):
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] {e}")
+            failures += 1
+            continue
+        player = ReplayPlayer(replay, args.snapshot_interval)
+
+        if args.seek is not None:
+            player.seek(args.seek)
+            print(f"{path}:\n{player.describe()}")
+
+        if args.verify or args.seek is None:
+            result = player.run()
+            if replay.end is None:
+                print(f"{path}: {result.outcome.name} {result.score} очков за {result.ticks} тиков (итог не записан)")
+            elif replay.end == (result.ticks, result.outcome, result.score):
+                print(f"{path}: OK {result.outcome.name} {result.score} очков за {result.ticks} тиков")
+            else:
+                failures += 1
+                print(f"{path}: РАСХОЖДЕНИЕ - записано {replay.end}, "
+                      f"получено {(result.ticks, result.outcome, result.score)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
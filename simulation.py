@@ -0,0 +1,689 @@
+"""Headless-симуляция правил экзамена.
+
+Модуль не импортирует pygame: здесь живут только правила игры
+(активности студента, расписание взглядов учителя и подсчёт очков),
+поэтому раунды можно прогонять без окна, шрифтов и микшера.
+Game в main.py использует ту же симуляцию для одиночной игры.
+
+Пример:
+    python simulation.py --difficulty impossible --policy threshold --rounds 1000
+"""
+import abc
+import argparse
+import heapq
+import math
+import random
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from enum import Enum, IntEnum
+from typing import Callable, List, Optional, Tuple
+
+# Базовая частота симуляции (тиков в секунду). Длительности в таблицах
+# ниже заданы в тиках при этой частоте; ExamSimulation с другим
+# tick_rate пересчитывает их так, чтобы игра шла с той же скоростью.
+SIM_FPS = 60
+
+
+class StudentActivity(Enum):
+    NORMAL = 1
+    CHEAT = 2
+    GAMES = 3
+    SLEEP = 4
+    EAT = 5
+
+
+class Difficulty(Enum):
+    EASY = 1
+    MEDIUM = 2
+    HARD = 3
+    IMPOSSIBLE = 4
+
+
+class RoundOutcome(Enum):
+    """Результат шага симуляции"""
+    RUNNING = 1
+    WIN = 2
+    CAUGHT = 3
+
+
+# Очки за успешно завершённую активность
+ACTIVITY_POINTS = {
+    StudentActivity.CHEAT: 20,
+    StudentActivity.GAMES: 10,
+    StudentActivity.SLEEP: 5,
+    StudentActivity.EAT: 5,
+    StudentActivity.NORMAL: 0,
+}
+
+# Параметры сложности: время раунда (сек) и шанс взгляда учителя (%)
+DIFFICULTY_SETTINGS = {
+    Difficulty.EASY: {"time": 30, "chance": 15, "name": "ЛЕГКИЙ", "description": "30 сек, 15% риск"},
+    Difficulty.MEDIUM: {"time": 45, "chance": 30, "name": "СРЕДНИЙ", "description": "45 сек, 30% риск"},
+    Difficulty.HARD: {"time": 50, "chance": 40, "name": "СЛОЖНЫЙ", "description": "45 сек, 40% риск"},
+    Difficulty.IMPOSSIBLE: {"time": 60, "chance": 50, "name": "НЕВОЗМОЖНЫЙ", "description": "50 сек, 50% риск"},
+}
+
+
+# Код активности в двоичной записи -> StudentActivity
+_ACTIVITIES = {activity.value: activity for activity in StudentActivity}
+
+
+class PackedState(abc.ABC):
+    """Основа компактных записей состояния.
+
+    Поля хранятся в __slots__ (у экземпляров нет __dict__), а pack()/load()
+    переводят их в двоичную запись фиксированного размера LAYOUT.size.
+    Снимок - это неизменяемые bytes, а тысячи записей можно держать подряд
+    в одном bytearray через pack_into()/load(buffer, offset).
+    """
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    LAYOUT: struct.Struct
+
+    @abc.abstractmethod
+    def _values(self) -> tuple:
+        """Значения полей в порядке LAYOUT"""
+
+    @abc.abstractmethod
+    def _assign(self, values: tuple):
+        """Заполнить поля значениями в порядке LAYOUT"""
+
+    def pack(self) -> bytes:
+        return self.LAYOUT.pack(*self._values())
+
+    def pack_into(self, buffer, offset: int = 0):
+        self.LAYOUT.pack_into(buffer, offset, *self._values())
+
+    def load(self, data, offset: int = 0):
+        """Заполнить поля из двоичной записи (объект переиспользуется)"""
+        self._assign(self.LAYOUT.unpack_from(data, offset))
+        return self
+
+    @classmethod
+    def unpack(cls, data, offset: int = 0):
+        return cls().load(data, offset)
+
+    def copy(self):
+        return type(self)().load(self.pack())
+
+    __copy__ = copy
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedState):
+            return NotImplemented
+        return self.LAYOUT is other.LAYOUT and self._values() == other._values()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+
+class StudentModel(PackedState):
+    """Состояние студента без отрисовки"""
+    FIELDS = ("x", "y", "current_activity", "score", "activity_progress", "activity_timer", "activity_duration")
+    __slots__ = FIELDS
+    # x, y, активность, очки, прогресс (0-100), таймер и длительность активности в тиках - 30 байт
+    LAYOUT = struct.Struct("<ddBiBii")
+
+    # Длительности активностей (в кадрах при 60 FPS)
+    ACTIVITY_DURATIONS = {
+        StudentActivity.NORMAL: 0,      # Мгновенно
+        StudentActivity.CHEAT: 180,     # 3 секунды (3 * 60)
+        StudentActivity.GAMES: 120,     # 2 секунды (2 * 60)
+        StudentActivity.SLEEP: 240,     # 4 секунды (4 * 60)
+        StudentActivity.EAT: 150,       # 2.5 секунды (2.5 * 60)
+    }
+
+    def __init__(self, x: float = 400, y: float = 500,
+                 current_activity: StudentActivity = StudentActivity.NORMAL, score: int = 0,
+                 activity_progress: int = 0, activity_timer: int = 0, activity_duration: int = 0):
+        self.x = x
+        self.y = y
+        self.current_activity = current_activity
+        self.score = score
+        self.activity_progress = activity_progress  # 0-100
+        self.activity_timer = activity_timer
+        self.activity_duration = activity_duration  # Длительность в кадрах
+
+    def reset(self):
+        """Вернуть начальное состояние, не создавая новый объект"""
+        StudentModel.__init__(self)
+
+    def _values(self) -> tuple:
+        return (self.x, self.y, self.current_activity.value, self.score,
+                self.activity_progress, self.activity_timer, self.activity_duration)
+
+    def _assign(self, values: tuple):
+        (self.x, self.y, activity, self.score,
+         self.activity_progress, self.activity_timer, self.activity_duration) = values
+        self.current_activity = _ACTIVITIES[activity]
+
+    def start_activity(self, activity: StudentActivity, duration: Optional[int] = None):
+        """Начать новую активность (duration - длительность в тиках, если частота не 60)"""
+        self.current_activity = activity
+        self.activity_timer = 0
+        self.activity_progress = 0
+        self.activity_duration = self.ACTIVITY_DURATIONS[activity] if duration is None else duration
+
+    def progress_fraction(self, alpha: float = 0.0) -> float:
+        """Доля выполнения активности с интерполяцией между тиками (alpha 0..1)"""
+        if self.activity_duration <= 0:
+            return 0.0
+        return min(1.0, (self.activity_timer + alpha) / self.activity_duration)
+
+    def cancel_activity(self):
+        """Прервать текущую активность без начисления очков"""
+        self.current_activity = StudentActivity.NORMAL
+        self.activity_duration = 0
+        self.activity_timer = 0
+
+    def update_activity(self):
+        """Обновить прогресс активности"""
+        if self.activity_duration > 0 and self.activity_timer < self.activity_duration:
+            self.activity_timer += 1
+            self.activity_progress = int((self.activity_timer / self.activity_duration) * 100)
+            return False  # Активность ещё выполняется
+        elif self.activity_duration > 0:
+            # Активность завершена - полностью прерываем её
+            self.current_activity = StudentActivity.NORMAL
+            self.activity_progress = 0
+            self.activity_timer = 0
+            self.activity_duration = 0  # Очищаем длительность
+            return True  # Активность завершена
+        return False
+
+
+class TeacherModel(PackedState):
+    """Состояние учителя без отрисовки"""
+    FIELDS = ("x", "y", "looking_at_student", "look_timer", "look_duration", "warning_timer")
+    __slots__ = FIELDS
+    # x, y, смотрит ли, таймер до взгляда, длительность взгляда, таймер знака - 29 байт
+    LAYOUT = struct.Struct("<dd?iii")
+
+    def __init__(self, x: float = 1000, y: float = 150, looking_at_student: bool = False,
+                 look_timer: int = 0, look_duration: int = 0, warning_timer: int = 0):
+        self.x = x
+        self.y = y
+        self.looking_at_student = looking_at_student
+        self.look_timer = look_timer
+        self.look_duration = look_duration
+        self.warning_timer = warning_timer  # Таймер для отображения предупреждающего знака
+
+    def reset(self):
+        """Вернуть начальное состояние, не создавая новый объект"""
+        TeacherModel.__init__(self)
+
+    def _values(self) -> tuple:
+        return (self.x, self.y, self.looking_at_student, self.look_timer, self.look_duration, self.warning_timer)
+
+    def _assign(self, values: tuple):
+        (self.x, self.y, self.looking_at_student, self.look_timer, self.look_duration, self.warning_timer) = values
+
+    def warning_visible(self, tick_rate: int = SIM_FPS, blink: bool = True) -> bool:
+        """Виден ли "!" (мигает каждые 12 кадров при 60 FPS; blink=False - горит постоянно)"""
+        if not blink:
+            return self.warning_timer > 0
+        return self.warning_timer > 0 and (self.warning_timer * SIM_FPS // tick_rate // 12) % 2 == 0
+
+
+@dataclass
+class RoundResult:
+    """Итог одного раунда"""
+    outcome: RoundOutcome
+    score: int
+    ticks: int
+
+
+class SimEvent(IntEnum):
+    """События раунда; при совпадении тиков обрабатываются в этом порядке"""
+    ACTIVITY_DONE = 0  # Активность студента завершена - начислить очки
+    ROUND_END = 1      # Время вышло - победа
+    LOOK_ROLL = 2      # Учитель посмотрел (успешный бросок шанса взгляда)
+    LOOK_END = 3       # Фаза взглядов закончилась - запланировать следующую
+
+
+@dataclass
+class SimSnapshot:
+    """Снимок состояния ExamSimulation для отката и перемотки"""
+    student: bytes  # StudentModel.pack()
+    teacher: bytes  # TeacherModel.pack()
+    rng_state: tuple
+    difficulty: Difficulty
+    score: int
+    time_remaining: int
+    game_time: int
+    teacher_look_chance: float
+    look_probability: float
+    last_points: int
+    outcome: RoundOutcome
+    events: Tuple[Tuple[int, SimEvent], ...]
+    end_tick: int
+    activity_end: int
+    look_at: int
+    look_end: int
+    next_look: int
+
+
+# Политика игрока: получает симуляцию перед тиком и возвращает активность
+# для нажатия (NORMAL = "Отменить") или None, если ничего не нажимать.
+# Встроенные политики также умеют batch(state) для batch_sim.py: на вход
+# массивы состояния всех раундов, на выход массив кодов активностей
+# (StudentActivity.value, 0 - ничего не нажимать) или None.
+# Политика с event_driven = True меняет решение только на событиях
+# раунда, и run_round() опрашивает её только в эти тики.
+Policy = Callable[["ExamSimulation"], Optional[StudentActivity]]
+
+
+class ExamSimulation:
+    """Правила одного раунда: студент, учитель, таймер и очки.
+
+    Раунд - это очередь событий (heapq) с тиками, вычисленными заранее:
+    конец активности, конец раунда, успешные броски взгляда учителя
+    (интервалы между ними - геометрическое распределение) и конец фазы
+    взглядов. advance() перепрыгивает сразу к нужному тику, step() - это
+    advance() на один тик для Game. Таймеры в StudentModel/TeacherModel
+    (activity_timer, look_timer, warning_timer, ...) - это вид для
+    отрисовки и политик, он пересчитывается из абсолютных тиков.
+    О событиях сообщают возвращаемый исход и поле last_points.
+    """
+
+    def __init__(self, difficulty: Difficulty = Difficulty.EASY, seed: Optional[int] = None,
+                 student: Optional[StudentModel] = None, teacher: Optional[TeacherModel] = None,
+                 settings: Optional[dict] = None, tick_rate: int = SIM_FPS):
+        self.tick_rate = tick_rate
+        self.durations = {activity: self.ticks(frames) for activity, frames in StudentModel.ACTIVITY_DURATIONS.items()}
+        self.look_probability = 0.0
+        self.settings = settings if settings is not None else DIFFICULTY_SETTINGS
+        self.student = student if student is not None else StudentModel()
+        self.teacher = teacher if teacher is not None else TeacherModel()
+        self.rng = random.Random(seed)
+        self.difficulty = difficulty
+        self.score = 0
+        self.time_remaining = 0
+        self.game_time = 0
+        self.teacher_look_chance = 15  # Вероятность в процентах
+        self.last_points = 0
+        self.outcome = RoundOutcome.RUNNING
+        # Очередь событий (тик, событие) и абсолютные тики текущих фаз
+        self.events: List[Tuple[int, SimEvent]] = []
+        self.end_tick = 0
+        self.activity_end = 0  # Тик завершения активности (0 - студент свободен)
+        self.look_at = 0       # Последний тик ожидания перед фазой взглядов
+        self.look_end = 0      # Последний тик фазы взглядов
+        self.next_look = 0     # Тик следующего взгляда в очереди (0 - нет)
+
+    def reset(self, difficulty: Optional[Difficulty] = None, seed: Optional[int] = None,
+              student: Optional[StudentModel] = None, teacher: Optional[TeacherModel] = None):
+        """Начать новый раунд (аналог Game.start_game без UI).
+
+        Без student/teacher текущие объекты сбрасываются на месте.
+        """
+        if difficulty is not None:
+            self.difficulty = difficulty
+        if seed is not None:
+            self.rng.seed(seed)
+        if student is not None:
+            self.student = student
+        else:
+            self.student.reset()
+        if teacher is not None:
+            self.teacher = teacher
+        else:
+            self.teacher.reset()
+        self.score = 0
+        self.game_time = 0
+        self.last_points = 0
+        self.outcome = RoundOutcome.RUNNING
+        self.activity_end = 0
+
+        settings = self.settings[self.difficulty]
+        self.time_remaining = settings["time"] * self.tick_rate  # Перевести в тики
+        self.teacher_look_chance = settings["chance"]
+        # Шанс взгляда задан на тик при 60 Гц; на другой частоте пересчитываем,
+        # чтобы вероятность взгляда за секунду осталась прежней
+        chance = min(1.0, self.teacher_look_chance / 100)
+        self.look_probability = 1.0 - (1.0 - chance) ** (SIM_FPS / self.tick_rate)
+
+        self.end_tick = self.time_remaining
+        self.events = [(self.end_tick, SimEvent.ROUND_END)]
+        self.schedule_teacher_actions()
+        self._sync_view()
+
+    def ticks(self, frames: int) -> int:
+        """Перевести длительность из кадров при 60 FPS в тики симуляции"""
+        return frames * self.tick_rate // SIM_FPS
+
+    def _ticks_to_look(self) -> Optional[int]:
+        """Через сколько тиков следующий успешный бросок (None - никогда).
+
+        Каждый тик фазы взглядов учитель смотрит с вероятностью
+        look_probability, поэтому число тиков до успеха распределено
+        геометрически и разыгрывается одним случайным числом.
+        """
+        p = self.look_probability
+        if p <= 0.0:
+            return None
+        if p >= 1.0:
+            return 1
+        return 1 + int(math.log(1.0 - self.rng.random()) / math.log(1.0 - p))
+
+    def _schedule_look(self, after: int):
+        """Поставить в очередь следующий взгляд после тика after (в пределах фазы)"""
+        gap = self._ticks_to_look()
+        if gap is not None and after + gap <= self.look_end:
+            self.next_look = after + gap
+            heapq.heappush(self.events, (self.next_look, SimEvent.LOOK_ROLL))
+        else:
+            self.next_look = 0
+
+    def schedule_teacher_actions(self):
+        """Запланировать следующий взгляд учителя"""
+        delay = self.rng.randint(2, 5)
+        look_duration = self.rng.randint(self.ticks(60), self.ticks(180))
+        # Ожидание delay секунд, затем look_duration + 1 тиков, в которые учитель может посмотреть
+        self.look_at = self.game_time + delay * self.tick_rate
+        self.look_end = self.look_at + look_duration + 1
+        heapq.heappush(self.events, (self.look_end, SimEvent.LOOK_END))
+        self._schedule_look(self.look_at)
+
+    def apply_action(self, activity: StudentActivity) -> bool:
+        """Нажатие кнопки активности. False - если студент уже занят"""
+        if activity == StudentActivity.NORMAL:
+            self.student.cancel_activity()
+            self.activity_end = 0  # Событие завершения в очереди станет недействительным
+            self._sync_view()
+            return True
+        if self.student.current_activity != StudentActivity.NORMAL:
+            return False
+        duration = self.durations[activity]
+        self.student.start_activity(activity, duration)
+        # Таймер доходит до duration, очки - на следующем тике
+        self.activity_end = self.game_time + duration + 1
+        heapq.heappush(self.events, (self.activity_end, SimEvent.ACTIVITY_DONE))
+        if self.teacher.looking_at_student and self.next_look == 0:
+            # Учитель уже смотрит, а взгляды не разыгрывались, пока студент был свободен
+            self._schedule_look(self.game_time)
+        return True
+
+    def next_event_tick(self) -> int:
+        """Тик ближайшего события в очереди"""
+        return self.events[0][0]
+
+    def advance(self, tick: int) -> RoundOutcome:
+        """Обработать все события до тика tick включительно и перейти на него"""
+        student = self.student
+        teacher = self.teacher
+        events = self.events
+        self.last_points = 0
+
+        while events and events[0][0] <= tick:
+            event_tick, event = heapq.heappop(events)
+            if event == SimEvent.ACTIVITY_DONE:
+                if event_tick != self.activity_end or student.activity_duration <= 0:
+                    continue  # Активность отменили
+                points = ACTIVITY_POINTS[student.current_activity]
+                student.current_activity = StudentActivity.NORMAL
+                student.activity_duration = 0
+                self.activity_end = 0
+                self.score += points
+                self.last_points = points
+            elif event == SimEvent.ROUND_END:
+                self.outcome = RoundOutcome.WIN
+                return self._finish(event_tick)
+            elif event == SimEvent.LOOK_ROLL:
+                if event_tick != self.next_look:
+                    continue
+                self.next_look = 0
+                teacher.looking_at_student = True
+                if student.activity_duration > 0:
+                    self.outcome = RoundOutcome.CAUGHT
+                    return self._finish(event_tick)
+                # Пока студент свободен, повторные взгляды ничего не меняют: следующий
+                # разыграет apply_action (ожидание взгляда не зависит от прошлого)
+            else:  # LOOK_END
+                teacher.looking_at_student = False
+                self.game_time = event_tick
+                self.schedule_teacher_actions()
+
+        self.game_time = tick
+        self.time_remaining = self.end_tick - tick
+        self._sync_view()
+        return RoundOutcome.RUNNING
+
+    def _finish(self, tick: int) -> RoundOutcome:
+        """Раунд закончился на тике tick"""
+        self.game_time = tick
+        self.time_remaining = self.end_tick - tick
+        self._sync_view()
+        return self.outcome
+
+    def _sync_view(self):
+        """Пересчитать таймеры для отрисовки из абсолютных тиков"""
+        now = self.game_time
+        student = self.student
+        duration = student.activity_duration
+        if duration > 0:
+            timer = min(duration, now - (self.activity_end - duration - 1))
+            student.activity_timer = timer
+            student.activity_progress = timer * 100 // duration
+        else:
+            student.activity_timer = 0
+            student.activity_progress = 0
+
+        teacher = self.teacher
+        look_timer = max(0, self.look_at - now)
+        teacher.look_timer = look_timer
+        teacher.look_duration = self.look_end - 1 - max(self.look_at, now)
+        # Предупреждающий знак мигает только последнюю секунду перед взглядом
+        teacher.warning_timer = look_timer if look_timer <= self.tick_rate else 0
+
+    def step(self) -> RoundOutcome:
+        """Продвинуть раунд на один тик"""
+        return self.advance(self.game_time + 1)
+
+    def snapshot(self) -> SimSnapshot:
+        """Снять копию состояния (включая состояние генератора случайных чисел)"""
+        return SimSnapshot(self.student.pack(), self.teacher.pack(), self.rng.getstate(),
+                           self.difficulty, self.score, self.time_remaining, self.game_time,
+                           self.teacher_look_chance, self.look_probability, self.last_points, self.outcome,
+                           tuple(self.events), self.end_tick, self.activity_end, self.look_at, self.look_end,
+                           self.next_look)
+
+    def restore(self, snapshot: SimSnapshot):
+        """Вернуть состояние из снимка (снимок остаётся пригодным для повторного использования)"""
+        self.student.load(snapshot.student)
+        self.teacher.load(snapshot.teacher)
+        self.rng.setstate(snapshot.rng_state)
+        self.difficulty = snapshot.difficulty
+        self.score = snapshot.score
+        self.time_remaining = snapshot.time_remaining
+        self.game_time = snapshot.game_time
+        self.teacher_look_chance = snapshot.teacher_look_chance
+        self.look_probability = snapshot.look_probability
+        self.last_points = snapshot.last_points
+        self.outcome = snapshot.outcome
+        self.events = list(snapshot.events)  # Кортеж уже упорядочен как куча
+        self.end_tick = snapshot.end_tick
+        self.activity_end = snapshot.activity_end
+        self.look_at = snapshot.look_at
+        self.look_end = snapshot.look_end
+        self.next_look = snapshot.next_look
+
+    def run_round(self, policy: Optional[Policy] = None, max_ticks: Optional[int] = None) -> RoundResult:
+        """Прогнать текущий раунд до конца с заданной политикой игрока.
+
+        Без политики или с event_driven-политикой раунд идёт от события к
+        событию, иначе политика опрашивается каждый тик.
+        """
+        running = RoundOutcome.RUNNING
+        outcome = self.outcome
+        limit = self.game_time + (max_ticks if max_ticks is not None else self.time_remaining)
+        jump = policy is None or getattr(policy, "event_driven", False)
+        while outcome == running and self.game_time < limit:
+            if policy is not None:
+                action = policy(self)
+                if action is not None:
+                    self.apply_action(action)
+            tick = min(self.next_event_tick(), limit) if jump else self.game_time + 1
+            outcome = self.advance(tick)
+        return RoundResult(outcome, self.score, self.game_time)
+
+
+class RoundSession:
+    """Раунд вместе с сообщениями игроку.
+
+    То, что Game показывает поверх правил: очередь сообщений и реакции на
+    нажатия. Не зависит от pygame, поэтому тот же код проигрывает записи
+    в replay.py. Если задан recorder, нажатия и итог раунда записываются.
+    """
+
+    def __init__(self, sim: ExamSimulation, recorder=None):
+        self.sim = sim
+        self.recorder = recorder
+        self.seed = 0
+        self.messages: List[Tuple[str, int]] = []
+
+    def start(self, difficulty: Difficulty, seed: Optional[int] = None,
+              student: Optional[StudentModel] = None, teacher: Optional[TeacherModel] = None):
+        """Начать раунд с заданным (или случайным) сидом"""
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.sim.reset(difficulty, seed=self.seed, student=student, teacher=teacher)
+        self.messages = []
+        if self.recorder is not None:
+            self.recorder.begin(self.seed, self.sim)
+        difficulty_name = self.sim.settings[self.sim.difficulty]["name"]
+        self.add_message(f"{difficulty_name} уровень! Списывай и не попадайся!", 120)
+
+    def add_message(self, text: str, duration: int = 120):
+        """Добавить сообщение (duration - в кадрах при 60 FPS)"""
+        self.messages.append((text, self.sim.ticks(duration)))
+
+    def click(self, activity: StudentActivity) -> bool:
+        """Нажатие кнопки активности игроком"""
+        if self.recorder is not None:
+            self.recorder.action(self.sim.game_time, activity)
+        if not self.sim.apply_action(activity):
+            # Если есть активное действие - показываем предупреждение
+            self.add_message("[WARNING] Заверши текущее действие!", 100)
+            return False
+        return True
+
+    def step(self) -> RoundOutcome:
+        """Тик правил плюс сообщения о его результате"""
+        self.messages = [(msg, time - 1) for msg, time in self.messages if time > 0]
+        outcome = self.sim.step()
+        if self.sim.last_points > 0:
+            self.add_message(f"[SUCCESS] Успешно! +{self.sim.last_points} очков", 120)
+        if outcome == RoundOutcome.WIN:
+            self.add_message("[WIN] Время вышло! Ты выжил!", 240)
+        elif outcome == RoundOutcome.CAUGHT:
+            self.add_message("[CAUGHT] ПОЙМАНА! Учитель заметил активность!", 180)
+        if outcome != RoundOutcome.RUNNING and self.recorder is not None:
+            self.recorder.end(self.sim.game_time, outcome, self.sim.score)
+        return outcome
+
+
+class IdlePolicy:
+    """Ничего не делать - безопасно, но 0 очков"""
+    event_driven = True
+
+    def __call__(self, sim: ExamSimulation) -> Optional[StudentActivity]:
+        return None
+
+    def batch(self, state):
+        return None
+
+
+class AlwaysPolicy:
+    """Начинать активность сразу, как только студент свободен"""
+    event_driven = True  # Студент освобождается только на событиях
+
+    def __init__(self, activity: StudentActivity = StudentActivity.CHEAT):
+        self.activity = activity
+
+    def __call__(self, sim: ExamSimulation) -> Optional[StudentActivity]:
+        if sim.student.current_activity == StudentActivity.NORMAL:
+            return self.activity
+        return None
+
+    def batch(self, state):
+        return (state.activity == StudentActivity.NORMAL.value) * self.activity.value
+
+
+class ThresholdPolicy:
+    """Начинать активность, только если до взгляда учителя больше min_look_timer тиков"""
+    # look_timer между событиями только убывает, поэтому условие может
+    # стать истинным лишь на событии (конец активности или новая фаза)
+    event_driven = True
+
+    def __init__(self, activity: StudentActivity = StudentActivity.CHEAT, min_look_timer: int = 0):
+        self.activity = activity
+        self.min_look_timer = min_look_timer
+
+    def __call__(self, sim: ExamSimulation) -> Optional[StudentActivity]:
+        if (sim.student.current_activity == StudentActivity.NORMAL
+                and sim.teacher.look_timer > self.min_look_timer):
+            return self.activity
+        return None
+
+    def batch(self, state):
+        free = state.activity == StudentActivity.NORMAL.value
+        return (free & (state.look_timer > self.min_look_timer)) * self.activity.value
+
+
+POLICY_NAMES = ("idle", "always", "threshold")
+
+
+def make_policy(name: str, activity: StudentActivity = StudentActivity.CHEAT, threshold: Optional[int] = None):
+    """Создать встроенную политику по имени (для CLI)"""
+    if name == "idle":
+        return IdlePolicy()
+    if name == "always":
+        return AlwaysPolicy(activity)
+    if name == "threshold":
+        if threshold is None:
+            threshold = StudentModel.ACTIVITY_DURATIONS[activity]
+        return ThresholdPolicy(activity, threshold)
+    raise ValueError(f"Неизвестная политика: {name}")
+
+
+def main(argv=None):
+    """Прогнать серию раундов без окна и вывести статистику"""
+    parser = argparse.ArgumentParser(description="Headless-прогон раундов UTM Cheating Simulator")
+    parser.add_argument("--difficulty", choices=[d.name.lower() for d in Difficulty], default="easy")
+    parser.add_argument("--policy", choices=POLICY_NAMES, default="threshold")
+    parser.add_argument("--activity", choices=[a.name.lower() for a in StudentActivity], default="cheat")
+    parser.add_argument("--threshold", type=int, default=None,
+                        help="минимальный look_timer для политики threshold (по умолчанию - длительность активности)")
+    parser.add_argument("--rounds", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tick-rate", type=int, default=SIM_FPS, help="частота симуляции (тиков в секунду)")
+    args = parser.parse_args(argv)
+
+    policy = make_policy(args.policy, StudentActivity[args.activity.upper()], args.threshold)
+
+    sim = ExamSimulation(Difficulty[args.difficulty.upper()], seed=args.seed, tick_rate=args.tick_rate)
+    wins = 0
+    total_score = 0
+    total_ticks = 0
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        sim.reset()
+        result = sim.run_round(policy)
+        wins += result.outcome == RoundOutcome.WIN
+        total_score += result.score
+        total_ticks += result.ticks
+    elapsed = time.perf_counter() - started
+
+    print(f"Раундов: {args.rounds}, выжил: {wins / args.rounds:.1%}, "
+          f"средний счёт: {total_score / args.rounds:.2f}")
+    print(f"Тиков: {total_ticks} за {elapsed:.2f} с ({total_ticks / max(elapsed, 1e-9):,.0f} тиков/с)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Параллельный перебор политик игрока и параметров сложности.
+
+Сетка: политики (активность + порог look_timer) x время раунда x шанс
+взгляда. Каждая ячейка сетки - отдельная задача batch_sim.simulate_batch
+в пуле процессов; сид задачи выводится из общего сида через
+SeedSequence.spawn, поэтому результат не зависит от числа воркеров.
+Строки пишутся в файл по мере готовности.
+
+Пример:
+    python sweep.py --thresholds 0,60,120,180 --times 30,45,60 --chances 15,30,50 --out sweep.csv
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from batch_sim import simulate_batch
+from simulation import POLICY_NAMES, StudentActivity, make_policy
+
+FIELDS = [
+    "task", "policy", "activity", "threshold", "time", "chance", "rounds",
+    "survival_rate", "mean_score", "std_score", "p5", "p50", "p95", "max_score",
+    "mean_ticks", "elapsed",
+]
+
+
+def build_grid(policies: Iterable[str], activities: Iterable[str], thresholds: Iterable[int],
+               times: Iterable[int], chances: Iterable[float]) -> List[dict]:
+    """Декартово произведение параметров (порог имеет смысл только для threshold)"""
+    grid = []
+    for policy, activity, time_limit, chance in itertools.product(policies, activities, times, chances):
+        policy_thresholds = thresholds if policy == "threshold" else [None]
+        for threshold in policy_thresholds:
+            grid.append({
+                "policy": policy, "activity": activity, "threshold": threshold,
+                "time": time_limit, "chance": chance,
+            })
+    return grid
+
+
+def run_task(task: int, cell: dict, rounds: int, seed: np.random.SeedSequence) -> dict:
+    """Выполнить одну ячейку сетки в процессе-воркере"""
+    policy = make_policy(cell["policy"], StudentActivity[cell["activity"].upper()], cell["threshold"])
+    result = simulate_batch(rounds, cell["time"], cell["chance"], policy, seed=seed)
+    row = {"task": task, **cell}
+    row.update(result.summary())
+    row["elapsed"] = round(result.elapsed, 4)
+    return row
+
+
+class RowWriter:
+    """Потоковая запись строк в CSV, JSON Lines или Parquet"""
+
+    def __init__(self, path: str, fmt: str):
+        self.fmt = fmt
+        self._buffer = []
+        if fmt == "parquet":
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise SystemExit("[ERROR] Для --format parquet нужен pyarrow (pip install pyarrow)")
+            self._pa = pyarrow
+            self._writer = None
+            self._path = path
+            return
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        if fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, row: dict):
+        if self.fmt == "csv":
+            self._csv.writerow(row)
+            self._file.flush()
+        elif self.fmt == "jsonl":
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._file.flush()
+        else:
+            self._buffer.append(row)
+            if len(self._buffer) >= 64:
+                self._flush_parquet()
+
+    def _flush_parquet(self):
+        if not self._buffer:
+            return
+        table = self._pa.Table.from_pylist([{k: row.get(k) for k in FIELDS} for row in self._buffer])
+        if self._writer is None:
+            self._writer = self._pa.parquet.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+        self._buffer = []
+
+    def close(self):
+        if self.fmt == "parquet":
+            self._flush_parquet()
+            if self._writer is not None:
+                self._writer.close()
+        else:
+            self._file.close()
+
+
+def run_sweep(grid: List[dict], rounds: int, out: str, fmt: str = "csv",
+              workers: Optional[int] = None, seed: Optional[int] = None) -> int:
+    """Разослать сетку по пулу процессов и записать результаты"""
+    seeds = np.random.SeedSequence(seed).spawn(len(grid))
+    writer = RowWriter(out, fmt)
+    done = 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_task, i, cell, rounds, seeds[i]) for i, cell in enumerate(grid)]
+            for future in as_completed(futures):
+                writer.write(future.result())
+                done += 1
+                print(f"\r[{done}/{len(grid)}] {time.perf_counter() - started:.1f} с", end="", file=sys.stderr)
+    finally:
+        writer.close()
+        print(file=sys.stderr)
+    return done
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(part) for part in text.split(",") if part]
+
+
+def _float_list(text: str) -> List[float]:
+    return [float(part) for part in text.split(",") if part]
+
+
+def main(argv=None):
+    """Перебрать сетку политик и сложностей на всех ядрах"""
+    parser = argparse.ArgumentParser(description="Параллельный перебор политик и сложностей")
+    parser.add_argument("--policies", default="threshold", help=f"через запятую: {', '.join(POLICY_NAMES)}")
+    parser.add_argument("--activities", default="cheat", help="через запятую: cheat, games, sleep, eat")
+    parser.add_argument("--thresholds", type=_int_list, default=[0, 60, 120, 180, 240])
+    parser.add_argument("--times", type=_int_list, default=[30, 45, 60])
+    parser.add_argument("--chances", type=_float_list, default=[15, 30, 40, 50])
+    parser.add_argument("--rounds", type=int, default=20_000, help="раундов на ячейку сетки")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], default="csv")
+    parser.add_argument("--out", default="sweep.csv")
+    args = parser.parse_args(argv)
+
+    policies = [p for p in args.policies.split(",") if p]
+    activities = [a for a in args.activities.split(",") if a]
+    for name in policies:
+        if name not in POLICY_NAMES:
+            parser.error(f"неизвестная политика: {name}")
+    for name in activities:
+        if name.upper() not in StudentActivity.__members__:
+            parser.error(f"неизвестная активность: {name}")
+
+    grid = build_grid(policies, activities, args.thresholds, args.times, args.chances)
+    print(f"Ячеек: {len(grid)}, воркеров: {args.workers}, раундов на ячейку: {args.rounds}", file=sys.stderr)
+    run_sweep(grid, args.rounds, args.out, args.format, args.workers, args.seed)
+    print(f"Результаты: {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())